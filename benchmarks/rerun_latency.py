@@ -0,0 +1,210 @@
+"""Headless rerun-latency benchmark for every app mode.
+
+Drives app.py through Streamlit's AppTest harness with a synthetic
+session (N uploaded charts, M knowledge entries, K chat turns) and
+reports p50/p95 rerun time and peak Python allocation per mode. Results
+are written as JSON so runs can be compared across versions:
+
+    python benchmarks/rerun_latency.py --uploads 50 --knowledge 20 --chat-turns 200 \
+        --runs 20 --output bench_results.json
+
+No network is used: the session points at the local stand-in backend
+and reruns never issue completion requests.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from trading_assistant.views import PAGES  # noqa: E402
+
+# Every page of the app, so new ones are benchmarked too
+MODES = list(PAGES)
+
+# Session the synthetic records are filed under in the session store
+SESSION_KEY = "benchmark"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def synthetic_session(uploads, knowledge, chat_turns, image_size):
+    """Session-state values for a heavy session, backed by the on-disk stores.
+
+    Uploads, chat turns and knowledge are written to the session store
+    (and the vector index) under ``SESSION_KEY``, which the app reloads
+    them from like any returning session.
+    """
+    from PIL import Image, ImageDraw
+
+    from trading_assistant.blob_store import BlobStore
+    from trading_assistant.config import DATA_DIR, RENDITION_CACHE_BYTES, UPLOAD_BUDGET_BYTES
+    from trading_assistant.images import RenditionCache
+    from trading_assistant.knowledge import chunk_text
+    from trading_assistant.session_store import SessionStore
+    from trading_assistant.vector_index import VectorIndex
+
+    blobs = BlobStore(os.path.join(DATA_DIR, "blobs"), UPLOAD_BUDGET_BYTES)
+    renditions = RenditionCache(os.path.join(DATA_DIR, "renditions"), RENDITION_CACHE_BYTES)
+    files = []
+    for i in range(uploads):
+        image = Image.new("RGB", image_size, (250, 250, 250))
+        draw = ImageDraw.Draw(image)
+        for x in range(0, image_size[0], 12):
+            y = (x * (i + 3)) % image_size[1]
+            draw.rectangle([x, y, x + 6, min(y + 40, image_size[1] - 1)],
+                           fill=(30, 160, 60) if x % 24 else (200, 40, 40))
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+        digest = blobs.put(buf.getvalue())
+        renditions.build(digest, io.BytesIO(buf.getvalue()))
+        files.append({
+            "name": f"chart_{i}.png", "type": "image/png",
+            "size": f"{len(buf.getvalue()) / 1024:.1f} KB", "digest": digest,
+            "upload_time": "2024-01-01 00:00:00"
+        })
+
+    sentence = ("Support and resistance levels mark where supply and demand shifted. "
+                "Risk no more than one percent per trade and respect the stop. ")
+    vectors = VectorIndex(os.path.join(DATA_DIR, "vectors"))
+    books = [f"Book_{i}" for i in range(knowledge)]
+    for i, name in enumerate(books):
+        vectors.add_document(name, chunk_text(sentence * 400), source=f"book_{i}.pdf")
+
+    history = []
+    for i in range(chat_turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        history.append({"role": role, "content": f"Turn {i}: " + sentence * 3})
+
+    store = SessionStore(os.path.join(DATA_DIR, "sessions.sqlite3"))
+    store.delete(SESSION_KEY, "upload")
+    store.delete(SESSION_KEY, "chat")
+    store.delete(SESSION_KEY, "knowledge")
+    for record in files:
+        store.append(SESSION_KEY, "upload", record)
+    for record in history:
+        store.append(SESSION_KEY, "chat", record)
+    for name in books:
+        store.append(SESSION_KEY, "knowledge", {"name": name})
+
+    return {"session_key": SESSION_KEY}
+
+
+def check_seeded(at, mode, uploads, knowledge, chat_turns):
+    # A benchmark of an empty session would look fast and mean nothing
+    state = at.session_state
+    if len(state["uploaded_files"]) != uploads:
+        raise RuntimeError(f"{mode}: {len(state['uploaded_files'])} of {uploads} seeded uploads loaded")
+    if len(state["knowledge"]) != knowledge:
+        raise RuntimeError(f"{mode}: {len(state['knowledge'])} of {knowledge} seeded documents loaded")
+    if chat_turns and not state["chat_history"]:
+        raise RuntimeError(f"{mode}: seeded chat history not loaded")
+    if mode == "💬 Chat with AI" and chat_turns and not at.chat_message:
+        raise RuntimeError(f"{mode}: seeded chat history not rendered")
+
+
+def measure_mode(app_path, mode, session, runs, timeout, uploads, knowledge, chat_turns):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    for key, value in session.items():
+        at.session_state[key] = value
+    at.run()
+    at.sidebar.radio[0].set_value(mode).run()
+    if at.exception:
+        raise RuntimeError(f"{mode}: {at.exception[0].value}")
+    check_seeded(at, mode, uploads, knowledge, chat_turns)
+
+    # The harness polls for the end of a run every 0.1 s, so wall time
+    # around at.run() is quantised; the app's own script_run span is not
+    from trading_assistant.metrics import METRICS
+    timings = []
+    for _ in range(runs):
+        before = METRICS.histograms["script_run"]["sum"]
+        at.run()
+        timings.append((METRICS.histograms["script_run"]["sum"] - before) * 1000)
+
+    tracemalloc.start()
+    at.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "runs": runs,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "peak_alloc_kb": round(peak / 1024, 1)
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark app rerun latency per mode.")
+    parser.add_argument("--uploads", type=int, default=20, help="uploaded charts in the session")
+    parser.add_argument("--knowledge", type=int, default=10, help="knowledge-base entries")
+    parser.add_argument("--chat-turns", type=int, default=100, help="chat history length")
+    parser.add_argument("--runs", type=int, default=15, help="measured reruns per mode")
+    parser.add_argument("--image-size", default="1920x1080", help="synthetic chart size, WxH")
+    parser.add_argument("--modes", nargs="*", default=MODES, help="modes to measure")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds allowed per rerun")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    args = parser.parse_args(argv)
+
+    # Isolate stores and keep everything offline
+    os.environ.setdefault("TRADING_AI_DATA_DIR", tempfile.mkdtemp(prefix="trading-ai-bench-"))
+    os.environ.setdefault("TRADING_AI_LLM_BACKEND", "local")
+
+    width, height = (int(v) for v in args.image_size.lower().split("x"))
+    session = synthetic_session(args.uploads, args.knowledge, args.chat_turns, (width, height))
+    app_path = os.path.join(ROOT, "app.py")
+
+    results = {}
+    for mode in args.modes:
+        results[mode] = measure_mode(app_path, mode, session, args.runs, args.timeout,
+                                     args.uploads, args.knowledge, args.chat_turns)
+        r = results[mode]
+        print(f"{mode:<20} p50 {r['p50_ms']:>8.1f} ms   p95 {r['p95_ms']:>8.1f} ms   "
+              f"peak {r['peak_alloc_kb']:>9.1f} KB")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "uploads": args.uploads, "knowledge": args.knowledge,
+            "chat_turns": args.chat_turns, "runs": args.runs, "image_size": args.image_size
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from trading_assistant.backtest import STRATEGIES, positions, run, simulate
+
+
+def random_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = np.concatenate(([100.0], close[:-1])) * np.exp(rng.normal(0, 0.01, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n))
+    return {"open": open_, "high": high, "low": low, "close": close}
+
+
+def reference(data, entries, exits, stop_loss=None, take_profit=None, fee=0.0):
+    """Bar-by-bar simulation with the same fill rules as ``simulate``."""
+    open_, high, low, close = (data[f] for f in ("open", "high", "low", "close"))
+    signal, trade, stopped_out = 0, None, False
+    value, equity, trades = 1.0, [], []
+    for i in range(len(close)):
+        ret = 0.0
+        if not signal:
+            stopped_out = False
+            if trade:
+                ret = open_[i] * (1 - fee) / close[i - 1] - 1
+                trades.append((trade[0], i, trade[1], open_[i]))
+                trade = None
+        elif trade is None and not stopped_out:
+            trade = (i, open_[i])
+        if trade:
+            start, price = trade
+            basis = price * (1 + fee) if start == i else close[i - 1]
+            stop = price * (1 - stop_loss) if stop_loss else -np.inf
+            target = price * (1 + take_profit) if take_profit else np.inf
+            fill = None
+            if low[i] <= stop:
+                fill = min(stop, open_[i])
+            elif high[i] >= target:
+                fill = max(target, open_[i])
+            elif i == len(close) - 1:
+                fill = close[i]
+            if fill is None:
+                ret = close[i] / basis - 1
+            else:
+                ret = fill * (1 - fee) / basis - 1
+                trades.append((start, i, price, fill))
+                trade, stopped_out = None, True
+        if exits[i]:
+            signal = 0
+        elif entries[i]:
+            signal = 1
+        value *= 1 + ret
+        equity.append(value)
+    return np.array(equity), trades
+
+
+def test_exit_wins_over_entry_on_the_same_bar():
+    entries = np.array([1, 0, 1, 0, 0, 1], dtype=bool)
+    exits = np.array([0, 0, 1, 0, 1, 0], dtype=bool)
+    assert positions(entries, exits).tolist() == [1, 1, 0, 0, 0, 1]
+
+
+@pytest.mark.parametrize("stop_loss, take_profit, fee", [
+    (None, None, 0.0),
+    (None, None, 0.001),
+    (0.02, None, 0.0),
+    (None, 0.03, 0.0),
+    (0.02, 0.03, 0.0005),
+])
+@pytest.mark.parametrize("seed", range(5))
+def test_simulate_matches_a_bar_by_bar_loop(seed, stop_loss, take_profit, fee):
+    data = random_bars(400, seed)
+    rng = np.random.default_rng(seed + 100)
+    entries = rng.random(400) < 0.08
+    exits = rng.random(400) < 0.05
+
+    equity, trades = simulate(data, entries, exits, stop_loss, take_profit, fee)
+    expected_equity, expected_trades = reference(data, entries, exits, stop_loss, take_profit, fee)
+
+    assert np.allclose(equity, expected_equity)
+    entry, exit_, entry_price, exit_price = (np.array(column) for column in zip(*expected_trades))
+    assert np.array_equal(trades["entry"], entry)
+    assert np.array_equal(trades["exit"], exit_)
+    assert np.allclose(trades["entry_price"], entry_price)
+    assert np.allclose(trades["exit_price"], exit_price)
+    assert np.allclose(trades["ret"], exit_price * (1 - fee) / (entry_price * (1 + fee)) - 1)
+
+
+def test_gap_through_the_stop_fills_at_the_open():
+    data = {"open": np.array([100.0, 100, 90, 91]), "high": np.array([101.0, 101, 92, 92]),
+            "low": np.array([99.0, 99, 89, 90]), "close": np.array([100.0, 100, 91, 91])}
+    entries = np.array([1, 0, 0, 0], dtype=bool)
+    _, trades = simulate(data, entries, np.zeros(4, dtype=bool), stop_loss=0.05)
+    assert trades["exit"].tolist() == [2]
+    assert trades["exit_price"].tolist() == [90.0]
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_strategies_run_end_to_end(strategy):
+    equity, trades, stats = run(random_bars(300, 7), strategy, stop_loss=0.03, fee=0.001)
+    assert len(equity) == 300 and np.all(equity > 0)
+    assert stats["trades"] == len(trades["ret"])
+    assert np.all(trades["exit"] >= trades["entry"])
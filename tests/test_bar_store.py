@@ -0,0 +1,39 @@
+import hashlib
+
+import numpy as np
+
+from trading_assistant.bar_store import BarStore
+from trading_assistant.ohlcv import read_ohlcv
+
+
+def price_csv(first_close):
+    rows = [f"2024-01-01 {hour:02d}:00,{first_close + hour},{first_close + hour + 1},"
+            f"{first_close + hour - 1},{first_close + hour},100" for hour in range(24)]
+    return ("time,open,high,low,close,volume\n" + "\n".join(rows) + "\n").encode()
+
+
+def test_same_named_uploads_keep_their_own_bars(tmp_path):
+    store = BarStore(str(tmp_path))
+    first, second = price_csv(100.0), price_csv(500.0)
+    for data in (first, second):
+        store.import_bars(hashlib.sha256(data).hexdigest(), read_ohlcv(data, "data.csv"))
+
+    bars = store.imported(hashlib.sha256(second).hexdigest()).slice()
+    assert bars["close"][0] == 500.0
+    assert np.array_equal(bars["close"], read_ohlcv(second, "data.csv")["close"])
+    assert store.imported(hashlib.sha256(first).hexdigest()).slice()["close"][0] == 100.0
+    # Uploads never become symbol series
+    assert store.symbols() == []
+
+
+def test_append_keeps_only_newer_bars(tmp_path):
+    store = BarStore(str(tmp_path))
+    data = read_ohlcv(price_csv(100.0), "AAPL.csv")
+    head = {name: (values[:10] if values is not None else None) for name, values in data.items()}
+    assert store.append("AAPL", "1h", head) == 10
+    assert store.append("AAPL", "1h", data) == 14
+    assert store.append("AAPL", "1h", data) == 0
+
+    series = store.series("AAPL", "1h")
+    window = series.slice(data["time"][5], data["time"][8])
+    assert np.array_equal(window["close"], data["close"][5:9])
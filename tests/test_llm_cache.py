@@ -0,0 +1,83 @@
+import pytest
+
+from trading_assistant import llm_cache
+from trading_assistant.llm_cache import ResponseCache, cache_key
+
+MESSAGES = [{"role": "user", "content": "Where is support?"}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_cache_key_ignores_whitespace_and_transport_params():
+    base = cache_key("gpt", MESSAGES, temperature=0)
+    spaced = [{"role": "user", "content": "  Where is\n support? "}]
+    assert cache_key("gpt", spaced, temperature=0, stream=True, timeout=5) == base
+    assert cache_key("gpt", MESSAGES, temperature=1) != base
+    assert cache_key("other", MESSAGES, temperature=0) != base
+
+
+def test_memory_then_disk_hits(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path)
+    assert cache.get("k") is None
+    cache.put("k", "reply")
+    assert cache.get("k") == "reply"
+    assert cache.stats == {"memory_hits": 1, "disk_hits": 0, "misses": 1}
+
+    # A new process only has the disk tier; the hit is promoted to memory
+    restarted = ResponseCache(path)
+    assert restarted.get("k") == "reply"
+    assert restarted.get("k") == "reply"
+    assert restarted.stats == {"memory_hits": 1, "disk_hits": 1, "misses": 0}
+
+
+def test_hot_entry_expires_from_memory(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=60)
+    cache.put("k", "reply")
+    clock[0] += 59
+    assert cache.get("k") == "reply"
+    clock[0] += 2
+    assert cache.get("k") is None
+    assert "k" not in cache.memory
+    assert cache.stats["misses"] == 1
+
+
+def test_promotion_keeps_the_original_age(tmp_path, clock):
+    path = str(tmp_path / "responses.sqlite3")
+    ResponseCache(path, ttl_seconds=60).put("k", "reply")
+    restarted = ResponseCache(path, ttl_seconds=60)
+    clock[0] += 50
+    assert restarted.get("k") == "reply"
+    clock[0] += 20
+    assert restarted.get("k") is None
+
+
+def test_memory_tier_is_a_bounded_lru(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), memory_items=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert list(cache.memory) == ["a", "c"]
+    # Evicted from memory, still on disk
+    assert cache.get("b") == "2"
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_disk_tier_keeps_the_most_recently_used_rows(tmp_path, clock):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path, memory_items=0, max_rows=2)
+    for key in ("a", "b"):
+        cache.put(key, key)
+        clock[0] += 1
+    cache.get("a")
+    clock[0] += 1
+    cache.put("c", "c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert cache.get("c") == "c"
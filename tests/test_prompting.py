@@ -0,0 +1,77 @@
+import pytest
+
+from trading_assistant import prompting
+from trading_assistant.prompting import (
+    ESTIMATE_MARGIN, MESSAGE_OVERHEAD, REPLY_PRIMING, PromptAssembler, compact_history, count_tokens,
+    truncate_to_tokens
+)
+
+
+@pytest.fixture(params=[True, False], ids=["exact", "estimated"])
+def exact(request, monkeypatch):
+    monkeypatch.setattr(prompting, "exact_counts", lambda model="gpt-3.5-turbo": request.param)
+    return request.param
+
+
+def cost(messages):
+    return REPLY_PRIMING + sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+
+def turns(count):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} " + "word " * 20}
+            for i in range(count)]
+
+
+def test_estimated_counts_hold_back_a_margin(exact):
+    assembler = PromptAssembler(1000)
+    assert assembler.budget == (1000 if exact else int(1000 * (1 - ESTIMATE_MARGIN)))
+    _, report = assembler.assemble("system", "question")
+    assert report["estimated"] is not exact
+
+
+def test_truncate_to_tokens_keeps_a_fitting_prefix():
+    text = "support and resistance " * 200
+    short = truncate_to_tokens(text, 50)
+    assert text.startswith(short)
+    assert count_tokens(short) <= 50 < count_tokens(short + text[len(short):len(short) + 20])
+    assert truncate_to_tokens("short", 50) == "short"
+
+
+def test_prompt_fits_the_budget(exact):
+    knowledge = [f"- [Book p.{i}] " + "levels " * 40 for i in range(30)]
+    messages, report = PromptAssembler(600).assemble("You are a coach.", "Where is support?",
+                                                     knowledge=knowledge, history=turns(40))
+    assert report["used"] <= report["budget"]
+    assert 0 < report["knowledge"] < len(knowledge)
+    assert messages[0]["role"] == "system" and messages[-1]["content"] == "Where is support?"
+
+
+def test_history_keeps_the_newest_turns_in_order(exact):
+    history = turns(40)
+    messages, report = PromptAssembler(400).assemble("system", "question", history=history)
+    kept = messages[1:-1]
+    assert 0 < report["history"] < len(history)
+    assert kept == history[-len(kept):]
+
+
+def test_best_knowledge_goes_in_first(exact):
+    knowledge = ["first match " * 30, "second match " * 30, "third match " * 30]
+    messages, report = PromptAssembler(250).assemble("system", "question", knowledge=knowledge)
+    assert report["knowledge"] >= 1
+    system = messages[0]["content"]
+    assert knowledge[0] in system
+    assert (knowledge[2] in system) <= (knowledge[1] in system)
+
+
+def test_oversized_user_turn_is_truncated(exact):
+    messages, report = PromptAssembler(300).assemble("system", "candle " * 2000)
+    assert len(messages[-1]["content"]) < len("candle " * 2000)
+    assert cost(messages) <= report["budget"] + MESSAGE_OVERHEAD
+
+
+def test_compact_history_drops_the_oldest_lines():
+    summary = compact_history("", turns(10), max_tokens=60)
+    lines = summary.splitlines()
+    assert lines and lines[-1].startswith("- assistant: turn 9")
+    assert sum(count_tokens(line) + 1 for line in lines) <= 60
+    assert "turn 0" not in summary
@@ -0,0 +1,69 @@
+from trading_assistant.retrieval import BM25Index, fuse_results, tokenize
+
+
+def chunks(*texts):
+    return [{"text": text, "page": 1} for text in texts]
+
+
+def test_tokenize_drops_stopwords_and_keeps_numbers():
+    assert tokenize("The RSI is above 70.5 on the daily") == ["rsi", "above", "70.5", "daily"]
+
+
+def test_rare_terms_outrank_common_ones():
+    index = BM25Index()
+    index.add_document("Trends", chunks("trend support trend", "trend resistance"))
+    index.add_document("Patterns", chunks("trend wedge breakout"))
+
+    results = index.search("trend wedge", k=3)
+    assert [name for _, name, _ in results][0] == "Patterns"
+    assert len(results) == 3
+    assert results[0][0] > results[1][0] >= results[2][0]
+
+
+def test_add_document_replaces_and_add_chunks_appends():
+    index = BM25Index()
+    index.add_document("Book", chunks("support zones"))
+    index.add_chunks("Book", chunks("resistance zones"))
+    assert len(index) == 2
+
+    index.add_document("Book", chunks("volume profile"))
+    assert len(index) == 1
+    assert index.search("support") == []
+    assert index.search("volume")[0][2]["text"] == "volume profile"
+
+
+def test_remove_document_clears_its_postings():
+    index = BM25Index()
+    index.add_document("A", chunks("wyckoff spring"))
+    index.add_document("B", chunks("spring test"))
+    index.remove_document("A")
+
+    assert "wyckoff" not in index.postings
+    assert [name for _, name, _ in index.search("spring")] == ["B"]
+    assert index.total_length == sum(index.lengths.values())
+
+
+def test_search_can_be_restricted_to_documents():
+    index = BM25Index()
+    index.add_document("A", chunks("stop loss placement"))
+    index.add_document("B", chunks("stop loss sizing"))
+    assert [name for _, name, _ in index.search("stop loss", names={"B"})] == ["B"]
+
+
+def test_fusion_favours_chunks_found_by_several_retrievers():
+    shared = {"text": "found twice", "page": 1}
+    lexical = [(9.0, "A", {"text": "lexical only", "page": 1}), (5.0, "A", shared)]
+    dense = [(0.9, "B", {"text": "dense only", "page": 2}), (0.8, "A", shared)]
+
+    fused = fuse_results([lexical, dense], k=3, rank_constant=60)
+    assert fused[0][2] is shared
+    assert fused[0][0] == 2 / 62
+    assert {chunk["text"] for _, _, chunk in fused[1:]} == {"lexical only", "dense only"}
+    assert len(fuse_results([lexical, dense], k=1)) == 1
+
+
+def test_fusion_ignores_score_scales():
+    lexical = [(1000.0, "A", {"text": "a", "page": 1})]
+    dense = [(0.1, "B", {"text": "b", "page": 1})]
+    first, second = fuse_results([lexical, dense], k=2)
+    assert first[0] == second[0]
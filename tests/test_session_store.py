@@ -0,0 +1,51 @@
+from trading_assistant.session_store import SessionStore
+
+
+def test_records_survive_a_restart(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    store = SessionStore(path)
+    for i in range(10):
+        store.append("s1", "chat", {"role": "user", "content": f"turn {i}"})
+    store.append("s1", "analysis", {"file_name": "AAPL.png"})
+    store.append("s2", "chat", {"role": "user", "content": "other session"})
+    reply = {"role": "assistant", "content": ""}
+    store.append("s1", "chat", reply)
+    reply["content"] = "streamed reply"
+    store.update(reply)
+
+    restored = SessionStore(path)
+    assert restored.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    window = restored.latest("s1", "chat", limit=3)
+    assert [r["content"] for r in window] == ["turn 8", "turn 9", "streamed reply"]
+    assert window[-1]["record_id"] == reply["record_id"]
+    assert restored.count("s1", "chat") == 11
+    assert restored.latest("s1", "analysis")[0]["file_name"] == "AAPL.png"
+    assert [r["content"] for r in restored.latest("s2", "chat")] == ["other session"]
+
+
+def test_paging_walks_back_from_the_window(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.sqlite3"))
+    ids = [store.append("s1", "chat", {"content": str(i)}) for i in range(7)]
+
+    window = store.latest("s1", "chat", limit=2)
+    older = store.page("s1", "chat", before_id=window[0]["record_id"], limit=3)
+    assert [r["content"] for r in older] == ["2", "3", "4"]
+    assert store.count("s1", "chat", before_id=older[0]["record_id"]) == 2
+    assert [r["record_id"] for r in store.page("s1", "chat", before_id=ids[2])] == ids[:2]
+
+
+def test_delete_and_prune(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.sqlite3"))
+    kept = store.append("s1", "upload", {"name": "a.csv"})
+    dropped = store.append("s1", "upload", {"name": "b.csv"})
+    store.append("s1", "chat", {"content": "hi"})
+
+    store.delete("s1", "upload", dropped)
+    assert store.get("s1", dropped) is None
+    assert store.get("s1", kept)["name"] == "a.csv"
+    assert store.get("s2", kept) is None
+
+    store.delete("s1", "chat")
+    assert store.count("s1", "chat") == 0
+    assert store.prune(3600) == 0
+    assert store.prune(-1) == 1
@@ -0,0 +1 @@
+"""Support modules for the Trading AI Assistant Streamlit app."""
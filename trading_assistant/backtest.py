@@ -0,0 +1,241 @@
+"""Vectorised long-only backtests and parallel parameter sweeps.
+
+A strategy turns OHLCV arrays into entry and exit signals, evaluated at
+each bar's close and filled at the next bar's open. Positions, trades,
+stop-loss/take-profit exits and the equity curve are all derived with
+whole-array operations; nothing loops bar by bar:
+
+- the position state is the forward-filled last signal,
+- trades are its 0 -> 1 and 1 -> 0 transitions,
+- each trade is cut short at the first bar whose low/high crosses its
+  stop or target (found with one ``np.unique`` over the hit bars),
+- per-bar returns are mark-to-market close-to-close while held.
+
+``sweep`` runs many parameter sets on a process pool. The price arrays
+are placed in shared memory once, and workers attach to them instead
+of receiving a pickled copy per task.
+"""
+
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from trading_assistant.indicators import rsi, sma
+
+FIELDS = ("open", "high", "low", "close")
+
+# Bars per year when the data has no timestamps (daily bars)
+DEFAULT_BARS_PER_YEAR = 252
+
+
+def _shifted_extreme(values, n, reducer, fill):
+    """``reducer`` over the ``n`` bars before each bar (excluding it)."""
+    out = np.full(len(values), fill)
+    if len(values) > n:
+        out[n:] = reducer(sliding_window_view(values, n), axis=1)[:-1]
+    return out
+
+
+def sma_cross(data, fast=20, slow=50):
+    """Long while the fast SMA is above the slow SMA."""
+    fast_ma, slow_ma = sma(data["close"], int(fast)), sma(data["close"], int(slow))
+    above = fast_ma > slow_ma
+    return above, ~above & np.isfinite(slow_ma)
+
+
+def rsi_reversion(data, period=14, lower=30, upper=70):
+    """Buy oversold, sell overbought."""
+    values = rsi(data["close"], int(period))
+    return values < lower, values > upper
+
+
+def breakout(data, lookback=20):
+    """Buy a close above the prior ``lookback``-bar high; sell below the prior half-lookback low."""
+    lookback = int(lookback)
+    highest = _shifted_extreme(data["high"], lookback, np.max, np.inf)
+    lowest = _shifted_extreme(data["low"], max(lookback // 2, 1), np.min, -np.inf)
+    return data["close"] > highest, data["close"] < lowest
+
+
+# Strategy name -> (signal function, default parameter grid)
+STRATEGIES = {
+    "SMA crossover": (sma_cross, {"fast": [10, 20, 30], "slow": [50, 100, 200]}),
+    "RSI mean reversion": (rsi_reversion, {"period": [7, 14, 21], "lower": [20, 30], "upper": [70, 80]}),
+    "Breakout": (breakout, {"lookback": [10, 20, 55, 100]}),
+}
+
+
+def positions(entries, exits):
+    """1 while long, 0 while flat; an exit on the same bar as an entry wins."""
+    events = np.where(exits, -1, np.where(entries, 1, 0))
+    if not events.any():
+        return np.zeros(len(events), dtype=np.int8)
+    last = np.maximum.accumulate(np.where(events != 0, np.arange(len(events)), -1))
+    state = np.where(last >= 0, events[np.maximum(last, 0)], -1)
+    return (state == 1).astype(np.int8)
+
+
+def simulate(data, entries, exits, stop_loss=None, take_profit=None, fee=0.0):
+    """Simulate a long-only strategy.
+
+    ``stop_loss`` and ``take_profit`` are fractions of the entry price
+    (0.02 = 2%); ``fee`` is charged per side as a fraction of notional.
+    Returns ``(equity, trades)`` where ``trades`` is a dict of arrays
+    ``entry``, ``exit`` (bar indices), ``entry_price``, ``exit_price``
+    and ``ret``.
+    """
+    open_, high, low, close = (np.asarray(data[f], dtype=np.float64) for f in FIELDS)
+    n = len(close)
+    held = positions(entries, exits)
+    # Signals act on the next bar's open
+    held = np.concatenate(([0], held[:-1]))
+    change = np.diff(np.concatenate(([0], held, [0])))
+    entry = np.flatnonzero(change == 1)
+    exit_ = np.flatnonzero(change == -1)  # first flat bar; == n if still open at the end
+    entry_price = open_[entry]
+    exit_price = np.where(exit_ < n, open_[np.minimum(exit_, n - 1)], close[-1])
+    exit_bar = np.minimum(exit_, n - 1)
+
+    if len(entry) and (stop_loss or take_profit):
+        # Trade id for every bar held, to broadcast each trade's levels
+        trade_of_bar = np.cumsum(change[:n] == 1) - 1
+        in_trade = held.astype(bool)
+        stop_level = entry_price * (1 - stop_loss) if stop_loss else np.full(len(entry), -np.inf)
+        target_level = entry_price * (1 + take_profit) if take_profit else np.full(len(entry), np.inf)
+        ids = trade_of_bar[in_trade]
+        bars = np.flatnonzero(in_trade)
+        stopped = low[bars] <= stop_level[ids]
+        targeted = high[bars] >= target_level[ids]
+        hit = stopped | targeted
+        trades_hit, first = np.unique(ids[hit], return_index=True)
+        hit_bars = bars[hit][first]
+        # A gap through the level fills at the open; both in one bar assumes the stop
+        hit_price = np.where(
+            stopped[hit][first],
+            np.minimum(stop_level[trades_hit], open_[hit_bars]),
+            np.maximum(target_level[trades_hit], open_[hit_bars])
+        )
+        exit_price[trades_hit] = hit_price
+        exit_bar[trades_hit] = hit_bars
+        exit_[trades_hit] = hit_bars + 1
+
+    trade_ret = (exit_price * (1 - fee)) / (entry_price * (1 + fee)) - 1
+
+    # Mark-to-market bar returns while held: interior bars close-to-close,
+    # entry bars from the fill, exit bars to the exit price
+    coverage = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(coverage, entry, 1)
+    np.add.at(coverage, exit_bar + 1, -1)
+    holding = np.cumsum(coverage[:n]) > 0
+    previous_close = np.concatenate(([close[0]], close[:-1]))
+    bar_ret = np.where(holding, close / previous_close - 1, 0.0)
+    bar_ret[entry] = close[entry] / (entry_price * (1 + fee)) - 1
+    exit_from = np.where(exit_bar == entry, entry_price * (1 + fee), previous_close[exit_bar])
+    bar_ret[exit_bar] = exit_price * (1 - fee) / exit_from - 1
+    equity = np.cumprod(1 + bar_ret)
+
+    trades = {"entry": entry, "exit": exit_bar, "entry_price": entry_price,
+              "exit_price": exit_price, "ret": trade_ret}
+    return equity, trades
+
+
+def bars_per_year(times):
+    if times is None or len(times) < 2:
+        return DEFAULT_BARS_PER_YEAR
+    seconds = np.median(np.diff(times).astype("timedelta64[s]").astype(np.int64))
+    return 365.25 * 86400 / seconds if seconds > 0 else DEFAULT_BARS_PER_YEAR
+
+
+def summarize(equity, trades, periods_per_year=DEFAULT_BARS_PER_YEAR):
+    """CAGR, max drawdown, Sharpe, win rate and friends."""
+    returns = np.diff(np.concatenate(([1.0], equity))) / np.concatenate(([1.0], equity[:-1]))
+    years = len(equity) / periods_per_year
+    final = float(equity[-1]) if len(equity) else 1.0
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else np.zeros(1)
+    std = returns.std()
+    return {
+        "total_return": final - 1,
+        "cagr": final ** (1 / years) - 1 if years > 0 and final > 0 else -1.0,
+        "max_drawdown": float(drawdown.min()),
+        "sharpe": float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+        "trades": int(len(trades["ret"])),
+        "win_rate": float((trades["ret"] > 0).mean()) if len(trades["ret"]) else 0.0,
+        "exposure": float((trades["exit"] - trades["entry"] + 1).sum() / len(equity)) if len(equity) else 0.0,
+    }
+
+
+def run(data, strategy, params=None, stop_loss=None, take_profit=None, fee=0.0):
+    """Backtest one parameter set; returns ``(equity, trades, stats)``."""
+    signal, _ = STRATEGIES[strategy]
+    entries, exits = signal(data, **(params or {}))
+    equity, trades = simulate(data, entries, exits, stop_loss, take_profit, fee)
+    return equity, trades, summarize(equity, trades, bars_per_year(data.get("time")))
+
+
+def parameter_grid(grid, samples=None, seed=0):
+    """Every combination of ``grid``, or ``samples`` random ones."""
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    if samples is not None and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    return combos
+
+
+class SharedArrays:
+    """OHLC arrays copied once into a shared-memory block for worker processes."""
+
+    def __init__(self, data):
+        stacked = np.stack([np.asarray(data[f], dtype=np.float64) for f in FIELDS])
+        self.shape = stacked.shape
+        self.memory = shared_memory.SharedMemory(create=True, size=stacked.nbytes)
+        np.ndarray(self.shape, dtype=np.float64, buffer=self.memory.buf)[:] = stacked
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.memory.close()
+        self.memory.unlink()
+
+
+# Worker-side view of the shared arrays, attached once per process
+_worker = {}
+
+
+def _attach(name, shape, periods_per_year):
+    memory = shared_memory.SharedMemory(name=name)
+    arrays = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+    _worker.update(memory=memory, periods=periods_per_year,
+                   data={f: arrays[i] for i, f in enumerate(FIELDS)})
+
+
+def _run_shared(strategy, params, stop_loss, take_profit, fee):
+    signal, _ = STRATEGIES[strategy]
+    entries, exits = signal(_worker["data"], **params)
+    equity, trades = simulate(_worker["data"], entries, exits, stop_loss, take_profit, fee)
+    return params, summarize(equity, trades, _worker["periods"])
+
+
+def sweep(data, strategy, combos, stop_loss=None, take_profit=None, fee=0.0, workers=None):
+    """Backtest every parameter set in ``combos`` on a process pool.
+
+    Yields ``(params, stats)`` as results complete.
+    """
+    workers = workers or min(len(combos), os.cpu_count() or 1)
+    periods = bars_per_year(data.get("time"))
+    if workers <= 1:
+        for params in combos:
+            yield params, run(data, strategy, params, stop_loss, take_profit, fee)[2]
+        return
+    with SharedArrays(data) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shared.memory.name, shared.shape, periods)) as pool:
+            futures = [pool.submit(_run_shared, strategy, params, stop_loss, take_profit, fee)
+                       for params in combos]
+            for future in futures:
+                yield future.result()
@@ -0,0 +1,245 @@
+"""Columnar, memory-mapped store of OHLCV bars per symbol and timeframe.
+
+    python -m trading_assistant.bar_store ~/prices/*.csv --timeframe 1d
+
+Each series is a directory ``root/<symbol>/<timeframe>/`` of raw column
+files, one contiguous little-endian array per column:
+
+  time.i8        -- int64 nanoseconds since the epoch, ascending
+  open.f8, high.f8, low.f8, close.f8, volume.f8
+                 -- float64 prices and volume
+  meta.json      -- whether the source had a volume column
+
+Writes only ever append: bars not newer than the last stored one are
+dropped, and the time column is written last, so a reader (in this or
+another process) never sees a timestamp whose prices are not there yet.
+Reads map the files and binary-search the time column, so a range of
+bars is a set of zero-copy views, however long the series.
+
+Uploads are imported once per content hash, each as its own series in
+``imports/<sha256>/`` rather than under a symbol: two uploads named
+``data.csv`` are different data. The same upload in a later session is
+a lookup rather than a parse. Symbol series are only written when a
+symbol is named explicitly, e.g. by the CLI.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from trading_assistant.indicators import bar_interval
+
+COLUMNS = {"time": "<i8", "open": "<f8", "high": "<f8", "low": "<f8", "close": "<f8", "volume": "<f8"}
+META = "meta.json"
+IMPORTS = "imports"
+
+# Timeframe of a series whose bar spacing cannot be inferred
+UNKNOWN_TIMEFRAME = "raw"
+
+
+def column_path(directory, name):
+    return os.path.join(directory, f"{name}.{COLUMNS[name][1:]}")
+
+
+def safe_name(name):
+    """``name`` usable as a single path component."""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", str(name)).strip("._")
+    if not name:
+        raise ValueError("Empty symbol or timeframe")
+    return name
+
+
+class Series:
+    """One series (a symbol and timeframe, or an imported upload), memory-mapped read-only."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META), encoding="utf-8") as f:
+            self.has_volume = json.load(f)["volume"]
+        self.columns = {name: self._map(name) for name in COLUMNS}
+        # The time column is written last, so its length is the committed one
+        self.length = len(self.columns["time"])
+        self.time = self.columns["time"][:self.length]
+
+    def _map(self, name):
+        path = column_path(self.directory, name)
+        if not os.path.getsize(path):
+            return np.zeros(0, dtype=COLUMNS[name])
+        return np.memmap(path, dtype=COLUMNS[name], mode="r")
+
+    def __len__(self):
+        return self.length
+
+    def bounds(self, start=None, end=None):
+        """Row range of the bars with ``start <= time <= end`` (nanoseconds or datetime64)."""
+        lo = 0 if start is None else int(np.searchsorted(self.time, _ns(start), side="left"))
+        hi = self.length if end is None else int(np.searchsorted(self.time, _ns(end), side="right"))
+        return lo, max(lo, hi)
+
+    def rows(self, lo, hi):
+        """Bars ``lo:hi`` as read-only views, in the ``read_ohlcv`` layout."""
+        out = {name: self.columns[name][lo:hi] for name in COLUMNS}
+        out["time"] = out["time"].view("datetime64[ns]")
+        if not self.has_volume:
+            out["volume"] = None
+        return out
+
+    def slice(self, start=None, end=None):
+        return self.rows(*self.bounds(start, end))
+
+    def tail(self, n):
+        return self.rows(max(0, self.length - n), self.length)
+
+
+def _ns(value):
+    if isinstance(value, (np.datetime64, str)):
+        return np.datetime64(value, "ns").astype(np.int64)
+    return int(value)
+
+
+class BarStore:
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.open_series = {}  # directory -> Series
+        os.makedirs(os.path.join(root, IMPORTS), exist_ok=True)
+
+    def directory(self, symbol, timeframe):
+        return os.path.join(self.root, safe_name(symbol), safe_name(timeframe))
+
+    def symbols(self):
+        return sorted(name for name in os.listdir(self.root)
+                      if name != IMPORTS and os.path.isdir(os.path.join(self.root, name)))
+
+    def timeframes(self, symbol=None):
+        """Timeframes stored for ``symbol``, or for any symbol."""
+        symbols = [safe_name(symbol)] if symbol else self.symbols()
+        found = set()
+        for name in symbols:
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                found.update(tf for tf in os.listdir(path) if os.path.exists(os.path.join(path, tf, META)))
+        return sorted(found)
+
+    def series(self, symbol, timeframe):
+        """The mapped series, or None. Reopened when another writer has appended."""
+        return self._open(self.directory(symbol, timeframe))
+
+    def _open(self, directory):
+        try:
+            committed = os.path.getsize(column_path(directory, "time")) // 8
+        except OSError:
+            return None
+        with self.lock:
+            series = self.open_series.get(directory)
+            if series is None or len(series) != committed:
+                series = self.open_series[directory] = Series(directory)
+            return series
+
+    def append(self, symbol, timeframe, data):
+        """Append the bars of ``data`` newer than the last stored one; returns how many.
+
+        ``data`` is a ``read_ohlcv`` dict, sorted by time, with a time column.
+        """
+        if data.get("time") is None:
+            raise ValueError("Bars need a time column to be stored")
+        with self.lock:
+            return self._append(self.directory(symbol, timeframe), data)
+
+    def _append(self, directory, data):
+        if not os.path.exists(os.path.join(directory, META)):
+            os.makedirs(directory, exist_ok=True)
+            for name in COLUMNS:
+                open(column_path(directory, name), "ab").close()
+            with open(os.path.join(directory, META), "w", encoding="utf-8") as f:
+                json.dump({"volume": data.get("volume") is not None}, f)
+        times = np.asarray(data["time"]).astype("datetime64[ns]").view(np.int64)
+        path = column_path(directory, "time")
+        size = os.path.getsize(path)
+        if size:
+            with open(path, "rb") as f:
+                f.seek(size - 8)
+                last = int(np.frombuffer(f.read(8), dtype="<i8")[0])
+            first_new = int(np.searchsorted(times, last, side="right"))
+        else:
+            first_new = 0
+        if first_new >= len(times):
+            return 0
+        # A write cut short leaves price columns longer than the time
+        # column; trim them so the new rows line up
+        for name in ("open", "high", "low", "close", "volume"):
+            with open(column_path(directory, name), "r+b") as f:
+                f.truncate(size)
+        # Time last: its length is what readers trust
+        for name in ("open", "high", "low", "close", "volume", "time"):
+            if name == "time":
+                values = times
+            elif data.get(name) is None:
+                values = np.zeros(len(times))
+            else:
+                values = data[name]
+            with open(column_path(directory, name), "ab") as f:
+                f.write(np.ascontiguousarray(values[first_new:], dtype=COLUMNS[name]).tobytes())
+        return len(times) - first_new
+
+    def imported(self, key):
+        """The series a file with content hash ``key`` was imported as, or None."""
+        return self._open(os.path.join(self.root, IMPORTS, safe_name(key)))
+
+    def import_bars(self, key, data):
+        """Store parsed bars as the series of content hash ``key``, once.
+
+        Each file gets a series of its own, so two different files with
+        the same name never share bars. It is written to a scratch
+        directory and renamed into place, so a half-written import is
+        never found.
+        """
+        series = self.imported(key)
+        if series is not None:
+            return series
+        if data.get("time") is None:
+            raise ValueError("Bars need a time column to be stored")
+        target = os.path.join(self.root, IMPORTS, safe_name(key))
+        scratch = tempfile.mkdtemp(dir=os.path.join(self.root, IMPORTS), prefix=".import-")
+        with self.lock:
+            self._append(scratch, data)
+        try:
+            os.rename(scratch, target)
+        except OSError:
+            # Imported by another session in the meantime
+            shutil.rmtree(scratch, ignore_errors=True)
+        return self.imported(key)
+
+
+def main(argv=None):
+    from trading_assistant.config import BAR_STORE_DIR
+    from trading_assistant.ohlcv import read_ohlcv
+
+    parser = argparse.ArgumentParser(description="Append CSV/Parquet OHLCV files to the bar store.")
+    parser.add_argument("files", nargs="+", help="One file per symbol, named after it (e.g. AAPL.csv)")
+    parser.add_argument("--timeframe", help="Timeframe label (default: inferred from the bar spacing)")
+    parser.add_argument("--store", default=BAR_STORE_DIR, help=f"Store directory (default: {BAR_STORE_DIR})")
+    args = parser.parse_args(argv)
+
+    store = BarStore(args.store)
+    for path in args.files:
+        name = os.path.basename(path)
+        try:
+            with open(path, "rb") as f:
+                data = read_ohlcv(f.read(), name)
+            timeframe = args.timeframe or bar_interval(data["time"]) or UNKNOWN_TIMEFRAME
+            added = store.append(os.path.splitext(name)[0], timeframe, data)
+        except Exception as exc:
+            print(f"{name}: skipped ({exc})")
+            continue
+        print(f"{name}: {added:,} new {timeframe} bars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Rate-limit-aware retries for backend calls."""
+
+import random
+import time
+
+RETRYABLE_ERRORS = {
+    "RateLimitError", "ServiceUnavailableError", "Timeout", "TryAgain",
+    "APIConnectionError", "APITimeoutError", "InternalServerError"
+}
+
+
+def is_retryable(exc):
+    """True for 429s, 5xx responses and transient connection errors."""
+    status = getattr(exc, "http_status", None) or getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(exc).__name__ in RETRYABLE_ERRORS
+
+
+def retry_after(exc):
+    """Seconds the server asked us to wait, if it said so."""
+    headers = getattr(exc, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def with_retries(call, retries=5, base_delay=1.0, max_delay=30.0, sleep=time.sleep):
+    """Run ``call()``, retrying retryable errors with full-jitter backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception as exc:
+            if attempt == retries or not is_retryable(exc):
+                raise
+            delay = retry_after(exc)
+            if delay is None:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            sleep(delay)
+
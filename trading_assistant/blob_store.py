@@ -0,0 +1,128 @@
+"""Content-addressed on-disk store for uploaded files.
+
+Blobs are keyed by SHA-256 and sharded as ``root/ab/cd/<digest>``, so
+identical uploads are stored once whatever their file name. Sessions
+hold only small handles and take a reference on each blob they use.
+Unreferenced blobs stay on disk as a cache until the byte budget is
+exceeded, then the least recently used ones are evicted.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+
+class BlobStore:
+    def __init__(self, root, budget_bytes):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.lock = threading.Lock()
+        self.sizes = {}
+        self.last_used = {}
+        self.refs = {}
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        # Rebuild sizes and recency from disk; references do not survive
+        # a restart because the sessions holding them do not either.
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if len(name) == 64:
+                    stat = os.stat(os.path.join(dirpath, name))
+                    self.sizes[name] = stat.st_size
+                    self.last_used[name] = stat.st_mtime
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    @property
+    def total_bytes(self):
+        return sum(self.sizes.values())
+
+    def __contains__(self, digest):
+        return digest in self.sizes
+
+    def size(self, digest):
+        """Bytes stored for ``digest``, or 0 if it is gone."""
+        with self.lock:
+            return self.sizes.get(digest, 0)
+
+    def put(self, data):
+        """Store ``data`` (bytes-like) and return its digest, taking a reference."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            if digest not in self.sizes:
+                target = self.path(digest)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, target)
+                self.sizes[digest] = len(data)
+            self.refs[digest] = self.refs.get(digest, 0) + 1
+            self.last_used[digest] = time.time()
+            self._evict()
+        return digest
+
+    def acquire(self, digest):
+        with self.lock:
+            if digest not in self.sizes:
+                return False
+            self.refs[digest] = self.refs.get(digest, 0) + 1
+            return True
+
+    def release(self, digest):
+        with self.lock:
+            count = self.refs.get(digest, 0) - 1
+            if count > 0:
+                self.refs[digest] = count
+            else:
+                self.refs.pop(digest, None)
+            self._evict()
+
+    @contextmanager
+    def open(self, digest):
+        """Memory-map the blob read-only for a ``with`` block; None if it is gone.
+
+        The ``mmap`` is file-like (read/seek) and supports the buffer
+        protocol, so it can be handed to PIL or hashed without copying the
+        contents into the Python heap. It is unmapped when the block ends,
+        so nothing read from it may keep a view of its buffer.
+        """
+        try:
+            with open(self.path(digest), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            mapped = None
+        else:
+            with self.lock:
+                self.last_used[digest] = time.time()
+        try:
+            yield mapped
+        finally:
+            if mapped is not None:
+                mapped.close()
+
+    def _evict(self):
+        # Caller holds the lock
+        total = self.total_bytes
+        if total <= self.budget_bytes:
+            return
+        candidates = sorted(
+            (d for d in self.sizes if not self.refs.get(d)),
+            key=lambda d: self.last_used.get(d, 0)
+        )
+        for digest in candidates:
+            if total <= self.budget_bytes:
+                break
+            try:
+                os.remove(self.path(digest))
+            except FileNotFoundError:
+                pass
+            total -= self.sizes.pop(digest)
+            self.last_used.pop(digest, None)
@@ -0,0 +1,135 @@
+"""Perceptual hashes of chart screenshots and a BK-tree to look them up.
+
+Traders re-upload near-identical screenshots of the same chart: a few
+more candles, a slightly different crop, another export format. The
+content hash of the upload differs every time, but these perceptual
+hashes barely move. Each is 64 bits from a tiny grayscale copy:
+
+- dHash: is each pixel of a 9x8 copy brighter than its left neighbour,
+- pHash: is each of the lowest 8x8 DCT coefficients of a 32x32 copy
+  above their median (the DC term excluded).
+
+``chart_hash`` concatenates the two into 128 bits. Distance is the
+Hamming distance, which is a metric, so a BK-tree answers "everything
+within ``r`` bits" by visiting only the branches the triangle
+inequality allows; a session's worth of charts is searched well under
+a millisecond.
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+HASH_BITS = 128
+
+# Hamming distance (of 128 bits) under which two charts count as the same view
+SIMILAR_DISTANCE = 24
+
+DCT_SIZE = 32
+_n = np.arange(DCT_SIZE)
+# Orthonormal DCT-II basis; rows are frequencies
+DCT_MATRIX = np.sqrt(2 / DCT_SIZE) * np.cos(np.pi * (2 * _n[None, :] + 1) * _n[:, None] / (2 * DCT_SIZE))
+DCT_MATRIX[0] /= np.sqrt(2)
+
+try:
+    popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def popcount(x):
+        return bin(x).count("1")
+
+
+def _gray(image, size):
+    return np.asarray(image.convert("L").resize(size, Image.BOX), dtype=np.float64)
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def dhash(image):
+    pixels = _gray(image, (9, 8))
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(image):
+    pixels = _gray(image, (DCT_SIZE, DCT_SIZE))
+    low = (DCT_MATRIX @ pixels @ DCT_MATRIX.T)[:8, :8].ravel()
+    return _bits_to_int(low > np.median(low[1:]))
+
+
+def chart_hash(data):
+    """128-bit perceptual hash of encoded image bytes, as 32 hex digits."""
+    image = Image.open(io.BytesIO(data))
+    image.draft("L", (256, 256))
+    return f"{phash(image):016x}{dhash(image):016x}"
+
+
+def hamming(a, b):
+    return popcount(a ^ b)
+
+
+def similarity(distance):
+    """Share of matching bits, for display."""
+    return 1 - distance / HASH_BITS
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes under Hamming distance.
+
+    Each node holds one hash, the keys filed under it and its children
+    by distance. Hashes may be given as ints or hex strings.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value, key):
+        value = int(value, 16) if isinstance(value, str) else value
+        self.size += 1
+        if self.root is None:
+            self.root = (value, [key], {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [key], {})
+                return
+            node = child
+
+    def remove(self, key):
+        """Drop ``key`` wherever it is filed; the node stays as a routing point."""
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if key in node[1]:
+                node[1].remove(key)
+                self.size -= 1
+                return True
+            stack.extend(node[2].values())
+        return False
+
+    def search(self, value, radius=SIMILAR_DISTANCE):
+        """``(distance, key)`` for every key within ``radius``, nearest first."""
+        value = int(value, 16) if isinstance(value, str) else value
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = popcount(value ^ node[0])
+            if distance <= radius:
+                found.extend((distance, key) for key in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
@@ -0,0 +1,79 @@
+"""Runtime settings shared by the app and its support modules."""
+
+import os
+
+# Where persistent indexes and stores live; shared by every session.
+DATA_DIR = os.environ.get(
+    "TRADING_AI_DATA_DIR",
+    os.path.join(os.path.expanduser("~"), ".trading_ai_assistant")
+)
+
+# Read-only knowledge library built by ``python -m trading_assistant.ingest``.
+LIBRARY_DIR = os.environ.get("TRADING_AI_LIBRARY_DIR", os.path.join(DATA_DIR, "library"))
+
+
+# Soft cap on the upload blob store; unreferenced blobs are evicted past it.
+UPLOAD_BUDGET_BYTES = int(os.environ.get("TRADING_AI_UPLOAD_BUDGET_MB", "2048")) * 1024 * 1024
+
+# In-memory LRU for preview/analysis renditions, per process.
+RENDITION_CACHE_BYTES = int(os.environ.get("TRADING_AI_RENDITION_CACHE_MB", "64")) * 1024 * 1024
+
+# Completion jobs (chat replies, chart analyses) in flight at once, across all sessions.
+JOB_WORKERS = int(os.environ.get("TRADING_AI_JOB_WORKERS", "8"))
+
+# Prompt tokens available for system, knowledge, history and user turn
+# (gpt-3.5-turbo has a 4096-token window; replies use up to 600). Counted
+# with tiktoken; without it, counts are estimated and 10% is held back.
+PROMPT_TOKEN_BUDGET = int(os.environ.get("TRADING_AI_PROMPT_TOKENS", "3400"))
+
+# Chat-completion backend: "openai" (hosted API) or "local" (bundled stub server).
+LLM_BACKEND = os.environ.get("TRADING_AI_LLM_BACKEND", "openai")
+LLM_MODEL = os.environ.get("TRADING_AI_LLM_MODEL", "gpt-3.5-turbo")
+LLM_BASE_URLS = {
+    "openai": os.environ.get("TRADING_AI_OPENAI_BASE_URL", "https://api.openai.com/v1"),
+    "local": os.environ.get("TRADING_AI_LOCAL_BASE_URL", "http://127.0.0.1:8808/v1"),
+}
+LLM_CONNECT_TIMEOUT = float(os.environ.get("TRADING_AI_LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.environ.get("TRADING_AI_LLM_READ_TIMEOUT", "60"))
+LLM_RETRIES = int(os.environ.get("TRADING_AI_LLM_RETRIES", "3"))
+
+# Metrics: rotating JSONL event log ("" disables) and optional Prometheus port (0 disables).
+METRICS_LOG = os.environ.get("TRADING_AI_METRICS_LOG", os.path.join(DATA_DIR, "metrics.jsonl"))
+METRICS_PORT = int(os.environ.get("TRADING_AI_METRICS_PORT", "0"))
+# Minimum seconds between per-session memory snapshots (they walk session state).
+METRICS_SESSION_INTERVAL = float(os.environ.get("TRADING_AI_METRICS_SESSION_INTERVAL", "30"))
+
+# Worker processes for backtest parameter sweeps (0 = one per CPU).
+SWEEP_WORKERS = int(os.environ.get("TRADING_AI_SWEEP_WORKERS", "0"))
+
+# Memory-mapped OHLCV bars per symbol and timeframe; uploads of price data
+# are imported here once and read back as slices.
+BAR_STORE_DIR = os.environ.get("TRADING_AI_BAR_STORE_DIR", os.path.join(DATA_DIR, "bars"))
+
+# Folder of per-symbol OHLCV files (SYMBOL.csv / SYMBOL.parquet) for the
+# watchlist scanner, and its worker processes (0 = one per CPU).
+WATCHLIST_DIR = os.environ.get("TRADING_AI_WATCHLIST_DIR", os.path.join(DATA_DIR, "watchlist"))
+SCAN_WORKERS = int(os.environ.get("TRADING_AI_SCAN_WORKERS", "0"))
+
+# Most recent chat turns and analyses kept in session state; older ones
+# stay in the session store and are paged in on demand.
+SESSION_CHAT_WINDOW = int(os.environ.get("TRADING_AI_SESSION_CHAT_WINDOW", "20"))
+SESSION_ANALYSES_WINDOW = int(os.environ.get("TRADING_AI_SESSION_ANALYSES_WINDOW", "10"))
+
+# Memory budgets: per session for chat, analyses and knowledge held in
+# session state, and for all sessions of the process together (sessions
+# are held to an equal share once the total is exceeded).
+SESSION_MEMORY_BUDGET_BYTES = int(os.environ.get("TRADING_AI_SESSION_MEMORY_MB", "64")) * 1024 * 1024
+GLOBAL_MEMORY_BUDGET_BYTES = int(os.environ.get("TRADING_AI_GLOBAL_MEMORY_MB", "1024")) * 1024 * 1024
+# Upload blobs one session may hold on disk; the oldest unused are removed past it.
+SESSION_UPLOAD_BUDGET_BYTES = int(os.environ.get("TRADING_AI_SESSION_UPLOAD_MB", "256")) * 1024 * 1024
+# Tokens of the rolling summary that replaces chat turns leaving memory.
+CHAT_SUMMARY_TOKENS = int(os.environ.get("TRADING_AI_CHAT_SUMMARY_TOKENS", "400"))
+
+# Live tick feed: a CSV/JSONL file to tail, or tcp://host:port ("" disables).
+LIVE_FEED = os.environ.get("TRADING_AI_LIVE_FEED", "")
+# Bar timeframes built from the ticks, finished bars kept per symbol and
+# timeframe, and the most symbols tracked.
+LIVE_TIMEFRAMES = os.environ.get("TRADING_AI_LIVE_TIMEFRAMES", "1m,5m,15m,1h")
+LIVE_BAR_CAPACITY = int(os.environ.get("TRADING_AI_LIVE_BAR_CAPACITY", "1000"))
+LIVE_MAX_SYMBOLS = int(os.environ.get("TRADING_AI_LIVE_MAX_SYMBOLS", "500"))
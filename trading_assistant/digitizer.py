@@ -0,0 +1,164 @@
+"""Approximate OHLC series from candlestick chart screenshots.
+
+Works on the decoded RGB pixels of a chart (the analysis-sized
+rendition is plenty) with vectorised NumPy passes:
+
+1. classify pixels as bullish or bearish candle colour by hue,
+2. take the plot area as the bounding box of candle pixels,
+3. split the plot into candles at empty pixel columns,
+4. read each candle's wick (high/low) and body (open/close) rows,
+5. map rows to prices from two calibration prices, or to 0-100
+   relative units when none are given.
+
+The result is a few KB of numbers that can feed local indicators or a
+prompt, instead of the image itself.
+"""
+
+import io
+from collections import namedtuple
+
+import numpy as np
+
+from trading_assistant.metrics import span
+
+# Hue ranges in degrees; wide enough for green/teal and red/pink palettes
+BULLISH_HUES = (75.0, 190.0)
+BEARISH_HUES = (330.0, 30.0)
+MIN_SATURATION = 0.3
+MIN_VALUE = 0.25
+
+# Fewest candle pixels in a column before it counts as part of a candle
+MIN_COLUMN_PIXELS = 2
+
+DigitizedChart = namedtuple("DigitizedChart", ["ohlc", "bullish", "x", "plot_box", "calibrated"])
+
+
+def load_rgb(data):
+    """Decode encoded image bytes into an ``(h, w, 3)`` uint8 array."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def candle_masks(rgb):
+    """Boolean ``(bullish, bearish)`` pixel masks classified by hue."""
+    # Per-channel uint8 maximum/minimum; reducing over a length-3 axis is far slower
+    red, green, blue = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    high = np.maximum(np.maximum(red, green), blue)
+    chroma = high - np.minimum(np.minimum(red, green), blue)
+    # Saturation and brightness first; hue is only computed for the survivors,
+    # which on a typical chart are a small fraction of the pixels
+    coloured = (chroma >= MIN_SATURATION * high) & (high >= MIN_VALUE * 255) & (chroma > 0)
+    index = np.flatnonzero(coloured)
+    r, g, b = (channel.ravel()[index].astype(np.float32) for channel in (red, green, blue))
+    top = high.ravel()[index]
+    c = chroma.ravel()[index].astype(np.float32)
+    hue = np.select(
+        [top == r, top == g],
+        [((g - b) / c) % 6.0, (b - r) / c + 2.0],
+        (r - g) / c + 4.0
+    ) * 60.0
+
+    bullish = np.zeros(rgb.shape[:2], dtype=bool)
+    bearish = np.zeros(rgb.shape[:2], dtype=bool)
+    bullish.ravel()[index] = (hue >= BULLISH_HUES[0]) & (hue <= BULLISH_HUES[1])
+    bearish.ravel()[index] = (hue >= BEARISH_HUES[0]) | (hue <= BEARISH_HUES[1])
+    return bullish, bearish
+
+
+def column_runs(occupied):
+    """``(start, stop)`` pairs of consecutive True entries."""
+    edges = np.diff(np.concatenate(([0], occupied.astype(np.int8), [0])))
+    return np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def normalise_runs(runs):
+    """Repair column runs so that each one is a single candle.
+
+    Overlays such as moving-average lines can cut a candle into fragments,
+    which are merged back; candles drawn without a gap between them show
+    up as one wide run, which is split into equal parts.
+    """
+    if len(runs) < 3:
+        return runs
+    typical = np.median(runs[:, 1] - runs[:, 0])
+    merged = [list(runs[0])]
+    for start, stop in runs[1:]:
+        last = merged[-1]
+        if last[1] - last[0] < typical and stop - start < typical and stop - last[0] <= 1.25 * typical:
+            last[1] = stop
+        else:
+            merged.append([start, stop])
+    out = []
+    for start, stop in merged:
+        width = stop - start
+        parts = int(round(width / typical)) if width > 1.6 * typical else 1
+        bounds = np.linspace(start, stop, parts + 1).round().astype(int)
+        out.extend(zip(bounds[:-1], bounds[1:]))
+    return np.array(out, dtype=int)
+
+
+def digitize(rgb, top_price=None, bottom_price=None):
+    """Extract candles from an RGB chart image.
+
+    ``top_price`` and ``bottom_price`` are the prices of the highest wick
+    and the lowest wick visible on the chart; without them prices are in
+    relative units (0 = lowest low, 100 = highest high). Returns a
+    ``DigitizedChart`` with an ``(n, 4)`` OHLC array, oldest candle first,
+    or None if no candles were found.
+    """
+    with span("chart_digitize") as fields:
+        bullish, bearish = candle_masks(rgb)
+        mask = bullish | bearish
+        counts = mask.sum(axis=0)
+        occupied = counts >= MIN_COLUMN_PIXELS
+        if not occupied.any():
+            return None
+
+        # Plot area: bounding box of the candle pixels
+        rows = np.flatnonzero(mask[:, occupied].any(axis=1))
+        cols = np.flatnonzero(occupied)
+        plot_box = (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+        # Per-column wick extent: first and last candle row
+        height = mask.shape[0]
+        top = np.where(occupied, mask.argmax(axis=0), height)
+        bottom = np.where(occupied, height - 1 - mask[::-1].argmax(axis=0), -1)
+        bull_counts = bullish.sum(axis=0)
+
+        runs = normalise_runs(column_runs(occupied))
+        ohlc = np.empty((len(runs), 4))
+        is_bullish = np.empty(len(runs), dtype=bool)
+        for i, (start, stop) in enumerate(runs):
+            high_row = top[start:stop].min()
+            low_row = bottom[start:stop].max()
+            candle = mask[high_row:low_row + 1, start:stop]
+            # Body rows are filled at both edges (works for hollow candles too)
+            body = np.flatnonzero(candle[:, 0] & candle[:, -1]) if stop - start > 2 else np.array([])
+            body_top, body_bottom = (body[0], body[-1]) if len(body) else (0, low_row - high_row)
+            is_bullish[i] = bull_counts[start:stop].sum() * 2 >= counts[start:stop].sum()
+            open_row, close_row = (body_bottom, body_top) if is_bullish[i] else (body_top, body_bottom)
+            ohlc[i] = (open_row + high_row, high_row, low_row, close_row + high_row)
+
+        # Rows grow downwards; map the wick extremes onto the calibration prices
+        calibrated = top_price is not None and bottom_price is not None and top_price != bottom_price
+        if not calibrated:
+            top_price, bottom_price = 100.0, 0.0
+        first, last = ohlc[:, 1].min(), ohlc[:, 2].max()
+        scale = (top_price - bottom_price) / max(last - first, 1)
+        ohlc = top_price - (ohlc - first) * scale
+
+        fields["candles"] = len(ohlc)
+        return DigitizedChart(ohlc, is_bullish, runs.mean(axis=1), plot_box, calibrated)
+
+
+def series_text(chart, max_bars=80):
+    """Compact CSV of the most recent ``max_bars`` candles for a prompt."""
+    ohlc = chart.ohlc[-max_bars:]
+    span_ = np.ptp(chart.ohlc)
+    decimals = int(max(0, min(6, 3 - np.floor(np.log10(span_))))) if span_ > 0 else 2
+    unit = "price" if chart.calibrated else "relative units, 0 = lowest low, 100 = highest high"
+    lines = [f"# {len(ohlc)} of {len(chart.ohlc)} candles, oldest first ({unit})", "open,high,low,close"]
+    lines.extend(",".join(f"{v:.{decimals}f}" for v in row) for row in ohlc)
+    return "\n".join(lines)
@@ -0,0 +1,107 @@
+"""Downscaled renditions of uploaded chart images.
+
+Each image is decoded once, when it is first seen, into a small preview
+thumbnail and an analysis-sized copy. Renditions are keyed by the
+upload's content hash, written to disk and kept in an in-memory LRU, so
+reruns only ever touch a few hundred KB of already-encoded PNG.
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from trading_assistant.metrics import span
+
+# Longest edge, in pixels, of each rendition
+RENDITIONS = {
+    "thumb": 300,
+    "analysis": 1280,
+}
+
+
+def build_renditions(source):
+    """Decode ``source`` (a file-like object) once and encode every rendition."""
+    with span("image_decode") as fields:
+        image = Image.open(source)
+        fields["pixels"] = image.width * image.height
+        largest = max(RENDITIONS.values())
+        # Let JPEG decode at reduced scale instead of full resolution
+        image.draft("RGB", (largest, largest))
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        out = {}
+        for kind, edge in sorted(RENDITIONS.items(), key=lambda item: -item[1]):
+            image.thumbnail((edge, edge), Image.LANCZOS, reducing_gap=2.0)
+            buf = io.BytesIO()
+            image.save(buf, format="PNG", optimize=False)
+            out[kind] = buf.getvalue()
+        return out
+
+
+class RenditionCache:
+    """Disk-backed renditions with an in-memory LRU capped at ``max_bytes``."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, digest, kind):
+        return os.path.join(self.directory, digest[:2], f"{digest}.{kind}.png")
+
+    def _remember(self, key, data):
+        # Caller holds the lock
+        if key in self.entries:
+            self.total_bytes -= len(self.entries.pop(key))
+        self.entries[key] = data
+        self.total_bytes += len(data)
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= len(evicted)
+
+    def build(self, digest, source):
+        """Create all renditions for ``digest`` from ``source`` unless present."""
+        if all(os.path.exists(self._path(digest, kind)) for kind in RENDITIONS):
+            return True
+        try:
+            renditions = build_renditions(source)
+        except Exception:
+            return False
+        os.makedirs(os.path.dirname(self._path(digest, "thumb")), exist_ok=True)
+        with self.lock:
+            for kind, data in renditions.items():
+                with open(self._path(digest, kind), "wb") as f:
+                    f.write(data)
+                self._remember((digest, kind), data)
+        return True
+
+    def get(self, digest, kind, load=None):
+        """Encoded PNG bytes for a rendition, or None if unavailable.
+
+        ``load`` is an optional callable returning a context manager over
+        the original image as a file-like object, or over None if it is
+        gone (e.g. ``BlobStore.open``); it is only called if the rendition
+        was never built.
+        """
+        key = (digest, kind)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        path = self._path(digest, kind)
+        if not os.path.exists(path):
+            if load is None:
+                return None
+            with load() as source:
+                if source is None or not self.build(digest, source):
+                    return None
+        with open(path, "rb") as f:
+            data = f.read()
+        with self.lock:
+            self._remember(key, data)
+        return data
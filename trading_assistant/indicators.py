@@ -0,0 +1,234 @@
+"""Vectorised technical indicators over OHLCV arrays.
+
+Every indicator is a whole-array NumPy computation (cumulative sums,
+sliding windows, a blocked closed form for exponential smoothing), so a
+few million bars take well under a second. ``analyze`` runs them all
+and condenses the latest values into a small report used for the risk
+metrics and, via ``facts_text``, the analysis prompt.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Bars of recent history used for support/resistance and volume profile
+LEVEL_LOOKBACK = 1000
+PIVOT_WINDOW = 5
+PROFILE_BINS = 24
+VALUE_AREA = 0.7
+
+# ATR as a percentage of price -> risk level
+RISK_LEVELS = ((1.0, "Low"), (2.5, "Medium"), (5.0, "Medium-High"), (float("inf"), "High"))
+
+
+def sma(x, n):
+    """Simple moving average; the first ``n - 1`` values are NaN."""
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        csum = np.cumsum(np.insert(x - x[0], 0, 0.0))
+        out[n - 1:] = (csum[n:] - csum[:-n]) / n + x[0]
+    return out
+
+
+def ema(x, n=None, alpha=None):
+    """Exponential moving average seeded with the first value.
+
+    ``y[t] = y[t-1] + alpha * (x[t] - y[t-1])`` is evaluated in closed form
+    over blocks short enough that the decay powers stay in float range.
+    """
+    alpha = 2.0 / (n + 1) if alpha is None else alpha
+    decay = 1.0 - alpha
+    if decay <= 0:
+        return np.array(x, dtype=np.float64)
+    out = np.empty(len(x))
+    if not len(x):
+        return out
+    block = max(1, int(500 / -np.log(decay)))
+    previous = x[0]
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        steps = np.arange(1, len(chunk) + 1)
+        growth = decay ** -steps
+        out[start:start + len(chunk)] = decay ** steps * (previous + alpha * np.cumsum(chunk * growth))
+        previous = out[start + len(chunk) - 1]
+    return out
+
+
+def rolling_std(x, n):
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        centred = x - x.mean()
+        s1 = np.cumsum(np.insert(centred, 0, 0.0))
+        s2 = np.cumsum(np.insert(centred * centred, 0, 0.0))
+        mean = (s1[n:] - s1[:-n]) / n
+        out[n - 1:] = np.sqrt(np.maximum((s2[n:] - s2[:-n]) / n - mean * mean, 0.0))
+    return out
+
+
+def bollinger(close, n=20, width=2.0):
+    """``(middle, upper, lower)`` bands."""
+    middle = sma(close, n)
+    deviation = rolling_std(close, n) * width
+    return middle, middle + deviation, middle - deviation
+
+
+def rsi(close, n=14):
+    """Wilder's relative strength index."""
+    change = np.diff(close, prepend=close[0])
+    gain = ema(np.maximum(change, 0.0), alpha=1.0 / n)
+    loss = ema(np.maximum(-change, 0.0), alpha=1.0 / n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + gain / loss)
+    out[loss == 0] = 100.0
+    out[(loss == 0) & (gain == 0)] = 50.0
+    out[:n] = np.nan
+    return out
+
+
+def true_range(high, low, close):
+    previous = np.concatenate(([close[0]], close[:-1]))
+    return np.maximum(high, previous) - np.minimum(low, previous)
+
+
+def atr(high, low, close, n=14):
+    """Average true range with Wilder smoothing."""
+    out = ema(true_range(high, low, close), alpha=1.0 / n)
+    out[:n - 1] = np.nan
+    return out
+
+
+def pivots(high, low, window=PIVOT_WINDOW):
+    """Indices of swing highs and swing lows ``window`` bars either side."""
+    if len(high) < 2 * window + 1:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    span = 2 * window + 1
+    highs = np.flatnonzero(sliding_window_view(high, span).max(axis=1) == high[window:-window]) + window
+    lows = np.flatnonzero(sliding_window_view(low, span).min(axis=1) == low[window:-window]) + window
+    return highs, lows
+
+
+def cluster_levels(prices, tolerance):
+    """Group nearby prices into levels; returns ``[(level, touches)]`` strongest first."""
+    if not len(prices):
+        return []
+    ordered = np.sort(prices)
+    group = np.concatenate(([0], np.cumsum(np.diff(ordered) > tolerance)))
+    touches = np.bincount(group)
+    levels = np.bincount(group, weights=ordered) / touches
+    rank = np.lexsort((-levels, -touches))
+    return [(float(levels[i]), int(touches[i])) for i in rank]
+
+
+def volume_profile(high, low, close, volume, bins=PROFILE_BINS, value_area=VALUE_AREA):
+    """Point of control and value area from volume traded at typical price."""
+    typical = (high + low + close) / 3.0
+    counts, edges = np.histogram(typical, bins=bins, weights=volume)
+    if counts.sum() <= 0:
+        return None
+    centres = (edges[:-1] + edges[1:]) / 2.0
+    poc = int(np.argmax(counts))
+    # Value area: highest-volume bins until they hold ``value_area`` of the volume
+    ranked = np.argsort(counts)[::-1]
+    inside = ranked[:np.searchsorted(np.cumsum(counts[ranked]), value_area * counts.sum()) + 1]
+    return {"poc": float(centres[poc]), "value_area": (float(edges[inside.min()]), float(edges[inside.max() + 1]))}
+
+
+def bar_interval(times):
+    """Typical spacing of ``times`` as a short label such as ``1h`` or ``1d``."""
+    if times is None or len(times) < 2:
+        return None
+    seconds = float(np.median(np.diff(times[-LEVEL_LOOKBACK:]).astype("timedelta64[s]").astype(np.int64)))
+    for unit, size in (("w", 604800), ("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size and seconds % size == 0:
+            return f"{int(seconds // size)}{unit}"
+    return f"{int(seconds)}s"
+
+
+def trend_signal(last, sma20, sma50, ema20, rsi14):
+    """``(trend, confidence %)`` from the agreement of simple directional signals.
+
+    Missing values (None or NaN) are left out of the vote.
+    """
+    pairs = ((last, sma50), (sma20, sma50), (last, ema20), (rsi14, 50.0))
+    signals = [np.sign(a - b) for a, b in pairs if a is not None and b is not None and np.isfinite(a - b)]
+    agreement = float(np.mean(signals)) if signals else 0.0
+    trend = "up" if agreement > 0.25 else "down" if agreement < -0.25 else "sideways"
+    return trend, round(50 + 50 * abs(agreement))
+
+
+def analyze(data, absolute=True):
+    """Indicator report for ``{"open", "high", "low", "close", "volume", "time"}`` arrays.
+
+    ``absolute`` is False for series in relative units (uncalibrated
+    digitized charts), where percentages of price are meaningless.
+    """
+    high, low, close = data["high"], data["low"], data["close"]
+    last = float(close[-1])
+    sma20, sma50 = sma(close, 20)[-1], sma(close, 50)[-1]
+    ema20 = ema(close, 20)[-1]
+    rsi14 = rsi(close)[-1]
+    atr14 = atr(high, low, close)[-1]
+    _, upper, lower = bollinger(close)
+
+    trend, confidence = trend_signal(last, sma20, sma50, ema20, rsi14)
+
+    # Support/resistance from clustered swing points in recent history
+    recent = slice(max(0, len(close) - LEVEL_LOOKBACK), None)
+    swing_highs, swing_lows = pivots(high[recent], low[recent])
+    tolerance = 0.5 * atr14 if np.isfinite(atr14) and atr14 > 0 else 0.003 * abs(last) or 1e-9
+    levels = cluster_levels(np.concatenate((high[recent][swing_highs], low[recent][swing_lows])), tolerance)
+    # Prefer levels touched more than once when there are any
+    levels = [lv for lv in levels if lv[1] > 1] or levels
+    supports = sorted((lv for lv in levels if lv[0] < last), key=lambda lv: -lv[0])[:3]
+    resistances = sorted((lv for lv in levels if lv[0] >= last), key=lambda lv: lv[0])[:3]
+
+    profile = None
+    if data.get("volume") is not None:
+        profile = volume_profile(high[recent], low[recent], close[recent], data["volume"][recent])
+
+    atr_pct = 100.0 * atr14 / abs(last) if absolute and last and np.isfinite(atr14) else None
+    risk_level = next(label for bound, label in RISK_LEVELS if atr_pct < bound) if atr_pct is not None else None
+
+    def value(v):
+        return float(v) if np.isfinite(v) else None
+
+    return {
+        "bars": len(close),
+        "interval": bar_interval(data.get("time")),
+        "absolute": absolute,
+        "last_close": last,
+        "sma_20": value(sma20), "sma_50": value(sma50), "ema_20": value(ema20),
+        "rsi_14": value(rsi14), "atr_14": value(atr14), "atr_pct": atr_pct,
+        "bb_upper": value(upper[-1]), "bb_lower": value(lower[-1]),
+        "trend": trend, "confidence": confidence,
+        "risk_level": risk_level,
+        "stop_long": value(last - 1.5 * atr14), "stop_short": value(last + 1.5 * atr14),
+        "supports": supports, "resistances": resistances,
+        "profile": profile
+    }
+
+
+def _fmt(report):
+    scale = abs(report["last_close"]) or 1.0
+    decimals = int(min(6, max(0, 5 - np.floor(np.log10(scale)))))
+    return lambda v: "n/a" if v is None else f"{v:.{decimals}f}"
+
+
+def facts_text(report):
+    """A few lines of computed facts for the analysis prompt."""
+    f = _fmt(report)
+    unit = "" if report["absolute"] else " (relative units)"
+    lines = [
+        f"Bars: {report['bars']}" + (f" ({report['interval']})" if report["interval"] else "")
+        + f"; last close {f(report['last_close'])}{unit}",
+        f"Trend: {report['trend']} ({report['confidence']}% signal agreement); "
+        f"SMA20 {f(report['sma_20'])}, SMA50 {f(report['sma_50'])}, EMA20 {f(report['ema_20'])}",
+        f"RSI14 {report['rsi_14']:.1f}" if report["rsi_14"] is not None else "RSI14 n/a",
+        f"ATR14 {f(report['atr_14'])}" + (f" ({report['atr_pct']:.2f}% of price)" if report["atr_pct"] else ""),
+        f"Bollinger(20, 2): {f(report['bb_lower'])} - {f(report['bb_upper'])}",
+        "Support (touches): " + (", ".join(f"{f(p)} (x{n})" for p, n in report["supports"]) or "none found"),
+        "Resistance (touches): " + (", ".join(f"{f(p)} (x{n})" for p, n in report["resistances"]) or "none found"),
+    ]
+    if report["profile"]:
+        low, high = report["profile"]["value_area"]
+        lines.append(f"Volume POC {f(report['profile']['poc'])}; value area {f(low)} - {f(high)}")
+    return "\n".join(lines)
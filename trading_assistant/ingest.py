@@ -0,0 +1,294 @@
+"""Build the knowledge library from a directory tree of PDFs, text and markdown.
+
+    python -m trading_assistant.ingest ~/trading-books [more dirs...]
+
+Files are extracted, chunked, tokenized and embedded on a process pool;
+each worker writes one segment (``segments/<sha256>.npz``) per file.
+Re-running is incremental: a file whose size and mtime match the
+manifest is skipped without being read, and one whose content hash
+matches an existing segment is not re-extracted. Segments are then
+merged into a new memory-mapped generation that the app opens
+read-only (see ``trading_assistant.library``). The library mirrors the
+given directories: files that disappeared are dropped from it.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from trading_assistant.config import LIBRARY_DIR
+from trading_assistant.knowledge import chunk_pages
+from trading_assistant.library import CURRENT, MANIFEST, library_terms
+from trading_assistant.vector_index import DIM, HashingEmbedder
+
+INGEST_EXTENSIONS = (".pdf", ".txt", ".md")
+
+# Chunks embedded per batch inside a worker
+EMBED_BATCH = 256
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_file_pages(path):
+    """``(page_no, text)`` pairs of a PDF, or of a text file read in line batches."""
+    if path.lower().endswith(".pdf"):
+        from trading_assistant.pdf_ingest import PDF_AVAILABLE, extract_range, page_count, page_ranges
+        if not PDF_AVAILABLE:
+            raise RuntimeError("PyMuPDF is not installed")
+        for start, stop in page_ranges(page_count(path)):
+            yield from extract_range(path, start, stop)
+        return
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        while lines := f.readlines(1 << 20):
+            yield 1, "".join(lines)
+
+
+def segment_path(library, digest):
+    return os.path.join(library, "segments", f"{digest}.npz")
+
+
+def build_segment(path, library):
+    """Hash, extract, chunk, tokenize and embed one file. Runs inside a worker.
+
+    Returns the file's manifest fields; the arrays go to a segment file
+    named by content hash, which is reused if the same content was
+    ingested before (under any path).
+    """
+    digest = file_digest(path)
+    target = segment_path(library, digest)
+    if os.path.exists(target):
+        with np.load(target) as segment:
+            return {"sha256": digest, **json.loads(str(segment["info"]))}
+
+    embedder = HashingEmbedder()
+    texts, pages, lengths, vectors = [], [], [], []
+    post_term, post_chunk, post_tf = [], [], []
+    vocabulary = {}
+    batch = []
+    for chunk in chunk_pages(iter_file_pages(path)):
+        counts = Counter(library_terms(chunk["text"]))
+        for term, tf in counts.items():
+            post_term.append(vocabulary.setdefault(term, len(vocabulary)))
+            post_chunk.append(len(texts))
+            post_tf.append(min(tf, 65535))
+        texts.append(chunk["text"].encode("utf-8"))
+        pages.append(chunk["page"] or 1)
+        lengths.append(sum(counts.values()))
+        batch.append(chunk["text"])
+        if len(batch) >= EMBED_BATCH:
+            vectors.append(embedder.embed(batch))
+            batch = []
+    if batch:
+        vectors.append(embedder.embed(batch))
+
+    info = {"chunks": len(texts), "chars": sum(len(t) for t in texts), "pages": max(pages, default=0)}
+    terms = np.array(list(vocabulary), dtype=str) if vocabulary else np.zeros(0, dtype="U1")
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".npz")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(
+            f,
+            info=np.array(json.dumps(info)),
+            text=np.frombuffer(b"".join(texts), dtype=np.uint8),
+            offsets=np.concatenate(([0], np.cumsum([len(t) for t in texts], dtype=np.int64))),
+            pages=np.array(pages, dtype=np.int32),
+            lengths=np.array(lengths, dtype=np.int32),
+            vectors=np.concatenate(vectors) if vectors else np.zeros((0, DIM), dtype=np.float32),
+            terms=terms,
+            post_term=np.array(post_term, dtype=np.int32),
+            post_chunk=np.array(post_chunk, dtype=np.int32),
+            post_tf=np.array(post_tf, dtype=np.uint16),
+        )
+    os.replace(tmp, target)
+    return {"sha256": digest, **info}
+
+
+def scan(roots):
+    """``{absolute path: (document name, size, mtime_ns)}`` for every ingestible file."""
+    found = {}
+    for root in roots:
+        root = os.path.abspath(root)
+        for dirpath, _, files in os.walk(root):
+            for name in sorted(files):
+                if name.lower().endswith(INGEST_EXTENSIONS):
+                    path = os.path.join(dirpath, name)
+                    stat = os.stat(path)
+                    found[path] = (os.path.relpath(path, root), stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+def load_manifest(library):
+    try:
+        with open(os.path.join(library, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"files": {}, "generation": 0}
+
+
+def write_atomic(path, text):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def merge(library, entries, generation):
+    """Merge the segments of ``entries`` into generation directory ``generation``."""
+    directory = os.path.join(library, generation)
+    os.makedirs(directory, exist_ok=True)
+    entries = [e for e in entries if e["chunks"]]
+    total = sum(e["chunks"] for e in entries)
+    vectors = np.lib.format.open_memmap(os.path.join(directory, "vectors.npy"), mode="w+",
+                                        dtype=np.float32, shape=(total, DIM))
+    offsets, chunk_doc, chunk_page, lengths = [np.zeros(1, dtype=np.int64)], [], [], []
+    seg_terms, post_term, post_chunk, post_tf = [], [], [], []
+    base = text_base = 0
+    with open(os.path.join(directory, "texts.bin"), "wb") as texts:
+        for doc, entry in enumerate(entries):
+            with np.load(segment_path(library, entry["sha256"])) as segment:
+                n = len(segment["pages"])
+                texts.write(segment["text"].tobytes())
+                offsets.append(segment["offsets"][1:] + text_base)
+                text_base += int(segment["offsets"][-1])
+                chunk_doc.append(np.full(n, doc, dtype=np.int32))
+                chunk_page.append(segment["pages"])
+                lengths.append(segment["lengths"])
+                vectors[base:base + n] = segment["vectors"]
+                seg_terms.append(segment["terms"])
+                post_term.append(segment["post_term"])
+                post_chunk.append(segment["post_chunk"] + base)
+                post_tf.append(segment["post_tf"])
+                base += n
+    vectors.flush()
+    del vectors
+
+    # One sorted vocabulary; each segment's local term ids map into it
+    terms = np.unique(np.concatenate(seg_terms)) if seg_terms else np.zeros(0, dtype="U1")
+    global_term = np.concatenate([np.searchsorted(terms, local)[ids] for local, ids in zip(seg_terms, post_term)]) \
+        if seg_terms else np.zeros(0, dtype=np.int64)
+    order = np.argsort(global_term, kind="stable")
+    term_offsets = np.concatenate(([0], np.cumsum(np.bincount(global_term, minlength=len(terms))))).astype(np.int64)
+
+    def concat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+    arrays = {
+        "offsets": concat(offsets, np.int64),
+        "chunk_doc": concat(chunk_doc, np.int32),
+        "chunk_page": concat(chunk_page, np.int32),
+        "lengths": concat(lengths, np.int32),
+        "terms": terms,
+        "term_offsets": term_offsets,
+        "post_chunk": concat(post_chunk, np.int32)[order],
+        "post_tf": concat(post_tf, np.uint16)[order],
+    }
+    for name, values in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    docs = [{"name": e["doc"], "source": e["path"], "chunks": e["chunks"], "chars": e["chars"],
+             "pages": e["pages"], "date": e["date"]} for e in entries]
+    built = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(os.path.join(directory, "docs.json"), "w", encoding="utf-8") as f:
+        json.dump({"docs": docs, "built": built}, f)
+    return total
+
+
+def ingest(roots, library=LIBRARY_DIR, workers=None, force=False, log=print):
+    """Bring the library at ``library`` in line with the files under ``roots``.
+
+    Returns a summary dict; no new generation is written if nothing changed.
+    """
+    started = time.perf_counter()
+    os.makedirs(os.path.join(library, "segments"), exist_ok=True)
+    manifest = load_manifest(library)
+    known = manifest["files"]
+    found = scan(roots)
+
+    files, todo = {}, []
+    for path, (doc, size, mtime_ns) in found.items():
+        entry = known.get(path)
+        if (not force and entry and entry["size"] == size and entry["mtime_ns"] == mtime_ns
+                and os.path.exists(segment_path(library, entry["sha256"]))):
+            files[path] = entry
+        else:
+            todo.append(path)
+    removed = sorted(set(known) - set(found))
+
+    failed = []
+    if todo:
+        if force:
+            for path in todo:
+                if path in known and os.path.exists(segment_path(library, known[path]["sha256"])):
+                    os.remove(segment_path(library, known[path]["sha256"]))
+        workers = workers or min(len(todo), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(build_segment, path, library): path for path in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                path = futures[future]
+                doc, size, mtime_ns = found[path]
+                try:
+                    info = future.result()
+                except Exception as e:
+                    failed.append(path)
+                    log(f"[{done}/{len(todo)}] failed {doc}: {e}")
+                    continue
+                files[path] = {"doc": doc, "path": path, "size": size, "mtime_ns": mtime_ns,
+                               "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **info}
+                log(f"[{done}/{len(todo)}] {doc}: {info['chunks']} chunks")
+
+    summary = {"files": len(files), "ingested": len(todo) - len(failed), "skipped": len(found) - len(todo),
+               "removed": len(removed), "failed": len(failed)}
+    changed = todo or removed or not os.path.exists(os.path.join(library, CURRENT))
+    if changed:
+        generation = f"gen-{manifest['generation'] + 1:06d}"
+        entries = sorted(files.values(), key=lambda e: e["doc"])
+        summary["chunks"] = merge(library, entries, generation)
+        write_atomic(os.path.join(library, MANIFEST),
+                     json.dumps({"files": files, "generation": manifest["generation"] + 1}))
+        write_atomic(os.path.join(library, CURRENT), generation)
+        # Readers keep their open memory maps of older generations (POSIX)
+        for name in os.listdir(library):
+            if name.startswith("gen-") and name != generation:
+                shutil.rmtree(os.path.join(library, name), ignore_errors=True)
+        # Segments no longer referenced by any file
+        live = {f"{e['sha256']}.npz" for e in files.values()}
+        for name in os.listdir(os.path.join(library, "segments")):
+            if name.endswith(".npz") and name not in live:
+                os.remove(os.path.join(library, "segments", name))
+        summary["generation"] = generation
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("roots", nargs="+", help="directories to ingest")
+    parser.add_argument("--library", default=LIBRARY_DIR, help=f"library directory (default {LIBRARY_DIR})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default one per CPU)")
+    parser.add_argument("--force", action="store_true", help="re-extract every file")
+    args = parser.parse_args(argv)
+    summary = ingest(args.roots, args.library, args.workers, args.force)
+    print(
+        f"{summary['files']} files in library: {summary['ingested']} ingested, {summary['skipped']} unchanged, "
+        f"{summary['removed']} removed, {summary['failed']} failed in {summary['seconds']}s"
+        + (f"; wrote {summary['generation']} ({summary['chunks']} chunks)" if "generation" in summary
+           else "; library already up to date")
+    )
+
+
+if __name__ == "__main__":
+    main()
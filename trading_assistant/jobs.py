@@ -0,0 +1,104 @@
+"""Background completion jobs that outlive the script run that started them.
+
+Streamlit reruns the whole script on every widget interaction, so a
+completion streamed inside the run freezes the page and is thrown away
+the moment the user clicks anything. Jobs instead run on a process-wide
+thread pool: ``submit`` returns at once, the worker writes its result
+into the job's ``record`` (the dict kept in session state) as it
+arrives, and each rerun renders whatever is there. ``cancel`` stops a
+queued job before it starts and asks a running one to stop; work
+functions check ``job.cancelled`` between chunks.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class Job:
+    def __init__(self, session, label, record):
+        self.id = uuid.uuid4().hex[:12]
+        self.session = session
+        self.label = label
+        self.record = record
+        self.status = QUEUED
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+        self.cancelled = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+
+class JobQueue:
+    def __init__(self, workers, keep_seconds=3600):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-job")
+        self.keep_seconds = keep_seconds
+        self.lock = threading.Lock()
+        self.jobs = {}  # id -> Job, in submission order
+
+    def submit(self, session, label, record, work, on_done=None):
+        """Run ``work(job)`` on the pool and return the job's id.
+
+        ``on_done(job)`` runs on the worker once the job has finished,
+        whatever the outcome, including a cancel before it started.
+        """
+        job = Job(session, label, record)
+        with self.lock:
+            self._prune()
+            self.jobs[job.id] = job
+        self.pool.submit(self._run, job, work, on_done)
+        return job.id
+
+    def _run(self, job, work, on_done):
+        with self.lock:
+            if job.status == CANCELLED:
+                work = None
+            else:
+                job.status = RUNNING
+        if work is not None:
+            try:
+                work(job)
+                job.status = CANCELLED if job.cancelled.is_set() else DONE
+            except Exception as exc:
+                job.status, job.error = FAILED, str(exc)
+        job.finished = time.time()
+        if on_done is not None:
+            on_done(job)
+
+    def _prune(self):
+        # Finished jobs are kept for a while so later reruns can report them
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [i for i, job in self.jobs.items() if job.finished and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def poll(self, job_id):
+        """The job with ``job_id``, or None if it is unknown (or long finished)."""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def session_jobs(self, session):
+        with self.lock:
+            return [job for job in self.jobs.values() if job.session == session]
+
+    def cancel(self, job_id):
+        """Stop a job; returns False if it had already finished."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or not job.active:
+                return False
+            job.cancelled.set()
+            if job.status == QUEUED:
+                job.status = CANCELLED
+        return True
+
+    def stats(self):
+        with self.lock:
+            active = [job for job in self.jobs.values() if job.active]
+        return {"running": sum(job.status == RUNNING for job in active),
+                "queued": sum(job.status == QUEUED for job in active)}
@@ -0,0 +1,48 @@
+"""Chunked storage for learned content (books, articles, notes)."""
+
+from datetime import datetime
+
+CHUNK_CHARS = 1500
+CHUNK_OVERLAP = 200
+
+
+def chunk_pages(pages, size=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    """Split a stream of ``(page_no, text)`` pairs into overlapping chunks.
+
+    Pages are consumed one at a time, so only the current window of text
+    is ever held in memory. Each chunk remembers the page it started on.
+    """
+    buffer = ""
+    start_page = None
+    for page_no, text in pages:
+        text = " ".join(text.split())
+        if not text:
+            continue
+        if start_page is None:
+            start_page = page_no
+        buffer = f"{buffer} {text}" if buffer else text
+        while len(buffer) >= size:
+            cut = buffer.rfind(" ", size - overlap, size)
+            if cut <= 0:
+                cut = size
+            yield {"text": buffer[:cut], "page": start_page}
+            buffer = buffer[max(cut - overlap, 0):].lstrip()
+            start_page = page_no
+    if buffer.strip():
+        yield {"text": buffer, "page": start_page}
+
+
+def chunk_text(text, size=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    """Chunk a plain string, treating it as a single page."""
+    return list(chunk_pages([(1, text)], size, overlap))
+
+
+def make_entry(chunk_count, chars, source, pages=1, date=None):
+    """Build a knowledge-base entry: a document's size, not its text."""
+    return {
+        "chunk_count": chunk_count,
+        "chars": chars,
+        "pages": pages,
+        "date": date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "source": source
+    }
@@ -0,0 +1,145 @@
+"""Read-only knowledge library built offline by ``trading_assistant.ingest``.
+
+A library directory holds one or more generations; ``CURRENT`` names the
+live one and is swapped atomically when the ingest CLI finishes, so a
+running app picks up a rebuilt library on its next search. Every array
+is memory-mapped, so opening a multi-GB library costs a few page faults
+and all server processes share the same page cache:
+
+  texts.bin      -- UTF-8 chunk texts back to back
+  offsets.npy    -- int64 start of each chunk in ``texts.bin`` (n + 1)
+  chunk_doc.npy  -- int32 document of each chunk
+  chunk_page.npy -- int32 page each chunk starts on
+  lengths.npy    -- int32 BM25 token count of each chunk
+  vectors.npy    -- float32 ``(n, DIM)`` hashed embeddings
+  terms.npy      -- sorted vocabulary
+  term_offsets.npy, post_chunk.npy, post_tf.npy
+                 -- CSR postings: the chunks and term frequencies of
+                    term ``t`` are ``post_*[term_offsets[t]:term_offsets[t+1]]``
+  docs.json      -- per document: name, source, chunks, chars, pages, date
+"""
+
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+from trading_assistant.retrieval import tokenize
+from trading_assistant.vector_index import HashingEmbedder
+
+CURRENT = "CURRENT"
+MANIFEST = "manifest.json"
+
+# Longer tokens are noise (URLs, hashes) and would widen the vocabulary dtype
+MAX_TERM_CHARS = 40
+
+# Rows scored per step of a dense search; bounds the score buffer
+DENSE_BLOCK = 65536
+
+ARRAYS = ("offsets", "chunk_doc", "chunk_page", "lengths", "vectors",
+          "terms", "term_offsets", "post_chunk", "post_tf")
+
+
+def library_terms(text):
+    return [t for t in tokenize(text) if len(t) <= MAX_TERM_CHARS]
+
+
+class Generation:
+    """One built generation of the library, memory-mapped."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+        path = os.path.join(directory, "texts.bin")
+        self.texts = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.zeros(0, np.uint8)
+        with open(os.path.join(directory, "docs.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.docs = meta["docs"]
+        self.built = meta.get("built")
+        self.avg_length = float(self.lengths.mean()) if len(self.lengths) else 1.0
+
+    def __len__(self):
+        return len(self.chunk_doc)
+
+    def chunk(self, i):
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return {"text": self.texts[start:stop].tobytes().decode("utf-8"), "page": int(self.chunk_page[i])}
+
+    def result(self, score, i):
+        return float(score), self.docs[self.chunk_doc[i]]["name"], self.chunk(i)
+
+
+class Library:
+    """Searches the live generation of an ingested library, if there is one."""
+
+    def __init__(self, root, k1=1.5, b=0.75):
+        self.root = root
+        self.k1 = k1
+        self.b = b
+        self.embedder = HashingEmbedder()
+        self.lock = threading.Lock()
+        self.generation = None
+        self.name = None
+        self.refresh()
+
+    def refresh(self):
+        """Switch to the current generation if the ingest CLI built a new one."""
+        try:
+            with open(os.path.join(self.root, CURRENT), encoding="utf-8") as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            return
+        with self.lock:
+            if name != self.name:
+                self.generation = Generation(os.path.join(self.root, name))
+                self.name = name
+
+    def __len__(self):
+        return len(self.generation) if self.generation else 0
+
+    def documents(self):
+        return self.generation.docs if self.generation else []
+
+    def search(self, query, k=5):
+        """BM25 over the library; same scoring as ``BM25Index.search``."""
+        gen = self.generation
+        if gen is None or not len(gen):
+            return []
+        n = len(gen)
+        chunks, scores = [], []
+        for term in set(library_terms(query)):
+            t = np.searchsorted(gen.terms, term)
+            if t >= len(gen.terms) or gen.terms[t] != term:
+                continue
+            start, stop = gen.term_offsets[t], gen.term_offsets[t + 1]
+            ids = np.asarray(gen.post_chunk[start:stop])
+            tf = gen.post_tf[start:stop].astype(np.float64)
+            idf = math.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * gen.lengths[ids] / gen.avg_length)
+            chunks.append(ids)
+            scores.append(idf * tf * (self.k1 + 1) / (tf + norm))
+        if not chunks:
+            return []
+        ids, inverse = np.unique(np.concatenate(chunks), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(scores))
+        top = np.argsort(-totals, kind="stable")[:k]
+        return [gen.result(totals[i], ids[i]) for i in top]
+
+    def search_dense(self, query, k=5):
+        """Cosine similarity against the hashed embeddings, block by block."""
+        gen = self.generation
+        if gen is None or not len(gen):
+            return []
+        q = self.embedder.embed([query])[0]
+        best_ids, best_scores = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        for start in range(0, len(gen), DENSE_BLOCK):
+            scores = gen.vectors[start:start + DENSE_BLOCK] @ q
+            take = min(k, len(scores))
+            top = np.argpartition(-scores, take - 1)[:take]
+            best_ids = np.concatenate((best_ids, top + start))
+            best_scores = np.concatenate((best_scores, scores[top]))
+        order = np.argsort(-best_scores, kind="stable")[:k]
+        return [gen.result(best_scores[i], best_ids[i]) for i in order if best_scores[i] > 0]
@@ -0,0 +1,438 @@
+"""Live ticks from a local feed, aggregated into multi-timeframe bars.
+
+A feed is a file another process appends to (tailed like ``tail -f``)
+or a TCP socket (``tcp://host:port``), one tick per line, either CSV
+``ts,symbol,price,size`` or JSON lines with the same keys. ``ts`` is
+epoch seconds or milliseconds; ``size`` may be omitted. A reader thread
+parses whatever has arrived as one block and hands it to
+``LiveMarket.ingest``, which:
+
+- groups the block by symbol and drops ticks that go back in time,
+- cuts each symbol's ticks into bars per timeframe with ``reduceat``,
+- pushes finished bars into fixed-size ring buffers,
+- updates each timeframe's indicators in O(1) per finished bar.
+
+A bar finishes when the first tick of a later bar arrives. Memory is
+bounded by ``max_symbols`` x timeframes x ``capacity`` bars, and the
+per-tick work is vectorised, so one process keeps up with well over a
+hundred thousand ticks per second. To try it without a real feed:
+
+    python -m trading_assistant.live_feed --to ~/ticks.csv --symbols 50 --rate 20000
+    TRADING_AI_LIVE_FEED=~/ticks.csv streamlit run app.py
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import socket
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from trading_assistant.indicators import trend_signal
+
+TICK_COLUMNS = ("ts", "symbol", "price", "size")
+
+BAR_FIELDS = ("time", "open", "high", "low", "close", "volume")
+TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(BAR_FIELDS))
+
+# Longest indicator window; rings always hold more bars than this
+LONG_WINDOW = 50
+
+# Moving sums are recomputed from the ring this often to shed rounding drift
+RESYNC_BARS = 4096
+
+# Bytes read from the feed per block
+READ_BLOCK = 1 << 20
+
+TIMEFRAME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_timeframes(text):
+    """``"1m,5m,1h"`` -> ``[("1m", 60), ("5m", 300), ("1h", 3600)]``."""
+    out = []
+    for label in (part.strip() for part in text.split(",")):
+        if label:
+            out.append((label, int(label[:-1]) * TIMEFRAME_UNITS[label[-1]]))
+    return out
+
+
+class BarRing:
+    """The last ``capacity`` finished bars, one row per field."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = np.zeros((len(BAR_FIELDS), capacity))
+        self.count = 0  # bars ever pushed
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def push(self, bar):
+        self.values[:, self.count % self.capacity] = bar
+        self.count += 1
+
+    def back(self, field, k=0):
+        """``field`` of the bar ``k`` bars before the latest."""
+        return self.values[field, (self.count - 1 - k) % self.capacity]
+
+    def arrays(self):
+        """A copy of every field, oldest bar first."""
+        order = np.arange(self.count - len(self), self.count) % self.capacity
+        return {name: self.values[i, order] for i, name in enumerate(BAR_FIELDS)}
+
+
+class RunningIndicators:
+    """SMA, EMA, RSI, ATR and Bollinger values, updated per finished bar.
+
+    Each update is O(1): moving sums add the new close and subtract the
+    one leaving the window (read back from the ring), and the Wilder
+    averages take one recursive step. The values match
+    ``trading_assistant.indicators`` run over every bar finished so far.
+    """
+
+    def __init__(self, bars, period=14, window=20):
+        self.bars = bars
+        self.period = period
+        self.window = window
+        self.base = 0.0  # first close; sums are kept relative to it
+        self.sums = {window: 0.0, LONG_WINDOW: 0.0}
+        self.squares = 0.0
+        self.ema = self.gain = self.loss = self.atr = None
+
+    def update(self):
+        """Fold in the bar just pushed to the ring."""
+        bars, n = self.bars, self.bars.count
+        close, high, low = bars.back(CLOSE), bars.back(HIGH), bars.back(LOW)
+        previous = bars.back(CLOSE, 1) if n > 1 else close
+        true_range = max(high, previous) - min(low, previous)
+        change = close - previous
+        if n == 1:
+            self.base = close
+            self.ema, self.gain, self.loss, self.atr = close, 0.0, 0.0, true_range
+        else:
+            self.ema += 2.0 / (self.window + 1) * (close - self.ema)
+            self.gain += (max(change, 0.0) - self.gain) / self.period
+            self.loss += (max(-change, 0.0) - self.loss) / self.period
+            self.atr += (true_range - self.atr) / self.period
+
+        if n % RESYNC_BARS == 0:
+            self._resync()
+            return
+        x = close - self.base
+        for window in self.sums:
+            self.sums[window] += x
+            if n > window:
+                self.sums[window] -= bars.back(CLOSE, window) - self.base
+        self.squares += x * x
+        if n > self.window:
+            old = bars.back(CLOSE, self.window) - self.base
+            self.squares -= old * old
+
+    def _resync(self):
+        bars = self.bars
+        for window in self.sums:
+            self.sums[window] = sum(bars.back(CLOSE, k) - self.base for k in range(min(window, bars.count)))
+        self.squares = sum((bars.back(CLOSE, k) - self.base) ** 2 for k in range(min(self.window, bars.count)))
+
+    def values(self):
+        n = self.bars.count
+        if not n:
+            return {}
+
+        def mean(window):
+            return self.sums[window] / window + self.base if n >= window else None
+
+        sma20, sma50 = mean(self.window), mean(LONG_WINDOW)
+        rsi = None
+        if n > self.period:
+            if self.loss == 0:
+                rsi = 50.0 if self.gain == 0 else 100.0
+            else:
+                rsi = 100.0 - 100.0 / (1.0 + self.gain / self.loss)
+        bands = (None, None)
+        if sma20 is not None:
+            centred = self.sums[self.window] / self.window
+            deviation = 2.0 * np.sqrt(max(self.squares / self.window - centred * centred, 0.0))
+            bands = (sma20 + deviation, sma20 - deviation)
+        last = self.bars.back(CLOSE)
+        trend, confidence = trend_signal(last, sma20, sma50, self.ema, rsi)
+        return {
+            "last_close": last, "sma_20": sma20, "sma_50": sma50, "ema_20": self.ema, "rsi_14": rsi,
+            "atr_14": self.atr if n >= self.period else None,
+            "bb_upper": bands[0], "bb_lower": bands[1], "trend": trend, "confidence": confidence
+        }
+
+
+class TimeframeBars:
+    """Bars of one symbol at one timeframe: a ring, its indicators and the bar still forming."""
+
+    def __init__(self, seconds, capacity):
+        self.seconds = seconds
+        self.bars = BarRing(max(capacity, LONG_WINDOW + 1))
+        self.indicators = RunningIndicators(self.bars)
+        self.forming = None  # [start, open, high, low, close, volume]
+
+    def add(self, ts, price, size):
+        """Fold in time-ordered ticks."""
+        start = np.floor(ts / self.seconds) * self.seconds
+        cut = np.flatnonzero(start[1:] != start[:-1]) + 1
+        first = np.concatenate(([0], cut))
+        last = np.concatenate((cut, [len(ts)])) - 1
+        runs = zip(start[first].tolist(), price[first].tolist(), np.maximum.reduceat(price, first).tolist(),
+                   np.minimum.reduceat(price, first).tolist(), price[last].tolist(),
+                   np.add.reduceat(size, first).tolist())
+        for run in runs:
+            bar = self.forming
+            if bar is not None and run[TIME] == bar[TIME]:
+                bar[HIGH] = max(bar[HIGH], run[HIGH])
+                bar[LOW] = min(bar[LOW], run[LOW])
+                bar[CLOSE] = run[CLOSE]
+                bar[VOLUME] += run[VOLUME]
+                continue
+            if bar is not None:
+                self.bars.push(bar)
+                self.indicators.update()
+            self.forming = list(run)
+
+
+class SymbolSeries:
+    def __init__(self, timeframes, capacity):
+        self.last_ts = -np.inf
+        self.frames = {label: TimeframeBars(seconds, capacity) for label, seconds in timeframes}
+
+    def add(self, ts, price, size):
+        # Ticks that go back in time (late or replayed) are dropped
+        keep = ts >= np.maximum.accumulate(np.concatenate(([self.last_ts], ts)))[:-1]
+        if not keep.all():
+            ts, price, size = ts[keep], price[keep], size[keep]
+        if len(ts):
+            self.last_ts = ts[-1]
+            for frame in self.frames.values():
+                frame.add(ts, price, size)
+        return int((~keep).sum())
+
+
+class LiveMarket:
+    """Every symbol seen on the feed, with bars per timeframe; thread-safe."""
+
+    def __init__(self, timeframes, capacity=1000, max_symbols=500):
+        self.timeframes = timeframes
+        self.capacity = capacity
+        self.max_symbols = max_symbols
+        self.lock = threading.Lock()
+        self.series = {}
+        self.ticks = 0
+        self.dropped = 0
+        self.errors = 0
+        self.source = None
+        self.history = deque()  # (time, ticks) over the last few seconds, for the rate
+        self.stop = threading.Event()
+
+    def ingest(self, ts, symbols, price, size):
+        """Add a block of ticks (arrays in arrival order)."""
+        codes, names = pd.factorize(symbols)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        with self.lock:
+            for k, name in enumerate(names):
+                idx = order[bounds[k]:bounds[k + 1]]
+                series = self.series.get(name)
+                if series is None:
+                    if len(self.series) >= self.max_symbols:
+                        self.dropped += len(idx)
+                        continue
+                    series = self.series[name] = SymbolSeries(self.timeframes, self.capacity)
+                self.dropped += series.add(ts[idx], price[idx], size[idx])
+            self.ticks += len(ts)
+            now = time.time()
+            self.history.append((now, self.ticks))
+            while len(self.history) > 2 and now - self.history[0][0] > 10:
+                self.history.popleft()
+
+    def symbols(self):
+        with self.lock:
+            return sorted(self.series)
+
+    def snapshot(self, symbol, timeframe):
+        """Finished bars, latest indicator values and the forming bar of one series."""
+        with self.lock:
+            series = self.series.get(symbol)
+            if series is None:
+                return None
+            frame = series.frames[timeframe]
+            return {"bars": frame.bars.arrays(), "count": frame.bars.count,
+                    "indicators": frame.indicators.values(),
+                    "forming": dict(zip(BAR_FIELDS, frame.forming)) if frame.forming else None}
+
+    def stats(self):
+        with self.lock:
+            rate = 0.0
+            if len(self.history) > 1:
+                (start, first), (end, last) = self.history[0], self.history[-1]
+                rate = (last - first) / (end - start) if end > start else 0.0
+            return {"symbols": len(self.series), "ticks": self.ticks, "dropped": self.dropped,
+                    "errors": self.errors, "source": self.source, "ticks_per_second": rate}
+
+    def follow(self, source, poll_interval=0.2):
+        """Read ``source`` (a file path or ``tcp://host:port``) on a daemon thread."""
+        self.source = source
+        if source.startswith("tcp://"):
+            host, _, port = source[len("tcp://"):].rpartition(":")
+            blocks = read_socket(host or "127.0.0.1", int(port), self.stop, poll_interval)
+        else:
+            blocks = tail_file(os.path.expanduser(source), self.stop, poll_interval)
+
+        def run():
+            for block in blocks:
+                try:
+                    self.ingest(*parse_ticks(block))
+                except Exception:
+                    with self.lock:
+                        self.errors += 1
+
+        threading.Thread(target=run, name="live-feed", daemon=True).start()
+
+
+def parse_ticks(block):
+    """``(ts, symbol, price, size)`` arrays from complete CSV or JSON lines."""
+    if block.lstrip()[:1] == b"{":
+        try:
+            frame = pd.read_json(io.BytesIO(block), lines=True, dtype=False)
+        except ValueError:
+            rows = []
+            for line in block.splitlines():
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue
+            frame = pd.DataFrame(rows)
+        frame = frame.reindex(columns=TICK_COLUMNS)
+    else:
+        frame = pd.read_csv(io.BytesIO(block), header=None, names=TICK_COLUMNS, usecols=range(4),
+                            dtype={"symbol": str}, on_bad_lines="skip", engine="c")
+    ts = pd.to_numeric(frame["ts"], errors="coerce").to_numpy(np.float64)
+    price = pd.to_numeric(frame["price"], errors="coerce").to_numpy(np.float64)
+    size = pd.to_numeric(frame["size"], errors="coerce").fillna(0.0).to_numpy(np.float64)
+    symbols = frame["symbol"].to_numpy(object)
+    # Header rows and garbage parse as NaN
+    keep = np.isfinite(ts) & np.isfinite(price) & pd.notna(symbols)
+    ts = ts[keep]
+    ts = np.where(ts > 1e11, ts / 1000.0, ts)
+    return ts, symbols[keep].astype(str), price[keep], size[keep]
+
+
+def tail_file(path, stop, poll_interval=0.2):
+    """Yield blocks of complete lines appended to ``path``, from its start."""
+    position, rest = 0, b""
+    while not stop.is_set():
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            stop.wait(poll_interval)
+            continue
+        if size < position:
+            # Truncated or replaced: start over
+            position, rest = 0, b""
+        if size == position:
+            stop.wait(poll_interval)
+            continue
+        with open(path, "rb") as f:
+            f.seek(position)
+            data = f.read(min(size - position, READ_BLOCK))
+        position += len(data)
+        data = rest + data
+        cut = data.rfind(b"\n") + 1
+        rest = data[cut:]
+        if cut:
+            yield data[:cut]
+
+
+def read_socket(host, port, stop, poll_interval=0.2):
+    """Yield blocks of complete lines from a TCP feed, reconnecting as needed."""
+    while not stop.is_set():
+        try:
+            sock = socket.create_connection((host, port), timeout=5)
+        except OSError:
+            stop.wait(1.0)
+            continue
+        sock.settimeout(poll_interval)
+        rest = b""
+        with sock:
+            while not stop.is_set():
+                try:
+                    data = sock.recv(READ_BLOCK)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                if not data:
+                    break
+                data = rest + data
+                cut = data.rfind(b"\n") + 1
+                rest = data[cut:]
+                if cut:
+                    yield data[:cut]
+
+
+def simulated_ticks(symbols, rate, fmt="csv"):
+    """Endless random-walk ticks, ``rate`` per second across ``symbols`` symbols, in 0.1 s batches."""
+    prices = [100.0 * (1 + i / 10) for i in range(symbols)]
+    while True:
+        now = time.time()
+        lines = []
+        for k in range(max(1, rate // 10)):
+            i = random.randrange(symbols)
+            prices[i] *= 1 + random.gauss(0, 0.0005)
+            ts, price, size = round(now + k / rate, 3), round(prices[i], 4), random.randint(1, 100)
+            if fmt == "jsonl":
+                lines.append(json.dumps({"ts": ts, "symbol": f"SYM{i:03d}", "price": price, "size": size}))
+            else:
+                lines.append(f"{ts},SYM{i:03d},{price},{size}")
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+        time.sleep(max(0.0, now + 0.1 - time.time()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write simulated ticks to a file or serve them over TCP.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--to", help="file to append ticks to")
+    target.add_argument("--port", type=int, help="serve ticks to TCP clients on this port")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--rate", type=int, default=1000, help="ticks per second")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    args = parser.parse_args(argv)
+    ticks = simulated_ticks(args.symbols, args.rate, args.format)
+
+    if args.to:
+        with open(os.path.expanduser(args.to), "ab") as f:
+            for block in ticks:
+                f.write(block)
+                f.flush()
+
+    clients, lock = [], threading.Lock()
+    server = socket.create_server(("127.0.0.1", args.port))
+
+    def accept():
+        while True:
+            client, _ = server.accept()
+            with lock:
+                clients.append(client)
+
+    threading.Thread(target=accept, daemon=True).start()
+    for block in ticks:
+        with lock:
+            for client in list(clients):
+                try:
+                    client.sendall(block)
+                except OSError:
+                    clients.remove(client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Chat-completion backends.
+
+Every backend speaks the OpenAI chat-completions wire format over one
+pooled, keep-alive HTTP session, so the hosted API and the bundled
+stand-in server (``python -m trading_assistant.stub_server``) are
+interchangeable. Create one backend per process and reuse it.
+"""
+
+import json
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from trading_assistant.batch import with_retries
+
+Completion = namedtuple("Completion", ["text", "usage"])
+
+
+class BackendError(Exception):
+    """HTTP-level failure; ``http_status`` and ``headers`` drive retries."""
+
+    def __init__(self, message, http_status=None, headers=None):
+        super().__init__(message)
+        self.http_status = http_status
+        self.headers = headers or {}
+
+
+class ChatBackend:
+    def __init__(self, base_url, api_key=None, model="gpt-3.5-turbo",
+                 timeout=(5.0, 60.0), retries=3, pool_size=16):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Content-Type"] = "application/json"
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def _post(self, payload, stream=False):
+        try:
+            response = self.session.post(
+                f"{self.base_url}/chat/completions", data=json.dumps(payload),
+                timeout=self.timeout, stream=stream
+            )
+        except requests.Timeout as exc:
+            raise BackendError(f"Request timed out: {exc}", http_status=504) from exc
+        except requests.ConnectionError as exc:
+            raise BackendError(f"Connection failed: {exc}", http_status=503) from exc
+        if response.status_code >= 400:
+            try:
+                message = response.json()["error"]["message"]
+            except Exception:
+                message = response.text[:200]
+            raise BackendError(f"{response.status_code}: {message}",
+                               http_status=response.status_code, headers=response.headers)
+        return response
+
+    def _payload(self, messages, params):
+        payload = {"model": params.pop("model", None) or self.model, "messages": messages}
+        payload.update(params)
+        return payload
+
+    def complete(self, messages, **params):
+        """Blocking completion; returns ``Completion(text, usage)``."""
+        payload = self._payload(messages, params)
+        response = with_retries(lambda: self._post(payload), retries=self.retries)
+        body = response.json()
+        return Completion(body["choices"][0]["message"]["content"], body.get("usage") or {})
+
+    def stream(self, messages, usage=None, **params):
+        """Yield content fragments as they arrive.
+
+        Connection setup is retried; once tokens flow, errors propagate so
+        callers keep the partial reply instead of silently restarting. Pass
+        a dict as ``usage`` to have it filled from the final usage chunk,
+        if the server sends one.
+        """
+        payload = self._payload(messages, params)
+        payload["stream"] = True
+        if usage is not None:
+            payload["stream_options"] = {"include_usage": True}
+        response = with_retries(lambda: self._post(payload, stream=True), retries=self.retries)
+        response.encoding = "utf-8"
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if usage is not None and chunk.get("usage"):
+                    usage.update(chunk["usage"])
+                choices = chunk.get("choices") or []
+                content = choices[0].get("delta", {}).get("content") if choices else None
+                if content:
+                    yield content
@@ -0,0 +1,106 @@
+"""Two-tier cache for chat-completion responses.
+
+Requests are keyed by a hash of the model, the normalised messages and
+the sampling parameters. Lookups go to an in-process LRU first, then to
+a SQLite table with a TTL and a row cap; disk hits are promoted. Both
+tiers honour the TTL from when the response was first stored.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Parameters that do not change what the model returns
+IGNORED_PARAMS = {"stream", "request_timeout", "timeout", "user"}
+
+
+def cache_key(model, messages, **params):
+    """Stable hash of a completion request."""
+    normalized = [
+        {"role": m["role"], "content": " ".join(str(m["content"]).split())}
+        for m in messages
+    ]
+    sampling = {k: v for k, v in sorted(params.items()) if k not in IGNORED_PARAMS}
+    payload = json.dumps([model, normalized, sampling], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path, memory_items=256, ttl_seconds=7 * 24 * 3600, max_rows=20000):
+        self.memory_items = memory_items
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.memory = OrderedDict()  # key -> (value, created)
+        self.lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.db.commit()
+
+    def _remember(self, key, value, created):
+        # Caller holds the lock
+        self.memory[key] = (value, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            if key in self.memory:
+                value, created = self.memory[key]
+                if created > now - self.ttl_seconds:
+                    self.memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                # Expired while hot; the disk row is just as old
+                del self.memory[key]
+            row = self.db.execute(
+                "SELECT value, created FROM responses WHERE key = ? AND created > ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.stats["disk_hits"] += 1
+            self._remember(key, *row)
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        with self.lock:
+            self._remember(key, value, now)
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict(now)
+            self.db.commit()
+
+    def _evict(self, now):
+        # Caller holds the lock
+        self.db.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl_seconds,))
+        (count,) = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_rows:
+            self.db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (count - self.max_rows,)
+            )
+
+    def summary(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        rate = f" ({hits / total:.0%})" if total else ""
+        return f"{hits} hits / {self.stats['misses']} misses{rate}"
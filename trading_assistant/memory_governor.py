@@ -0,0 +1,66 @@
+"""Per-session and process-wide memory budgets.
+
+Every rerun a session sizes the structures it keeps in memory (chat
+turns, analyses, knowledge texts) and the upload blobs it holds on disk,
+reports the total to the process-wide ``MemoryGovernor`` and asks it for
+a budget. While the server as a whole is under its global budget every
+session gets the full per-session budget; past it, sessions are held to
+an equal share. ``plan_evictions`` then picks the least recently used
+items to drop until the session fits. What dropping means is up to the
+caller: spilling to disk, compacting, or releasing a blob.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# ``key`` identifies the item to the caller; ``last_used`` is an epoch time
+Item = namedtuple("Item", ["kind", "key", "bytes", "last_used"])
+
+
+class MemoryGovernor:
+    def __init__(self, session_budget, global_budget, idle_seconds=3600):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.idle_seconds = idle_seconds
+        self.lock = threading.Lock()
+        self.sessions = OrderedDict()  # session id -> (bytes, last report)
+
+    def report(self, session_id, nbytes):
+        """Record a session's current usage and return its budget."""
+        now = time.time()
+        with self.lock:
+            self.sessions[session_id] = (nbytes, now)
+            self.sessions.move_to_end(session_id)
+            # Sessions that stopped reporting are gone (or idle long enough not to count)
+            while self.sessions:
+                _, (_, seen) = next(iter(self.sessions.items()))
+                if now - seen <= self.idle_seconds:
+                    break
+                self.sessions.popitem(last=False)
+            total = sum(used for used, _ in self.sessions.values())
+            if total <= self.global_budget:
+                return self.session_budget
+            return min(self.session_budget, self.global_budget // len(self.sessions))
+
+    def forget(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def stats(self):
+        with self.lock:
+            return {"sessions": len(self.sessions),
+                    "bytes": sum(used for used, _ in self.sessions.values()),
+                    "budget": self.global_budget}
+
+
+def plan_evictions(items, budget):
+    """Least recently used ``items`` to drop so that the rest fit in ``budget``."""
+    total = sum(item.bytes for item in items)
+    evict = []
+    for item in sorted(items, key=lambda item: item.last_used):
+        if total <= budget:
+            break
+        evict.append(item)
+        total -= item.bytes
+    return evict
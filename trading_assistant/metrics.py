@@ -0,0 +1,169 @@
+"""Timing spans, counters and per-session gauges for the hot paths.
+
+Everything records into one process-wide registry, ``METRICS``. It can
+be exported three ways:
+
+- a rotating JSONL event log (one line per span or session snapshot),
+- Prometheus text format, via ``start_http_exporter(port)``,
+- the in-app debug panel, which reads the spans of the current run.
+"""
+
+import json
+import logging
+import logging.handlers
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Sessions kept in the per-session gauges (most recently seen)
+MAX_SESSIONS = 200
+
+
+def deep_sizeof(obj, _seen=None):
+    """Approximate bytes held by ``obj`` and everything it references."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), _seen)
+    return size
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = defaultdict(lambda: {"count": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS)})
+        self.counters = defaultdict(float)
+        self.sessions = OrderedDict()
+        self.local = threading.local()
+        self.log = None
+
+    # -- sinks -----------------------------------------------------------
+
+    def enable_jsonl(self, path, max_bytes=5 * 1024 * 1024, backups=3):
+        """Append every event to ``path``, rotating at ``max_bytes``."""
+        if self.log is not None:
+            return
+        logger = logging.getLogger("trading_assistant.metrics")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        self.log = logger
+
+    def _emit(self, event):
+        if self.log is not None:
+            event["ts"] = round(time.time(), 3)
+            self.log.info(json.dumps(event, default=str))
+
+    # -- recording -------------------------------------------------------
+
+    def observe(self, name, seconds, **fields):
+        with self.lock:
+            hist = self.histograms[name]
+            hist["count"] += 1
+            hist["sum"] += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist["buckets"][i] += 1
+        run = getattr(self.local, "run", None)
+        if run is not None:
+            run.append((name, seconds, fields))
+        self._emit({"type": "span", "name": name, "seconds": round(seconds, 6), **fields})
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    @contextmanager
+    def span(self, name, **fields):
+        """Time the enclosed block; extra ``fields`` may be added to the dict yielded."""
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.observe(name, time.perf_counter() - start, **fields)
+
+    def start_run(self):
+        """Begin collecting the spans recorded on this thread."""
+        self.local.run = []
+
+    def end_run(self):
+        run, self.local.run = getattr(self.local, "run", None) or [], None
+        return run
+
+    def record_session(self, session_id, **gauges):
+        with self.lock:
+            self.sessions[session_id] = gauges
+            self.sessions.move_to_end(session_id)
+            while len(self.sessions) > MAX_SESSIONS:
+                self.sessions.popitem(last=False)
+        self._emit({"type": "session", "session": session_id, **gauges})
+
+    # -- export ----------------------------------------------------------
+
+    def prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            if self.histograms:
+                lines.append("# TYPE trading_ai_span_seconds histogram")
+            for name, hist in sorted(self.histograms.items()):
+                # Buckets are already cumulative: observe() counts every bound >= the value
+                for bound, count in zip(BUCKETS, hist["buckets"]):
+                    lines.append(f'trading_ai_span_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'trading_ai_span_seconds_bucket{{span="{name}",le="+Inf"}} {hist["count"]}')
+                lines.append(f'trading_ai_span_seconds_sum{{span="{name}"}} {hist["sum"]:.6f}')
+                lines.append(f'trading_ai_span_seconds_count{{span="{name}"}} {hist["count"]}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE trading_ai_{name} counter")
+                lines.append(f"trading_ai_{name} {value:g}")
+            gauges = sorted({g for values in self.sessions.values() for g in values})
+            for gauge in gauges:
+                lines.append(f"# TYPE trading_ai_session_{gauge} gauge")
+                for session_id, values in self.sessions.items():
+                    if gauge in values:
+                        lines.append(f'trading_ai_session_{gauge}{{session="{session_id}"}} {values[gauge]}')
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+span = METRICS.span
+
+
+def start_http_exporter(port, host="0.0.0.0", metrics=METRICS):
+    """Serve ``/metrics`` in Prometheus format from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
@@ -0,0 +1,79 @@
+"""Parsing of uploaded OHLCV price data (CSV or Parquet).
+
+Column names are matched case-insensitively against common aliases, rows
+are sorted by time and rows with missing prices dropped. The result is a
+dict of contiguous NumPy arrays, ready for the indicator engine.
+"""
+
+import io
+
+import numpy as np
+
+OHLCV_EXTENSIONS = ('csv', 'parquet')
+
+# Canonical column -> accepted header names (lower case)
+COLUMN_ALIASES = {
+    "time": ("time", "timestamp", "date", "datetime", "open_time", "time_utc"),
+    "open": ("open", "o", "open_price"),
+    "high": ("high", "h", "high_price"),
+    "low": ("low", "l", "low_price"),
+    "close": ("close", "c", "close_price", "adj_close", "adj close", "last", "price"),
+    "volume": ("volume", "vol", "v", "tick_volume", "quantity"),
+}
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+
+def read_ohlcv(data, filename):
+    """Parse CSV or Parquet bytes into ``{"time", "open", ..., "volume"}`` arrays.
+
+    ``time`` is datetime64[ns] (or None if the file has no time column)
+    and ``volume`` is None if absent. Raises ValueError if a price column
+    cannot be found.
+    """
+    import pandas as pd
+
+    if filename.lower().endswith(".parquet"):
+        frame = pd.read_parquet(io.BytesIO(data))
+    else:
+        frame = pd.read_csv(io.BytesIO(data))
+
+    headers = {str(column).strip().lower(): column for column in frame.columns}
+    columns = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        match = next((headers[a] for a in aliases if a in headers), None)
+        if match is not None:
+            columns[name] = match
+    if "close" in columns:
+        # Close-only files still work; the other prices fall back to close
+        for name in ("open", "high", "low"):
+            columns.setdefault(name, columns["close"])
+    missing = [name for name in PRICE_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"No {', '.join(missing)} column in {filename}")
+
+    out = {name: pd.to_numeric(frame[columns[name]], errors="coerce").to_numpy(np.float64)
+           for name in PRICE_COLUMNS}
+    out["volume"] = (pd.to_numeric(frame[columns["volume"]], errors="coerce").fillna(0).to_numpy(np.float64)
+                     if "volume" in columns else None)
+    out["time"] = None
+    if "time" in columns:
+        times = frame[columns["time"]]
+        if np.issubdtype(times.dtype, np.number):
+            # Epoch seconds or milliseconds
+            unit = "ms" if times.abs().max() > 1e11 else "s"
+            times = pd.to_datetime(times, unit=unit, errors="coerce")
+        else:
+            times = pd.to_datetime(times, errors="coerce", utc=True).dt.tz_localize(None)
+        out["time"] = times.to_numpy("datetime64[ns]")
+
+    keep = np.isfinite(np.column_stack([out[name] for name in PRICE_COLUMNS])).all(axis=1)
+    if out["time"] is not None:
+        keep &= ~np.isnat(out["time"])
+    order = np.argsort(out["time"][keep], kind="stable") if out["time"] is not None else slice(None)
+    for name, values in out.items():
+        if values is not None:
+            out[name] = np.ascontiguousarray(values[keep][order])
+            out[name].flags.writeable = False
+    if not len(out["close"]):
+        raise ValueError(f"No usable rows in {filename}")
+    return out
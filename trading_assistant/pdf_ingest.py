@@ -0,0 +1,86 @@
+"""Page-parallel PDF text extraction.
+
+A PDF is split into page ranges that are extracted on a process pool.
+Results are yielded page by page, in order, so callers can chunk and
+store a book as it is decoded instead of materialising the whole text.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pymupdf as fitz
+except ImportError:
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+
+PDF_AVAILABLE = fitz is not None
+
+# Pages per worker task; small enough to keep the pool busy, large
+# enough that reopening the document per task stays cheap.
+RANGE_SIZE = 20
+
+
+def page_count(path):
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def page_ranges(total, size=RANGE_SIZE):
+    """Split ``total`` pages into ``(start, stop)`` ranges."""
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def extract_range(path, start, stop):
+    """Extract text for pages ``start..stop-1``. Runs inside a worker."""
+    with fitz.open(path) as doc:
+        return [(i + 1, doc.load_page(i).get_text("text")) for i in range(start, stop)]
+
+
+def iter_pdf_pages(path, workers=None, range_size=RANGE_SIZE):
+    """Yield ``(page_no, text)`` for every page of the PDF at ``path``.
+
+    Ranges are extracted in parallel, but at most ``2 * workers`` ranges
+    are in flight at once, which bounds memory for very large books.
+    """
+    total = page_count(path)
+    ranges = page_ranges(total, range_size)
+    if len(ranges) <= 1:
+        for start, stop in ranges:
+            yield from extract_range(path, start, stop)
+        return
+
+    workers = workers or min(len(ranges), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = iter(ranges)
+        in_flight = []
+        for start, stop in pending:
+            in_flight.append(pool.submit(extract_range, path, start, stop))
+            if len(in_flight) >= 2 * workers:
+                break
+        while in_flight:
+            yield from in_flight.pop(0).result()
+            nxt = next(pending, None)
+            if nxt is not None:
+                in_flight.append(pool.submit(extract_range, path, *nxt))
+
+
+def iter_uploaded_pdf(uploaded_file, workers=None, range_size=RANGE_SIZE):
+    """Spool a Streamlit upload to a temp file and stream its pages.
+
+    Yields ``(page_no, text, total_pages)`` so callers can report progress.
+    """
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            uploaded_file.seek(0)
+            while block := uploaded_file.read(1 << 20):
+                out.write(block)
+        total = page_count(path)
+        for page_no, text in iter_pdf_pages(path, workers, range_size):
+            yield page_no, text, total
+    finally:
+        os.remove(path)
@@ -0,0 +1,173 @@
+"""Token-budgeted prompt assembly.
+
+Counts tokens with tiktoken when it is installed and its encoding can be
+loaded, and packs the system prompt, retrieved knowledge, conversation
+history and the user turn into a fixed budget by priority:
+
+1. system prompt and user turn (the user turn is truncated if it alone
+   would overflow),
+2. retrieved knowledge, best match first, up to ``knowledge_share`` of
+   what is left,
+3. history, newest turn first, emitted in chronological order,
+4. any remaining knowledge that still fits.
+
+Without tiktoken, counts are a local estimate (words or characters / 4,
+whichever is larger), which can run short on numbers and symbols, so
+``ESTIMATE_MARGIN`` of the budget is held back and reports say the
+counts were estimated.
+"""
+
+import math
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokens the chat format adds around every message, and to prime the reply
+MESSAGE_OVERHEAD = 4
+REPLY_PRIMING = 3
+
+# Share of the budget held back when token counts are only estimated
+ESTIMATE_MARGIN = 0.1
+
+# Words kept from each turn folded into a conversation summary
+SUMMARY_TURN_WORDS = 30
+
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            return None
+
+
+def exact_counts(model="gpt-3.5-turbo"):
+    """True if ``count_tokens`` uses the model's tokenizer rather than an estimate."""
+    return _encoding(model) is not None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text, model="gpt-3.5-turbo"):
+    """Token count for ``text``; memoised so old turns are not recounted."""
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(len(WORD_RE.findall(text)), math.ceil(len(text) / 4))
+
+
+def truncate_to_tokens(text, limit, model="gpt-3.5-turbo"):
+    """Longest prefix of ``text`` that fits in ``limit`` tokens."""
+    if count_tokens(text, model) <= limit:
+        return text
+    encoding = _encoding(model)
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max(limit, 0)])
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid], model) <= limit:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def summarize_turn(turn, max_words=SUMMARY_TURN_WORDS):
+    """One summary line for a chat turn: its role and first sentence."""
+    text = " ".join(str(turn["content"]).replace("*", "").split())
+    words = SENTENCE_END_RE.split(text, 1)[0].split()
+    line = " ".join(words[:max_words]) + (" …" if len(words) > max_words else "")
+    return f"- {turn['role']}: {line}"
+
+
+def compact_history(summary, turns, max_tokens, model="gpt-3.5-turbo"):
+    """Fold ``turns`` into a rolling ``summary`` of at most ``max_tokens``.
+
+    The summary is one line per turn; once it is full the oldest lines
+    are dropped first.
+    """
+    lines = (summary.splitlines() if summary else []) + [summarize_turn(t) for t in turns]
+    kept, used = [], 0
+    for line in reversed(lines):
+        used += count_tokens(line, model) + 1
+        if used > max_tokens:
+            break
+        kept.append(line)
+    return "\n".join(reversed(kept))
+
+
+class PromptAssembler:
+    def __init__(self, budget, model="gpt-3.5-turbo", knowledge_share=0.5):
+        self.estimated = not exact_counts(model)
+        self.budget = int(budget * (1 - ESTIMATE_MARGIN)) if self.estimated else budget
+        self.model = model
+        self.knowledge_share = knowledge_share
+
+    def cost(self, text):
+        return count_tokens(text, self.model) + MESSAGE_OVERHEAD
+
+    def assemble(self, system, user, knowledge=(), history=(),
+                 knowledge_heading="Relevant knowledge base excerpts:"):
+        """Return ``(messages, report)`` fitting within the token budget.
+
+        ``knowledge`` is a ranked list of context strings and ``history``
+        a chronological list of ``{"role", "content"}`` turns, excluding
+        the current user turn.
+        """
+        remaining = self.budget - REPLY_PRIMING - self.cost(system)
+        heading_cost = count_tokens(f"\n\n{knowledge_heading}\n", self.model)
+        user = truncate_to_tokens(user, remaining - MESSAGE_OVERHEAD, self.model)
+        remaining -= self.cost(user)
+
+        chosen_knowledge = []
+        knowledge_budget = int(max(remaining, 0) * self.knowledge_share)
+        pending = list(knowledge)
+        used = heading_cost
+        for item in list(pending):
+            item_cost = count_tokens(item + "\n", self.model)
+            if used + item_cost > knowledge_budget:
+                break
+            chosen_knowledge.append(item)
+            pending.remove(item)
+            used += item_cost
+        remaining -= used if chosen_knowledge else 0
+
+        chosen_history = []
+        for turn in reversed(list(history)):
+            turn_cost = self.cost(turn["content"])
+            if turn_cost > remaining:
+                break
+            chosen_history.append({"role": turn["role"], "content": turn["content"]})
+            remaining -= turn_cost
+        chosen_history.reverse()
+
+        for item in pending:
+            item_cost = count_tokens(item + "\n", self.model) + (0 if chosen_knowledge else heading_cost)
+            if item_cost <= remaining:
+                chosen_knowledge.append(item)
+                remaining -= item_cost
+
+        if chosen_knowledge:
+            system = f"{system}\n\n{knowledge_heading}\n" + "\n".join(chosen_knowledge)
+        messages = [{"role": "system", "content": system}, *chosen_history,
+                    {"role": "user", "content": user}]
+        report = {
+            "budget": self.budget,
+            "used": self.budget - remaining,
+            "knowledge": len(chosen_knowledge),
+            "history": len(chosen_history),
+            "estimated": self.estimated
+        }
+        return messages, report
@@ -0,0 +1,119 @@
+"""Incremental BM25 index over knowledge-base chunks."""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+TOKEN_RE = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have if in into is it its of on or "
+    "that the their then there these this to was were will with what how why when "
+    "which who you your can do does".split()
+)
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over chunks, updated as documents are learned.
+
+    Postings are kept per term so adding a document only touches the
+    terms it contains; queries score only chunks sharing a query term.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {chunk_id: tf}
+        self.chunks = {}                   # chunk_id -> (doc_name, chunk)
+        self.lengths = {}                  # chunk_id -> token count
+        self.doc_chunks = defaultdict(list)
+        self.total_length = 0
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def add_document(self, name, chunks):
+        """Index ``chunks`` under ``name``, replacing any previous version."""
+        self.remove_document(name)
+        self.add_chunks(name, chunks)
+
+    def add_chunks(self, name, chunks):
+        """Index ``chunks`` after any already indexed under ``name``."""
+        for chunk in chunks:
+            chunk_id = self._next_id
+            self._next_id += 1
+            terms = Counter(tokenize(chunk["text"]))
+            for term, tf in terms.items():
+                self.postings[term][chunk_id] = tf
+            length = sum(terms.values())
+            self.chunks[chunk_id] = (name, chunk)
+            self.lengths[chunk_id] = length
+            self.total_length += length
+            self.doc_chunks[name].append(chunk_id)
+
+    def remove_document(self, name):
+        for chunk_id in self.doc_chunks.pop(name, []):
+            _, chunk = self.chunks.pop(chunk_id)
+            self.total_length -= self.lengths.pop(chunk_id)
+            for term in set(tokenize(chunk["text"])):
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(chunk_id, None)
+                    if not posting:
+                        del self.postings[term]
+
+    def search(self, query, k=5, names=None):
+        """Return up to ``k`` ``(score, doc_name, chunk)`` best matches.
+
+        ``names`` optionally restricts results to the given documents.
+        """
+        n = len(self.chunks)
+        if not n:
+            return []
+        avg_length = self.total_length / n or 1.0
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for chunk_id, tf in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / avg_length)
+                scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        if names is not None:
+            scores = {c: s for c, s in scores.items() if self.chunks[c][0] in names}
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(score, *self.chunks[chunk_id]) for chunk_id, score in best]
+
+
+def format_result(result, max_chars=600):
+    """Render one search result as a prompt context line."""
+    _, name, chunk = result
+    page = f" p.{chunk['page']}" if chunk.get("page") else ""
+    return f"- [{name}{page}] {chunk['text'][:max_chars]}"
+
+
+def format_context(results, max_chars=600):
+    """Render search results as prompt context lines."""
+    return "\n".join(format_result(r, max_chars) for r in results)
+
+
+def fuse_results(result_lists, k=5, rank_constant=60):
+    """Merge ranked result lists with reciprocal rank fusion.
+
+    Lexical and vector scores live on different scales, so only ranks are
+    combined. Chunks are matched across lists by document and text.
+    """
+    fused = {}
+    for results in result_lists:
+        for rank, (_, name, chunk) in enumerate(results):
+            key = (name, chunk["text"])
+            score, _, _ = fused.get(key, (0.0, name, chunk))
+            fused[key] = (score + 1.0 / (rank_constant + rank + 1), name, chunk)
+    return heapq.nlargest(k, fused.values(), key=lambda item: item[0])
@@ -0,0 +1,148 @@
+"""Rank a watchlist of symbols by simple trading setups.
+
+Each symbol's OHLCV file is loaded and its latest ``SCAN_LOOKBACK`` bars
+are run through a set of rules. A rule is a whole-array NumPy
+computation over those bars that returns a score in [0, 1] (0 = no
+setup) and a short description. Symbols are spread over a process pool
+in chunks, so a watchlist of hundreds of files is read and evaluated in
+parallel; the rows come back ranked by how many rules fired and how
+strongly. Only symbols with a setup carry the indicator facts used for
+an AI analysis prompt. A source may also be a bar store series
+directory, which is memory-mapped instead of parsed.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from trading_assistant.bar_store import Series
+from trading_assistant.indicators import analyze, facts_text, rsi, sma
+from trading_assistant.ohlcv import OHLCV_EXTENSIONS, read_ohlcv
+
+# Bars per symbol the rules (and the facts) look at
+SCAN_LOOKBACK = 500
+
+# Symbols per task sent to a worker process
+SCAN_CHUNK = 16
+
+
+def breakout(data, lookback=20, near=1.0):
+    """Close above, or within ``near`` % of, the highest high of the prior ``lookback`` bars."""
+    high, close = data["high"], data["close"]
+    if len(close) <= lookback:
+        return 0.0, ""
+    level = high[-lookback - 1:-1].max()
+    gap = 100.0 * (level - close[-1]) / level
+    if gap > near:
+        return 0.0, ""
+    if gap <= 0:
+        return 1.0, f"broke the {lookback}-bar high {level:.5g}"
+    return 1.0 - gap / near / 2, f"{gap:.2f}% below the {lookback}-bar high {level:.5g}"
+
+
+def rsi_extreme(data, period=14, lower=30.0, upper=70.0):
+    """RSI at or beyond ``lower``/``upper``."""
+    value = rsi(data["close"], int(period))[-1]
+    if not np.isfinite(value) or lower < value < upper:
+        return 0.0, ""
+    side = "oversold" if value <= lower else "overbought"
+    return min(1.0, abs(value - 50.0) / 50.0), f"RSI{int(period)} {value:.1f} ({side})"
+
+
+def volume_spike(data, window=20, factor=2.0):
+    """Last bar's volume at least ``factor`` times its ``window``-bar average."""
+    volume = data.get("volume")
+    if volume is None or len(volume) <= window:
+        return 0.0, ""
+    average = volume[-window - 1:-1].mean()
+    ratio = volume[-1] / average if average > 0 else 0.0
+    if ratio < factor:
+        return 0.0, ""
+    return min(1.0, ratio / (2 * factor)), f"volume {ratio:.1f}x its {window}-bar average"
+
+
+def sma_cross(data, fast=20, slow=50, within=3):
+    """Fast SMA crossed the slow one in the last ``within`` bars."""
+    close = data["close"]
+    if len(close) <= slow + within:
+        return 0.0, ""
+    above = (sma(close, int(fast)) > sma(close, int(slow)))[-within - 1:]
+    flips = np.flatnonzero(above[1:] != above[:-1])
+    if not len(flips):
+        return 0.0, ""
+    ago = within - 1 - flips[-1]
+    kind = "golden" if above[-1] else "death"
+    return 1.0 - ago / within / 2, f"{kind} cross SMA{int(fast)}/{int(slow)} {ago} bars ago"
+
+
+# Rule name -> (function, default parameters)
+RULES = {
+    "Breakout near resistance": (breakout, {"lookback": 20, "near": 1.0}),
+    "RSI extreme": (rsi_extreme, {"period": 14, "lower": 30.0, "upper": 70.0}),
+    "Volume spike": (volume_spike, {"window": 20, "factor": 2.0}),
+    "SMA crossover": (sma_cross, {"fast": 20, "slow": 50, "within": 3}),
+}
+
+
+def watchlist(directory):
+    """``(symbol, path, filename)`` for every OHLCV file in ``directory``; the stem is the symbol."""
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    return [(os.path.splitext(name)[0], os.path.join(directory, name), name)
+            for name in names if name.lower().endswith(OHLCV_EXTENSIONS)]
+
+
+def load_bars(path, filename):
+    """``(total bars, the latest SCAN_LOOKBACK bars)`` of an OHLCV file or bar store series."""
+    if os.path.isdir(path):
+        series = Series(path)
+        if not len(series):
+            raise ValueError(f"No bars stored in {path}")
+        return len(series), series.tail(SCAN_LOOKBACK)
+    with open(path, "rb") as f:
+        data = read_ohlcv(f.read(), filename)
+    return len(data["close"]), {k: (v[-SCAN_LOOKBACK:] if v is not None else None) for k, v in data.items()}
+
+
+def scan_symbol(symbol, path, filename, rules):
+    """One ranked-table row for a symbol; ``rules`` is a list of ``(name, params)``."""
+    row = {"symbol": symbol, "hits": 0, "score": 0.0, "signals": "", "facts": None, "error": None}
+    try:
+        bars, recent = load_bars(path, filename)
+    except Exception as exc:
+        row["error"] = str(exc)
+        return row
+    close = recent["close"]
+    row.update(bars=bars, last=float(close[-1]),
+               change_pct=float(100.0 * (close[-1] / close[-2] - 1)) if len(close) > 1 and close[-2] else 0.0)
+    signals = []
+    for name, params in rules:
+        score, detail = RULES[name][0](recent, **params)
+        if score > 0:
+            row["hits"] += 1
+            row["score"] += score
+            signals.append(detail)
+    row["signals"] = "; ".join(signals)
+    if signals:
+        row["facts"] = facts_text(analyze(recent))
+    return row
+
+
+def _scan_chunk(sources, rules):
+    return [scan_symbol(symbol, path, filename, rules) for symbol, path, filename in sources]
+
+
+def scan(sources, rules, workers=None):
+    """Evaluate ``rules`` for every ``(symbol, path, filename)``; rows best first."""
+    workers = workers or min(os.cpu_count() or 1, max(1, len(sources) // SCAN_CHUNK))
+    if workers <= 1:
+        rows = _scan_chunk(sources, rules)
+    else:
+        chunks = [sources[i:i + SCAN_CHUNK] for i in range(0, len(sources), SCAN_CHUNK)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = [row for part in pool.map(_scan_chunk, chunks, [rules] * len(chunks)) for row in part]
+    rows.sort(key=lambda row: (-row["hits"], -row["score"], row["symbol"]))
+    return rows
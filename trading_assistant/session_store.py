@@ -0,0 +1,111 @@
+"""Persistent per-session records: chat turns, analyses and uploads.
+
+Every record is written to SQLite (WAL mode) when it is appended and
+rewritten when it changes, so a session survives restarts and its
+memory footprint stays bounded: ``st.session_state`` only keeps a short
+recent window, and views page older records in on demand. Rows are
+indexed by ``(session, kind, id)`` for paging and by ``created`` for
+retention sweeps.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class SessionStore:
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, session TEXT NOT NULL, kind TEXT NOT NULL,"
+            " created REAL NOT NULL, body TEXT NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS records_session ON records (session, kind, id)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS records_created ON records (created)")
+        self.db.commit()
+
+    @staticmethod
+    def _decode(rows):
+        out = []
+        for record_id, body in rows:
+            record = json.loads(body)
+            record["record_id"] = record_id
+            out.append(record)
+        return out
+
+    @staticmethod
+    def _encode(record):
+        return json.dumps({k: v for k, v in record.items() if k != "record_id"},
+                          ensure_ascii=False, default=str)
+
+    def append(self, session, kind, record):
+        """Persist ``record`` and tag it with its ``record_id``."""
+        with self.lock:
+            cursor = self.db.execute(
+                "INSERT INTO records (session, kind, created, body) VALUES (?, ?, ?, ?)",
+                (session, kind, time.time(), self._encode(record))
+            )
+            self.db.commit()
+        record["record_id"] = cursor.lastrowid
+        return record["record_id"]
+
+    def update(self, record):
+        """Rewrite a record that was appended earlier (e.g. after streaming)."""
+        if "record_id" not in record:
+            return
+        with self.lock:
+            self.db.execute("UPDATE records SET body = ? WHERE id = ?",
+                            (self._encode(record), record["record_id"]))
+            self.db.commit()
+
+    def get(self, session, record_id):
+        with self.lock:
+            rows = self.db.execute("SELECT id, body FROM records WHERE session = ? AND id = ?",
+                                   (session, record_id)).fetchall()
+        records = self._decode(rows)
+        return records[0] if records else None
+
+    def delete(self, session, kind, record_id=None):
+        """Delete one record, or every record of ``kind`` in the session."""
+        with self.lock:
+            if record_id is None:
+                self.db.execute("DELETE FROM records WHERE session = ? AND kind = ?", (session, kind))
+            else:
+                self.db.execute("DELETE FROM records WHERE session = ? AND kind = ? AND id = ?",
+                                (session, kind, record_id))
+            self.db.commit()
+
+    def latest(self, session, kind, limit=None):
+        """The newest ``limit`` records (all if None), oldest first."""
+        return self.page(session, kind, before_id=None, limit=limit)
+
+    def page(self, session, kind, before_id=None, limit=None):
+        """Up to ``limit`` records older than ``before_id``, oldest first."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id, body FROM records WHERE session = ? AND kind = ? AND id < ?"
+                " ORDER BY id DESC LIMIT ?",
+                (session, kind, before_id if before_id is not None else 2 ** 63 - 1,
+                 limit if limit is not None else -1)
+            ).fetchall()
+        return self._decode(reversed(rows))
+
+    def count(self, session, kind, before_id=None):
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM records WHERE session = ? AND kind = ? AND id < ?",
+                (session, kind, before_id if before_id is not None else 2 ** 63 - 1)
+            ).fetchone()[0]
+
+    def prune(self, max_age_seconds):
+        """Drop records older than ``max_age_seconds``; returns how many."""
+        with self.lock:
+            cursor = self.db.execute("DELETE FROM records WHERE created < ?",
+                                     (time.time() - max_age_seconds,))
+            self.db.commit()
+        return cursor.rowcount
@@ -0,0 +1,60 @@
+"""Incremental rendering of streamed chat-completion responses."""
+
+import time
+
+CURSOR = "▌"
+
+# Minimum seconds between placeholder redraws while tokens arrive
+REDRAW_INTERVAL = 0.05
+
+
+def stream_into(record, key, deltas, placeholder=None, stop=None):
+    """Append ``deltas`` to ``record[key]``, redrawing ``placeholder`` if given.
+
+    ``record`` is the dict already stored in session state, so the text
+    received so far is kept if streaming ends early and
+    ``record["partial"]`` stays True. ``stop`` is polled between chunks;
+    when it returns True the stream is closed. Time to first token and
+    total time are stored as ``ttft_s`` and ``total_s``.
+    """
+    start = time.perf_counter()
+    record[key] = ""
+    record["partial"] = True
+    last_draw = 0.0
+    for piece in deltas:
+        if stop is not None and stop():
+            deltas.close()
+            return record[key]
+        now = time.perf_counter()
+        if "ttft_s" not in record:
+            record["ttft_s"] = round(now - start, 3)
+        record[key] += piece
+        if placeholder is not None and now - last_draw >= REDRAW_INTERVAL:
+            placeholder.markdown(record[key] + CURSOR)
+            last_draw = now
+    record["total_s"] = round(time.perf_counter() - start, 3)
+    record["partial"] = False
+    if placeholder is not None:
+        placeholder.markdown(record[key])
+    return record[key]
+
+
+def live_text(record, key, active):
+    """``record[key]`` with a cursor while its job is still producing it."""
+    text = record.get(key) or ""
+    if not active:
+        return text
+    return text + CURSOR if text else "⏳ Waiting for the model..."
+
+
+def timing_caption(record):
+    """Short human-readable timing line for a streamed record, or ''."""
+    if record.get("cached"):
+        return "⚡ Served from response cache"
+    if record.get("reused_from"):
+        return "♻️ Reused from a similar chart"
+    if "total_s" not in record:
+        return "⏹️ Stopped before completion" if record.get("partial") else ""
+    ttft = record.get("ttft_s")
+    first = f"first token {ttft:.2f}s • " if ttft is not None else ""
+    return f"⏱️ {first}total {record['total_s']:.2f}s"
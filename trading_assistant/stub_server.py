@@ -0,0 +1,157 @@
+"""Local stand-in for the chat-completions API.
+
+Serves ``POST /v1/chat/completions`` (streaming and non-streaming) with
+canned trading-style replies, a configurable time to first token and a
+configurable token rate, so the app can be run, benchmarked and
+load-tested without network access:
+
+    python -m trading_assistant.stub_server --port 8808 --latency 0.4 --tokens-per-second 40
+
+Then point the app at it with TRADING_AI_LLM_BACKEND=local.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PHRASES = [
+    "Price is holding above the recent swing low, which acts as support.",
+    "Resistance sits near the prior high where sellers stepped in.",
+    "Momentum is fading, so wait for a close beyond the range before acting.",
+    "Volume expanded on the breakout, which adds weight to the move.",
+    "Place a stop beyond the invalidation level and size the position to risk 1% or less.",
+    "A retest of the broken level would offer a lower-risk entry.",
+    "The trend on the higher timeframe remains the primary filter.",
+    "Remember: this is educational content, not financial advice.",
+]
+
+
+def canned_reply(messages, max_tokens):
+    """Deterministic reply derived from the prompt, capped near ``max_tokens`` words."""
+    prompt = json.dumps(messages, sort_keys=True)
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+    words = []
+    i = 0
+    while len(words) < max_tokens:
+        words.extend(PHRASES[(seed + i) % len(PHRASES)].split())
+        i += 1
+    return " ".join(words[:max_tokens])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.3
+    tokens_per_second = 50.0
+    reply_tokens = 120
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+            messages = request["messages"]
+        except (ValueError, KeyError):
+            self._send_json(400, {"error": {"message": "Expected a JSON body with messages"}})
+            return
+
+        max_tokens = min(int(request.get("max_tokens") or self.reply_tokens), self.reply_tokens)
+        tokens = canned_reply(messages, max_tokens).split(" ")
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+        model = request.get("model", "stub")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+        time.sleep(self.latency)
+        if not request.get("stream"):
+            time.sleep(delay * len(tokens))
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "model": model,
+                "created": int(time.time()),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(tokens)}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                          "total_tokens": prompt_tokens + len(tokens)}
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, token in enumerate(tokens):
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": token if i == 0 else " " + token}}]}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                time.sleep(delay)
+            if (request.get("stream_options") or {}).get("include_usage"):
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                         "choices": [], "usage": {"prompt_tokens": prompt_tokens,
+                                                  "completion_tokens": len(tokens),
+                                                  "total_tokens": prompt_tokens + len(tokens)}}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client cancelled mid-stream
+            self.close_connection = True
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing idle keep-alive connections is routine here
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def serve(host="127.0.0.1", port=8808, latency=0.3, tokens_per_second=50.0, reply_tokens=120):
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "latency": latency, "tokens_per_second": tokens_per_second, "reply_tokens": reply_tokens
+    })
+    return StubServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--reply-tokens", type=int, default=120, help="maximum tokens per reply")
+    args = parser.parse_args(argv)
+    server = serve(args.host, args.port, args.latency, args.tokens_per_second, args.reply_tokens)
+    print(f"Stub chat-completions API on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
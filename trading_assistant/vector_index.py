@@ -0,0 +1,185 @@
+"""Offline dense-vector index over knowledge chunks.
+
+Chunks are embedded with a signed feature-hashing vectorizer (unigrams
+and bigrams, no network or model download) and stored in a float32
+matrix memory-mapped from disk. Chunk text and metadata live next to it
+in an append-only JSONL file, so a new process can warm-start without
+re-embedding anything.
+"""
+
+import json
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from trading_assistant.retrieval import tokenize
+
+DIM = 512
+INITIAL_CAPACITY = 1024
+
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams and bigrams into ``dim`` buckets."""
+
+    def __init__(self, dim=DIM):
+        self.dim = dim
+
+    def features(self, text):
+        tokens = tokenize(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts):
+        """Embed a batch of texts into an ``(n, dim)`` L2-normalised matrix."""
+        features = [self.features(text) for text in texts]
+        counts = np.array([len(f) for f in features], dtype=np.int64)
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for row in features for f in row),
+                             dtype=np.uint32, count=int(counts.sum()))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if len(hashes):
+            cells = np.repeat(np.arange(len(texts)) * self.dim, counts) + hashes % self.dim
+            signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+            out[:] = np.bincount(cells, weights=signs, minlength=out.size).reshape(out.shape)
+            # Sublinear term frequency, then unit length for cosine similarity
+            np.copyto(out, np.sign(out) * np.log1p(np.abs(out)))
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class VectorIndex:
+    """Append-only, mmap-backed cosine-similarity index.
+
+    Layout of ``directory``:
+      vectors.f32  -- ``capacity x dim`` float32 rows, grown by doubling
+      chunks.jsonl -- one record per row, plus ``{"delete": name}`` tombstones
+    """
+
+    def __init__(self, directory, dim=DIM):
+        self.directory = directory
+        self.dim = dim
+        self.embedder = HashingEmbedder(dim)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.meta_path = os.path.join(directory, "chunks.jsonl")
+        self.lock = threading.Lock()
+        self.meta = []
+        self.doc_rows = {}
+        self.live = np.zeros(0, dtype=bool)
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return int(self.live.sum())
+
+    # -- storage -------------------------------------------------------
+
+    def _load(self):
+        live = []
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if "delete" in record:
+                        for row in self.doc_rows.pop(record["delete"], []):
+                            live[row] = False
+                    else:
+                        self.doc_rows.setdefault(record["doc"], []).append(len(self.meta))
+                        self.meta.append(record)
+                        live.append(True)
+        self.live = np.array(live, dtype=bool)
+        capacity = max(INITIAL_CAPACITY, len(self.meta))
+        if os.path.exists(self.vectors_path):
+            capacity = max(capacity, os.path.getsize(self.vectors_path) // (4 * self.dim))
+        self._map(capacity)
+
+    def _map(self, capacity):
+        with open(self.vectors_path, "ab") as f:
+            if f.tell() < capacity * self.dim * 4:
+                f.truncate(capacity * self.dim * 4)
+        self.capacity = capacity
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+",
+                                 shape=(capacity, self.dim))
+
+    # -- public API ----------------------------------------------------
+
+    def add_document(self, name, chunks, source=None, date=None):
+        """Embed and persist ``chunks``, replacing any earlier ``name``."""
+        self.remove_document(name)
+        self.add_chunks(name, chunks, source, date)
+
+    def remove_document(self, name):
+        """Tombstone the rows of ``name``; they stay on disk but are never matched."""
+        with self.lock:
+            if name in self.doc_rows:
+                self.live[self.doc_rows.pop(name)] = False
+                self._write([{"delete": name}])
+
+    def add_chunks(self, name, chunks, source=None, date=None):
+        """Embed and persist ``chunks`` after any already stored under ``name``."""
+        if not chunks:
+            return
+        matrix = self.embedder.embed([c["text"] for c in chunks])
+        with self.lock:
+            start = len(self.meta)
+            stop = start + len(chunks)
+            if stop > self.capacity:
+                self.vectors.flush()
+                self._map(max(stop, self.capacity * 2))
+            self.vectors[start:stop] = matrix
+            self.vectors.flush()
+            records = [{"doc": name, "page": chunk.get("page"), "text": chunk["text"],
+                        "source": source, "date": date} for chunk in chunks]
+            self.meta.extend(records)
+            self.doc_rows.setdefault(name, []).extend(range(start, stop))
+            self.live = np.concatenate([self.live, np.ones(len(chunks), dtype=bool)])
+            self._write(records)
+
+    def _write(self, records):
+        with open(self.meta_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+
+    def search_batch(self, queries, k=5):
+        """Top-``k`` ``(score, doc_name, chunk)`` lists for each query."""
+        q = self.embedder.embed(queries)
+        with self.lock:
+            n = len(self.meta)
+            if not n or not self.live.any():
+                return [[] for _ in queries]
+            scores = q @ self.vectors[:n].T
+            live = self.live.copy()
+            meta = self.meta
+        scores[:, ~live] = -np.inf
+        k = min(k, int(live.sum()))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates])]
+            results.append([
+                (float(scores[row, i]), meta[i]["doc"], {"text": meta[i]["text"], "page": meta[i]["page"]})
+                for i in ordered if scores[row, i] > 0
+            ])
+        return results
+
+    def search(self, query, k=5):
+        return self.search_batch([query], k)[0]
+
+    def document(self, name):
+        """``(chunks, source, date)`` of one stored document, or None."""
+        with self.lock:
+            records = [self.meta[row] for row in self.doc_rows.get(name, [])]
+        if not records:
+            return None
+        chunks = [{"text": r["text"], "page": r["page"]} for r in records]
+        return chunks, records[0].get("source"), records[0].get("date")
+
+    def documents(self):
+        """Rebuild ``{name: (chunks, source, date)}`` from the stored rows."""
+        docs = {}
+        with self.lock:
+            rows = list(zip(self.meta, self.live))
+        for record, live in rows:
+            if live:
+                chunks, _, _ = docs.setdefault(record["doc"], ([], record.get("source"), record.get("date")))
+                chunks.append({"text": record["text"], "page": record["page"]})
+        return docs
@@ -0,0 +1,16 @@
+"""Per-mode pages of the Streamlit app.
+
+``app.py`` imports only the page for the selected mode, on first use, so
+modules a page depends on (PIL, PyMuPDF, the watchlist scanner) are never
+loaded for sessions that do not open it. Each page exposes
+``render(backend)``, where ``backend`` is None when no LLM is configured.
+"""
+
+# Sidebar mode -> page module
+PAGES = {
+    "📤 Upload Files": "trading_assistant.views.upload",
+    "📈 Analyze Charts": "trading_assistant.views.analyze",
+    "🔭 Scan Watchlist": "trading_assistant.views.scanner",
+    "📚 Learn from PDFs": "trading_assistant.views.learn",
+    "💬 Chat with AI": "trading_assistant.views.chat",
+}
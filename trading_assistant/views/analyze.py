@@ -0,0 +1,490 @@
+"""Analyze mode: AI analysis of uploaded charts and OHLCV price data."""
+
+import difflib
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from trading_assistant.backtest import STRATEGIES, parameter_grid
+from trading_assistant.chart_hash import similarity
+from trading_assistant.digitizer import series_text
+from trading_assistant.indicators import facts_text
+from trading_assistant.ohlcv import OHLCV_EXTENSIONS
+from trading_assistant.streaming import live_text, timing_caption
+from trading_assistant.views.common import (
+    IMAGE_EXTENSIONS, DatasetUnavailable, analysis_request_params, backtest_dataset, chart_indicators, dataset_indicators,
+    digitize_chart, get_blob_store, get_job_queue, get_live_market, get_rendition_cache, has_knowledge, job_active, load_dataset,
+    older_records, record_count, remember_analysis, save, similar_analyses, stored_datasets, stored_record,
+    submit_completion, sweep_dataset, watch
+)
+
+# Points drawn in the price preview of a dataset
+PREVIEW_POINTS = 2000
+
+# Previous analyses shown at once, and loaded per "Show older" click
+ANALYSES_PAGE = 3
+
+
+def chart_series(file_info):
+    # Digitized OHLC text for an uploaded chart, using its calibration if set
+    digest = file_info["digest"]
+    top_price = st.session_state.get(f"calib_top_{digest}") or None
+    bottom_price = st.session_state.get(f"calib_bottom_{digest}") or None
+    chart = digitize_chart(digest, top_price, bottom_price)
+    return chart, (series_text(chart) if chart is not None else None)
+
+
+def is_dataset(file_info):
+    return file_info.get("stored") or file_info["name"].lower().endswith(OHLCV_EXTENSIONS)
+
+
+def indicator_report(file_info):
+    # Memoised indicator report for a dataset or a digitized screenshot
+    digest = file_info["digest"]
+    try:
+        if is_dataset(file_info):
+            return dataset_indicators(digest, file_info["name"])
+        return chart_indicators(digest, st.session_state.get(f"calib_top_{digest}") or None,
+                                st.session_state.get(f"calib_bottom_{digest}") or None)
+    except Exception:
+        return None
+
+
+def prompt_inputs(file_info, include_series):
+    # (series, facts) for the analysis prompt
+    if file_info is None or not include_series:
+        return None, None
+    report = indicator_report(file_info)
+    series = None if is_dataset(file_info) else chart_series(file_info)[1]
+    return series, (facts_text(report) if report else None)
+
+
+def backtest_panel(file_info):
+    # Strategy backtest and parameter sweep over an uploaded dataset
+    digest, filename = file_info["digest"], file_info["name"]
+    strategy = st.selectbox("Strategy:", list(STRATEGIES), key="bt_strategy")
+    grid = STRATEGIES[strategy][1]
+
+    param_cols = st.columns(len(grid))
+    params = []
+    for col, (name, values) in zip(param_cols, grid.items()):
+        with col:
+            params.append((name, st.number_input(name, value=values[len(values) // 2], step=1,
+                                                 key=f"bt_{strategy}_{name}")))
+
+    col_sl, col_tp, col_fee = st.columns(3)
+    with col_sl:
+        stop_loss = st.number_input("Stop loss %", 0.0, 50.0, 2.0, 0.5, key="bt_sl") / 100 or None
+    with col_tp:
+        take_profit = st.number_input("Take profit %", 0.0, 100.0, 4.0, 0.5, key="bt_tp") / 100 or None
+    with col_fee:
+        fee = st.number_input("Fee % per side", 0.0, 1.0, 0.05, 0.01, key="bt_fee") / 100
+
+    # Remember the last request so its (memoised) result survives reruns
+    if st.button("▶️ Run Backtest"):
+        st.session_state.backtest_request = (digest, filename, strategy, tuple(params), stop_loss, take_profit, fee)
+    request = st.session_state.get("backtest_request")
+    if request and request[0] == digest:
+        try:
+            equity, stats = backtest_dataset(*request)
+        except DatasetUnavailable:
+            st.warning("Dataset no longer available — re-upload it")
+            return
+        st.line_chart(equity, height=200)
+        col_a, col_b, col_c, col_d = st.columns(4)
+        col_a.metric("CAGR", f"{stats['cagr']:.1%}")
+        col_b.metric("Max Drawdown", f"{stats['max_drawdown']:.1%}")
+        col_c.metric("Sharpe", f"{stats['sharpe']:.2f}")
+        col_d.metric("Win Rate", f"{stats['win_rate']:.0%}")
+        st.caption(f"{stats['trades']} trades • total return {stats['total_return']:.1%} • "
+                   f"in market {stats['exposure']:.0%} of bars")
+
+    st.markdown("**Parameter sweep**")
+    col_mode, col_samples = st.columns(2)
+    with col_mode:
+        sweep_mode = st.radio("Search:", ["Grid", "Random"], horizontal=True, key="bt_sweep_mode")
+    with col_samples:
+        samples = st.number_input("Random samples", 1, 500, 8, key="bt_samples",
+                                  disabled=sweep_mode == "Grid")
+    if st.button("🔬 Run Parameter Sweep"):
+        combos = parameter_grid(grid, samples=samples if sweep_mode == "Random" else None)
+        st.session_state.sweep_request = (digest, filename, strategy,
+                                          tuple(tuple(c.items()) for c in combos), stop_loss, take_profit, fee)
+    request = st.session_state.get("sweep_request")
+    if request and request[0] == digest:
+        with st.spinner(f"Backtesting {len(request[3])} parameter sets..."):
+            try:
+                rows = sweep_dataset(*request)
+            except DatasetUnavailable:
+                st.warning("Dataset no longer available — re-upload it")
+                return
+        rows = sorted(rows, key=lambda row: -row["sharpe"])
+        st.dataframe(rows, use_container_width=True, hide_index=True, column_config={
+            key: st.column_config.NumberColumn(format="%.2f" if key == "sharpe" else "%.3f")
+            for key in ("total_return", "cagr", "max_drawdown", "sharpe", "win_rate", "exposure")
+        })
+
+
+def live_panel(market):
+    # Latest bars and running indicators of a live symbol; reading them is
+    # a copy of one ring buffer, nothing is rescanned
+    stats = market.stats()
+    with st.expander(f"📡 Live Feed ({stats['symbols']} symbols)", expanded=True):
+        symbols = market.symbols()
+        if not symbols:
+            st.info(f"Waiting for ticks from {stats['source']}")
+            return
+        col_symbol, col_frame = st.columns([2, 3])
+        with col_symbol:
+            symbol = st.selectbox("Symbol:", symbols, key="live_symbol")
+        with col_frame:
+            timeframe = st.radio("Timeframe:", [label for label, _ in market.timeframes],
+                                 horizontal=True, key="live_timeframe")
+        snapshot = market.snapshot(symbol, timeframe)
+        values = snapshot["indicators"]
+        if values:
+            st.line_chart(snapshot["bars"]["close"], height=200)
+
+            def fmt(v):
+                return "n/a" if v is None else f"{v:.5g}"
+
+            col_a, col_b, col_c, col_d, col_e = st.columns(5)
+            col_a.metric("Last Close", fmt(values["last_close"]))
+            col_b.metric("Trend", values["trend"], help=f"{values['confidence']}% signal agreement")
+            col_c.metric("RSI 14", "n/a" if values["rsi_14"] is None else f"{values['rsi_14']:.1f}")
+            col_d.metric("ATR 14", fmt(values["atr_14"]))
+            col_e.metric("SMA 20 / 50", f"{fmt(values['sma_20'])} / {fmt(values['sma_50'])}")
+        else:
+            st.info(f"No {timeframe} bar of {symbol} has finished yet")
+        forming = snapshot["forming"]
+        st.caption(
+            f"{snapshot['count']:,} bars finished"
+            + (f" • forming: O {forming['open']:.5g} H {forming['high']:.5g} L {forming['low']:.5g} "
+               f"C {forming['close']:.5g}" if forming else "")
+            + f" • {stats['ticks']:,} ticks, {stats['ticks_per_second']:,.0f}/s"
+            + (f", {stats['dropped']:,} dropped" if stats["dropped"] else "")
+        )
+        st.button("🔄 Refresh", key="live_refresh")
+
+
+def similar_panel(file_info, chart):
+    # Earlier analyses of near-identical screenshots: reuse one instead of
+    # paying for a new completion, or compare it with the latest analysis
+    # The latest analysis of this very chart is already shown below
+    current = st.session_state.get("current_analysis")
+    ours = current if current and current.get("digest") == file_info["digest"] else None
+    matches = [(distance, key) for distance, key in similar_analyses(file_info)
+               if not ours or key[0] != ours.get("record_id")]
+    if not matches:
+        return
+    with st.expander(f"🔁 Similar past charts ({len(matches)})", expanded=True):
+        for distance, (record_id, past_chart, timestamp) in matches:
+            col_info, col_reuse, col_diff = st.columns([3, 1, 1])
+            col_info.markdown(f"**{past_chart}** • {timestamp} • {similarity(distance):.0%} alike")
+            if col_reuse.button("♻️ Reuse", key=f"reuse_{record_id}"):
+                past = stored_record(record_id)
+                if past:
+                    st.session_state.current_analysis = remember_analysis({
+                        "chart": chart,
+                        "digest": file_info["digest"],
+                        "focus_areas": past["focus_areas"],
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "ai_analysis": past.get("ai_analysis", ""),
+                        "reused_from": record_id
+                    }, file_info)
+            if col_diff.button("🔀 Compare", key=f"compare_{record_id}"):
+                st.session_state.compare_analysis = record_id
+
+        record_id = st.session_state.get("compare_analysis")
+        past = stored_record(record_id) if record_id in {key[0] for _, key in matches} else None
+        if past:
+            if ours and not job_active(ours):
+                diff = difflib.unified_diff(
+                    (past.get("ai_analysis") or "").splitlines(), (ours.get("ai_analysis") or "").splitlines(),
+                    f"{past['chart']} ({past['timestamp']})", f"{ours['chart']} ({ours['timestamp']})", lineterm=""
+                )
+                st.code("\n".join(diff) or "No differences", language="diff")
+            else:
+                st.markdown(past.get("ai_analysis") or "No analysis")
+
+
+def render(backend):
+    llm_available = backend is not None
+
+    st.header("📈 Analyze Trading Charts")
+
+    market = get_live_market()
+    if market is not None:
+        live_panel(market)
+
+    # Check for uploaded charts, and price series already in the bar store
+    chart_files = [f for f in st.session_state.uploaded_files
+                   if f['name'].lower().endswith(IMAGE_EXTENSIONS + OHLCV_EXTENSIONS)] + stored_datasets()
+    selected_file = None
+
+    if not chart_files:
+        st.warning("""
+        ⚠️ **No chart screenshots or price data uploaded yet.**
+
+        Please go to **"Upload Files"** mode first and upload your trading chart screenshots
+        or OHLCV data (CSV/Parquet).
+        """)
+
+        # Alternative: Text description
+        st.subheader("📝 Or Describe Your Chart")
+        chart_description = st.text_area(
+            "Describe what you see on your chart:",
+            height=150,
+            placeholder="Example: EUR/USD 1H chart showing bullish trend with strong support at 1.0850 and resistance at 1.0950. Volume is increasing on upticks..."
+        )
+
+        if chart_description:
+            st.info("📋 Using text description for analysis")
+            selected_chart = "Text Description"
+        else:
+            selected_chart = None
+    else:
+        # Let user select a chart (names may repeat, so label with the digest)
+        chart_labels = [f"{f['name']} ({'stored' if f.get('stored') else f['digest'][:8]})" for f in chart_files]
+        selected_label = st.selectbox(
+            "Select a chart to analyze:",
+            chart_labels,
+            key="chart_selector"
+        )
+        selected_file = chart_files[chart_labels.index(selected_label)] if selected_label else None
+        selected_chart = selected_file["name"] if selected_file else None
+        if selected_file:
+            # Recency for the memory governor's upload budget
+            selected_file["last_used"] = time.time()
+
+        # Show selected price data
+        if selected_chart and is_dataset(selected_file):
+            st.subheader(f"📊 Selected: {selected_chart}")
+            try:
+                data = load_dataset(selected_file["digest"], selected_chart)
+            except Exception as e:
+                data = None
+                st.error(f"⚠️ Could not read price data: {e}")
+            if data is not None:
+                step = max(1, len(data["close"]) // PREVIEW_POINTS)
+                st.line_chart(data["close"][::-step][::-1], height=260)
+                report = indicator_report(selected_file)
+                if report:
+                    with st.expander("🧮 Computed Indicators"):
+                        st.text(facts_text(report))
+                with st.expander("🧪 Backtest"):
+                    backtest_panel(selected_file)
+
+        # Show selected chart
+        elif selected_chart:
+            st.subheader(f"📊 Selected: {selected_chart}")
+
+            # Show the cached analysis-sized copy; the full image is only
+            # decoded if that copy was never built
+            digest = selected_file["digest"]
+            preview = get_rendition_cache().get(
+                digest, "analysis", load=lambda: get_blob_store().open(digest)
+            )
+            if preview:
+                st.image(preview, caption=selected_chart, use_column_width=True)
+            else:
+                st.info("Image preview not available")
+
+            # Candles read from the pixels; sent instead of the image
+            with st.expander("🔢 Digitized Price Series"):
+                col_top, col_bottom = st.columns(2)
+                with col_top:
+                    st.number_input("Price at highest wick", min_value=0.0, format="%.5f",
+                                    key=f"calib_top_{digest}", help="Leave at 0 for relative units")
+                with col_bottom:
+                    st.number_input("Price at lowest wick", min_value=0.0, format="%.5f",
+                                    key=f"calib_bottom_{digest}")
+                digitized, series = chart_series(selected_file)
+                if digitized is None:
+                    st.info("No candlesticks detected in this image.")
+                else:
+                    st.line_chart(digitized.ohlc[:, 3], height=160)
+                    st.caption(f"{len(digitized.ohlc)} candles, {len(series.encode()) / 1024:.1f} KB as text"
+                               + ("" if digitized.calibrated else " (relative units)"))
+
+    if selected_chart:
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            st.subheader("🔍 Analysis Options")
+
+            analysis_focus = st.multiselect(
+                "What to analyze:",
+                ["Support/Resistance", "Trend Direction", "Chart Patterns",
+                 "Entry/Exit Points", "Risk Assessment", "Volume Analysis"],
+                default=["Support/Resistance", "Trend Direction"]
+            )
+
+            include_pdf_context = st.checkbox("Reference PDF knowledge",
+                                            value=has_knowledge())
+            include_series = st.checkbox("Include price series and indicators", value=bool(chart_files))
+
+            if selected_file:
+                similar_panel(selected_file, selected_chart)
+
+            if st.button("🚀 Analyze with AI", type="primary"):
+                # Prepare analysis request
+                analysis_request = {
+                    "chart": selected_chart,
+                    "digest": selected_file["digest"] if selected_file else None,
+                    "focus_areas": analysis_focus,
+                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+
+                # Store analysis up front; the background job streams into it
+                remember_analysis(analysis_request, selected_file)
+                st.session_state.current_analysis = analysis_request
+
+                # Get AI analysis
+                if llm_available:
+                    try:
+                        submit_completion(
+                            backend, analysis_request, "ai_analysis", f"Analysis: {selected_chart}",
+                            error_prefix="⚠️ AI Analysis Error",
+                            **analysis_request_params(
+                                selected_chart, analysis_focus, include_pdf_context,
+                                *prompt_inputs(selected_file, include_series)
+                            )
+                        )
+                    except Exception as e:
+                        analysis_request["ai_analysis"] = f"⚠️ AI Analysis Error: {str(e)}\n\nFocus on clear support/resistance levels. Always use proper risk management."
+                        save(analysis_request)
+                else:
+                    analysis_request["ai_analysis"] = "⚠️ OpenAI API key required for AI analysis."
+                    save(analysis_request)
+
+            # Latest analysis of the selected chart; shown on every rerun, so
+            # it can still be streaming from its job
+            analysis_request = st.session_state.get("current_analysis")
+            if analysis_request and analysis_request.get("digest") == (selected_file or {}).get("digest"):
+                # Display results
+                st.subheader("📊 Analysis Results")
+                result_placeholder = st.empty()
+                if job_active(analysis_request):
+                    result_placeholder.markdown(live_text(analysis_request, "ai_analysis", True))
+                    watch(analysis_request, "ai_analysis", result_placeholder)
+                    if st.button("⏹️ Stop", key="stop_analysis"):
+                        get_job_queue().cancel(analysis_request["job_id"])
+                else:
+                    result_placeholder.markdown(analysis_request.get("ai_analysis", ""))
+                    if timing_caption(analysis_request):
+                        st.caption(timing_caption(analysis_request))
+
+                # Risk assessment from the computed indicators
+                report = indicator_report(selected_file) if selected_file else None
+                st.markdown("### ⚠️ Risk Assessment")
+                if report:
+                    col_a, col_b, col_c = st.columns(3)
+                    with col_a:
+                        st.metric("Risk Level", report["risk_level"] or "n/a",
+                                  help="From ATR as a percentage of price")
+                    with col_b:
+                        st.metric("Confidence", f"{report['confidence']}%",
+                                  help=f"Agreement of trend signals ({report['trend']})")
+                    with col_c:
+                        st.metric("Timeframe", f"{report['interval']} bars" if report["interval"] else "n/a")
+                    if report["stop_long"] is not None and report["absolute"]:
+                        st.caption(f"1.5×ATR stops: long below {report['stop_long']:.5g}, "
+                                   f"short above {report['stop_short']:.5g}")
+                else:
+                    st.info("Upload OHLCV data or a candlestick screenshot to compute risk metrics.")
+
+                # Download analysis
+                analysis_text = f"""
+                Chart Analysis Report
+                ====================
+                Chart: {analysis_request['chart']}
+                Date: {analysis_request['timestamp']}
+                Focus Areas: {', '.join(analysis_request['focus_areas'])}
+
+                Analysis:
+                {analysis_request.get('ai_analysis', 'No analysis available')}
+
+                ---
+                Disclaimer: Educational content only. Not financial advice.
+                """
+
+                st.download_button(
+                    label="💾 Download Report",
+                    data=analysis_text,
+                    file_name=f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                    mime="text/plain"
+                )
+
+            # Batch analysis of several charts at once
+            if chart_files:
+                with st.expander("📦 Batch Analysis"):
+                    batch_labels = st.multiselect("Charts to analyze:", chart_labels)
+
+                    if st.button("🚀 Analyze Selected Charts", disabled=not batch_labels):
+                        if not llm_available:
+                            st.warning("⚠️ OpenAI API key required for AI analysis.")
+                        else:
+                            # One background job per chart; they run side by side
+                            # and each is recorded as soon as it is queued. A chart
+                            # that fails gets the error on its record and the rest
+                            # of the batch carries on
+                            failed = 0
+                            for label in batch_labels:
+                                file_info = chart_files[chart_labels.index(label)]
+                                chart = file_info["name"]
+                                analysis_request = remember_analysis({
+                                    "chart": chart,
+                                    "digest": file_info["digest"],
+                                    "focus_areas": analysis_focus,
+                                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                                }, file_info)
+                                try:
+                                    submit_completion(
+                                        backend, analysis_request, "ai_analysis", f"Analysis: {chart}",
+                                        error_prefix="⚠️ AI Analysis Error",
+                                        **analysis_request_params(
+                                            chart, analysis_focus, include_pdf_context,
+                                            *prompt_inputs(file_info, include_series)
+                                        )
+                                    )
+                                except Exception as e:
+                                    analysis_request["ai_analysis"] = f"⚠️ AI Analysis Error: {str(e)}"
+                                    save(analysis_request)
+                                    failed += 1
+                            st.success(f"✅ Queued {len(batch_labels) - failed} analyses; they appear under "
+                                       "Previous Analyses as they finish")
+                            if failed:
+                                st.warning(f"⚠️ {failed} charts could not be analyzed; "
+                                           "see Previous Analyses for the errors")
+
+        with col2:
+            st.subheader("📋 Previous Analyses")
+            if st.session_state.analyses:
+                # Recent analyses come from session state, older pages from the session store
+                shown = ANALYSES_PAGE * (1 + st.session_state.get("analyses_pages", 0))
+                recent = st.session_state.analyses
+                visible = older_records("analyses", shown - len(recent)) + recent[-shown:]
+                total = record_count("analyses")
+                for i, analysis in enumerate(reversed(visible)):
+                    with st.expander(f"Analysis #{total - i}"):
+                        st.write(f"**Chart:** {analysis['chart'][:30]}...")
+                        st.write(f"**Time:** {analysis['timestamp']}")
+                        st.write(f"**Focus:** {', '.join(analysis['focus_areas'][:2])}...")
+
+                        preview = (analysis.get('ai_analysis') or '')[:100] + "..."
+                        st.write(f"**Preview:** {preview}")
+                        if job_active(analysis):
+                            st.caption("⏳ Still running")
+                        elif timing_caption(analysis):
+                            st.caption(timing_caption(analysis))
+
+                        if st.button("🔍 View Full", key=f"view_full_{i}"):
+                            st.write("**Full Analysis:**")
+                            st.write(analysis.get('ai_analysis', 'No analysis'))
+                if total > len(visible) and st.button("⬇️ Show older analyses"):
+                    st.session_state.analyses_pages = st.session_state.get("analyses_pages", 0) + 1
+                    st.rerun()
+            else:
+                st.info("No analyses yet. Analyze a chart to see results here.")
@@ -0,0 +1,135 @@
+"""Chat mode: conversation with the trading coach, grounded in the knowledge base."""
+
+import streamlit as st
+
+from trading_assistant.config import LLM_MODEL, PROMPT_TOKEN_BUDGET
+from trading_assistant.metrics import span
+from trading_assistant.prompting import PromptAssembler
+from trading_assistant.streaming import live_text, timing_caption
+from trading_assistant.views.common import (
+    forget, get_library, has_knowledge, job_active, knowledge_context, older_records, record_count, remember,
+    save, submit_completion, watch
+)
+
+# Turns shown at once, and loaded per "Load older messages" click
+CHAT_PAGE = 10
+
+
+def render(backend):
+    llm_available = backend is not None
+
+    st.header("💬 Chat with Trading AI")
+
+    if not llm_available:
+        st.warning("""
+        🔑 **OpenAI API Key Required**
+
+        Enter your API key in the sidebar to enable:
+        • Intelligent trading discussions
+        • PDF content referencing
+        • Chart analysis explanations
+        • Strategy advice
+        """)
+    else:
+        # Display chat history: the recent turns plus any pages of older ones
+        # read back from the session store
+        shown = CHAT_PAGE * (1 + st.session_state.get("chat_pages", 0))
+        history = st.session_state.chat_history
+        visible = older_records("chat_history", shown - len(history)) + history[-shown:]
+        hidden = record_count("chat_history") - len(visible)
+        if hidden > 0 and st.button("⬆️ Load older messages"):
+            st.session_state.chat_pages = st.session_state.get("chat_pages", 0) + 1
+            st.rerun()
+        for message in visible:
+            with st.chat_message(message["role"]):
+                if job_active(message):
+                    # Still being written by a background job; kept live by follow_jobs()
+                    placeholder = st.empty()
+                    placeholder.markdown(live_text(message, "content", True))
+                    watch(message, "content", placeholder)
+                else:
+                    st.markdown(message["content"])
+                    if timing_caption(message):
+                        st.caption(timing_caption(message))
+
+        # Chat input
+        if prompt := st.chat_input("Ask about trading strategies, psychology, or analysis..."):
+            # Add user message
+            remember("chat_history", {"role": "user", "content": prompt})
+            with st.chat_message("user"):
+                st.markdown(prompt)
+
+            # Get AI response: queued as a background job, so further messages
+            # and clicks don't wait for (or abandon) it
+            with st.chat_message("assistant"):
+                reply_placeholder = st.empty()
+
+                # Add to history first; the job streams into this record
+                reply = remember("chat_history", {"role": "assistant", "content": ""})
+
+                try:
+                    # Prepare system message
+                    system_message = """You are a professional trading coach and analyst.
+                    Provide educational insights about trading.
+                    Guidelines:
+                    1. Be clear and actionable
+                    2. Reference uploaded materials when relevant
+                    3. Emphasize risk management
+                    4. Remind this is educational, not advice
+                    5. Trading involves risk of loss"""
+                    # Turns that have left memory survive as a compact summary
+                    if st.session_state.chat_summary["content"]:
+                        system_message += ("\n\nSummary of the earlier conversation:\n"
+                                           + st.session_state.chat_summary["content"])
+
+                    # Pack knowledge and earlier turns (oldest first) into the token budget
+                    knowledge = knowledge_context(prompt)
+                    with span("prompt_assembly") as fields:
+                        messages, prompt_report = PromptAssembler(PROMPT_TOKEN_BUDGET, LLM_MODEL).assemble(
+                            system_message, prompt,
+                            knowledge=knowledge,
+                            history=st.session_state.chat_history[:-2]
+                        )
+                        fields.update(tokens=prompt_report["used"], tokens_estimated=prompt_report["estimated"])
+                    reply["prompt_tokens_est"] = prompt_report["used"]
+
+                    submit_completion(
+                        backend, reply, "content", f"Reply: {prompt[:40]}",
+                        model=LLM_MODEL,
+                        messages=messages,
+                        max_tokens=600,
+                        temperature=0.7
+                    )
+                except Exception as e:
+                    reply["content"] = f"⚠️ Error: {str(e)}"
+                    save(reply)
+                    reply_placeholder.error(reply["content"])
+                else:
+                    reply_placeholder.markdown(live_text(reply, "content", True))
+                    watch(reply, "content", reply_placeholder)
+
+        # Chat controls
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("🗑️ Clear Chat"):
+                forget("chat_history")
+                st.session_state.chat_pages = 0
+                st.rerun()
+        with col2:
+            if st.button("💡 Trading Topics"):
+                topics = [
+                    "Explain support and resistance",
+                    "What is risk-reward ratio?",
+                    "How to manage emotions in trading?",
+                    "Best timeframes for day trading?",
+                    "How to backtest a strategy?"
+                ]
+                remember("chat_history", {
+                    "role": "assistant",
+                    "content": "**Suggested topics to explore:**\n\n" + "\n".join([f"• {t}" for t in topics])
+                })
+                st.rerun()
+        with col3:
+            if st.button("📚 Use Knowledge Base") and has_knowledge():
+                st.info(f"Knowledge base active ({len(st.session_state.knowledge)} items, "
+                        f"{len(get_library().documents())} in the library)")
@@ -0,0 +1,710 @@
+"""Shared resources and helpers used by more than one page.
+
+Resources are created once per process through ``st.cache_resource``;
+the modules behind them are imported inside the getters so a page only
+pays for what it actually opens.
+"""
+
+import os
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+
+import streamlit as st
+
+from trading_assistant.config import (
+    BAR_STORE_DIR, CHAT_SUMMARY_TOKENS, DATA_DIR, GLOBAL_MEMORY_BUDGET_BYTES, JOB_WORKERS, LIBRARY_DIR, LIVE_BAR_CAPACITY,
+    LIVE_FEED, LIVE_MAX_SYMBOLS, LIVE_TIMEFRAMES, LLM_BASE_URLS,
+    LLM_CONNECT_TIMEOUT, LLM_MODEL, LLM_READ_TIMEOUT, LLM_RETRIES, METRICS_LOG, METRICS_PORT,
+    PROMPT_TOKEN_BUDGET, RENDITION_CACHE_BYTES, SCAN_WORKERS,
+    SESSION_ANALYSES_WINDOW, SESSION_CHAT_WINDOW, SESSION_MEMORY_BUDGET_BYTES, SESSION_UPLOAD_BUDGET_BYTES,
+    SWEEP_WORKERS, UPLOAD_BUDGET_BYTES
+)
+from trading_assistant.knowledge import make_entry
+from trading_assistant.llm_cache import ResponseCache, cache_key
+from trading_assistant.memory_governor import Item, plan_evictions
+from trading_assistant.metrics import METRICS, deep_sizeof, span, start_http_exporter
+from trading_assistant.prompting import PromptAssembler, compact_history, count_tokens
+from trading_assistant.retrieval import BM25Index, format_result, fuse_results
+from trading_assistant.streaming import stream_into
+
+# Knowledge chunks retrieved per prompt; the token budget decides how many fit
+KNOWLEDGE_TOP_K = 8
+
+# Chunks embedded and indexed per step while learning a document, so a
+# large book is never held in memory whole
+LEARN_BATCH = 256
+
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg')
+
+# Dataset "digests" naming a bar store series rather than an upload
+STORED_PREFIX = "bars/"
+
+
+class DatasetUnavailable(LookupError):
+    """An uploaded dataset's blob was evicted or a stored series is gone."""
+
+# Persisted session-state lists: name -> (record kind in the session store,
+# records kept in memory; None keeps them all)
+SESSION_LISTS = {
+    "chat_history": ("chat", SESSION_CHAT_WINDOW),
+    "analyses": ("analysis", SESSION_ANALYSES_WINDOW),
+    "uploaded_files": ("upload", None),
+}
+
+# Newest records of these lists are never evicted by the memory governor
+# (the exchange being shown and the latest analysis)
+PINNED_RECORDS = {"chat_history": 2, "analyses": 1}
+
+
+@st.cache_resource
+def get_metrics():
+    # Process-wide registry; sinks are attached once per process
+    if METRICS_LOG:
+        os.makedirs(os.path.dirname(METRICS_LOG) or ".", exist_ok=True)
+        METRICS.enable_jsonl(METRICS_LOG)
+    if METRICS_PORT:
+        start_http_exporter(METRICS_PORT)
+    return METRICS
+
+
+@st.cache_resource
+def get_vector_index():
+    # One mmap-backed index per process, shared by all sessions
+    from trading_assistant.vector_index import VectorIndex
+    return VectorIndex(os.path.join(DATA_DIR, "vectors"))
+
+
+@st.cache_resource
+def get_library():
+    # Offline-built library, memory-mapped read-only and shared by all sessions
+    from trading_assistant.library import Library
+    return Library(LIBRARY_DIR)
+
+
+@st.cache_resource
+def get_blob_store():
+    # Uploaded files live on disk, keyed by content; sessions keep handles
+    from trading_assistant.blob_store import BlobStore
+    return BlobStore(os.path.join(DATA_DIR, "blobs"), UPLOAD_BUDGET_BYTES)
+
+
+@st.cache_resource
+def get_bar_store():
+    # Memory-mapped OHLCV columns; every session slices the same pages
+    from trading_assistant.bar_store import BarStore
+    return BarStore(BAR_STORE_DIR)
+
+
+@st.cache_resource
+def get_rendition_cache():
+    # Thumbnails and analysis-sized copies, built once per image
+    from trading_assistant.images import RenditionCache
+    return RenditionCache(os.path.join(DATA_DIR, "renditions"), RENDITION_CACHE_BYTES)
+
+
+@st.cache_resource
+def get_response_cache():
+    # LRU in memory, TTL-bounded SQLite on disk; shared by all sessions
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return ResponseCache(os.path.join(DATA_DIR, "responses.sqlite3"))
+
+
+@st.cache_resource
+def get_session_store():
+    # Chat turns, analyses and uploads of every session, written through on append
+    from trading_assistant.session_store import SessionStore
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return SessionStore(os.path.join(DATA_DIR, "sessions.sqlite3"))
+
+
+@st.cache_resource
+def get_memory_governor():
+    # Process-wide tally of session memory, used to share the global budget
+    from trading_assistant.memory_governor import MemoryGovernor
+    return MemoryGovernor(SESSION_MEMORY_BUDGET_BYTES, GLOBAL_MEMORY_BUDGET_BYTES)
+
+
+@st.cache_resource
+def get_live_market():
+    # One feed reader per process; every session reads the same bars
+    if not LIVE_FEED:
+        return None
+    from trading_assistant.live_feed import LiveMarket, parse_timeframes
+    market = LiveMarket(parse_timeframes(LIVE_TIMEFRAMES), LIVE_BAR_CAPACITY, LIVE_MAX_SYMBOLS)
+    market.follow(LIVE_FEED)
+    return market
+
+
+@st.cache_resource
+def get_job_queue():
+    # Completion jobs run here, outside any script run, so reruns don't abandon them
+    from trading_assistant.jobs import JobQueue
+    return JobQueue(JOB_WORKERS)
+
+
+@st.cache_resource
+def get_backend(kind, api_key=None):
+    # One pooled keep-alive client per backend and key, reused across reruns
+    from trading_assistant.llm import ChatBackend
+    return ChatBackend(
+        LLM_BASE_URLS[kind], api_key=api_key, model=LLM_MODEL,
+        timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT), retries=LLM_RETRIES,
+        pool_size=max(JOB_WORKERS, 16)
+    )
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def digitize_chart(digest, top_price=None, bottom_price=None):
+    # Only numbers are kept, so caching per chart and calibration is cheap
+    from trading_assistant.digitizer import digitize, load_rgb
+    data = get_rendition_cache().get(digest, "analysis", load=lambda: get_blob_store().open(digest))
+    if not data:
+        return None
+    return digitize(load_rgb(data), top_price, bottom_price)
+
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def chart_fingerprint(digest):
+    # Perceptual hash of an uploaded chart, from its small preview rendition
+    from trading_assistant.chart_hash import chart_hash
+    data = get_rendition_cache().get(digest, "thumb", load=lambda: get_blob_store().open(digest))
+    if not data:
+        return None
+    with span("chart_hash"):
+        return chart_hash(data)
+
+
+def stored_datasets():
+    # Series already in the bar store, as file entries that load_dataset
+    # understands: the "digest" names the series and its length, so
+    # appended bars make a new cache key
+    store = get_bar_store()
+    datasets = []
+    for symbol in store.symbols():
+        for timeframe in store.timeframes(symbol):
+            series = store.series(symbol, timeframe)
+            if series is not None and len(series):
+                datasets.append({"name": f"{symbol} {timeframe}", "stored": True,
+                                 "digest": f"{STORED_PREFIX}{symbol}/{timeframe}/{len(series)}"})
+    return datasets
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def load_dataset(digest, filename):
+    # Price data are parsed once per content hash and imported into the bar
+    # store as their own series; every later load, in any session, is a
+    # zero-copy slice of it. Files without a time column cannot be indexed
+    # and stay parsed arrays. A dataset that is gone raises rather than
+    # returning None, which would stay cached after a re-upload
+    store = get_bar_store()
+    if digest.startswith(STORED_PREFIX):
+        symbol, timeframe, length = digest[len(STORED_PREFIX):].split("/")
+        series = store.series(symbol, timeframe)
+        if series is None:
+            raise DatasetUnavailable(f"{symbol} {timeframe} is no longer in the bar store")
+        return series.rows(0, int(length))
+    series = store.imported(digest)
+    if series is None:
+        from trading_assistant.ohlcv import read_ohlcv
+        with get_blob_store().open(digest) as blob:
+            if blob is None:
+                raise DatasetUnavailable(f"{filename} is no longer available")
+            with span("ohlcv_parse") as fields:
+                data = read_ohlcv(blob, filename)
+                fields["bars"] = len(data["close"])
+        if data["time"] is None:
+            return data
+        series = store.import_bars(digest, data)
+    return series.slice()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def dataset_indicators(digest, filename):
+    # Memoised per dataset hash; reruns reuse the small report
+    from trading_assistant.indicators import analyze
+    data = load_dataset(digest, filename)
+    with span("indicators", bars=len(data["close"])):
+        return analyze(data)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def chart_indicators(digest, top_price=None, bottom_price=None):
+    # Indicators over the candles digitized from a screenshot
+    from trading_assistant.indicators import analyze
+    chart = digitize_chart(digest, top_price, bottom_price)
+    if chart is None:
+        return None
+    ohlc = chart.ohlc
+    data = {"open": ohlc[:, 0], "high": ohlc[:, 1], "low": ohlc[:, 2], "close": ohlc[:, 3]}
+    with span("indicators", bars=len(ohlc)):
+        return analyze(data, absolute=chart.calibrated)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def backtest_dataset(digest, filename, strategy, params, stop_loss, take_profit, fee):
+    # ``params`` is a tuple of (name, value) pairs so it hashes stably.
+    # Raises DatasetUnavailable if the upload has been evicted
+    from trading_assistant.backtest import run
+    data = load_dataset(digest, filename)
+    with span("backtest", bars=len(data["close"])):
+        equity, trades, stats = run(data, strategy, dict(params), stop_loss, take_profit, fee)
+    # Keep a display-sized curve, always ending on the last bar
+    step = max(1, len(equity) // 2000)
+    return equity[::-step][::-1].copy(), stats
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def sweep_dataset(digest, filename, strategy, combos, stop_loss, take_profit, fee):
+    from trading_assistant.backtest import sweep
+    data = load_dataset(digest, filename)
+    with span("backtest_sweep", bars=len(data["close"]), runs=len(combos)):
+        return [{**dict(params), **stats} for params, stats in sweep(
+            data, strategy, [dict(c) for c in combos], stop_loss, take_profit, fee,
+            workers=SWEEP_WORKERS or None
+        )]
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def scan_watchlist(sources, rules):
+    # ``sources`` are (symbol, path, filename, mtime) so an edited file
+    # invalidates the result; ``rules`` are (name, ((param, value), ...))
+    from trading_assistant.scanner import scan
+    with span("watchlist_scan", symbols=len(sources)):
+        return scan([source[:3] for source in sources], [(name, dict(params)) for name, params in rules],
+                    workers=SCAN_WORKERS or None)
+
+
+def record_usage(fields, usage, messages, text):
+    # Token counters from the server's usage report, estimated if it sent none
+    if not usage:
+        usage = {
+            "prompt_tokens": sum(count_tokens(m["content"], LLM_MODEL) for m in messages),
+            "completion_tokens": count_tokens(text, LLM_MODEL)
+        }
+        fields["usage_estimated"] = True
+    fields["prompt_tokens"] = usage.get("prompt_tokens", 0)
+    fields["completion_tokens"] = usage.get("completion_tokens", 0)
+    METRICS.increment("llm_prompt_tokens_total", fields["prompt_tokens"])
+    METRICS.increment("llm_completion_tokens_total", fields["completion_tokens"])
+
+
+def completion_job(backend, cache, key, request):
+    # Job-queue work that streams a reply into job.record[key]. It runs on a
+    # pool thread, so the backend and cache are passed in rather than looked
+    # up through st.cache_resource. Repeated requests are served from the
+    # response cache; a reply is cached once it has fully arrived
+    def work(job):
+        record = job.record
+        request_key = cache_key(**request)
+        with span("llm_completion", stream=True) as fields:
+            METRICS.increment("llm_requests_total")
+            cached = cache.get(request_key)
+            fields["cached"] = cached is not None
+            if cached is not None:
+                METRICS.increment("llm_cache_hits_total")
+                record[key] = cached
+                record["cached"] = True
+                return
+            usage = {}
+            text = stream_into(record, key, backend.stream(usage=usage, **request), stop=job.cancelled.is_set)
+            fields["ttft_s"] = record.get("ttft_s")
+            if record["partial"]:
+                fields["cancelled"] = True
+                return
+            record_usage(fields, usage, request["messages"], text)
+        cache.put(request_key, text)
+    return work
+
+
+def submit_completion(backend, record, key, label, error_prefix="⚠️ Error", **request):
+    # Queue a streamed completion into a remembered record. The worker writes
+    # the record back to the session store when the job ends, so the reply is
+    # kept even if this session has moved on or closed
+    store = get_session_store()
+
+    def on_done(job):
+        if job.error is not None:
+            partial = record.get(key) or ""
+            record[key] = (partial + "\n\n" if partial else "") + f"{error_prefix}: {job.error}"
+        store.update(record)
+
+    record["job_id"] = get_job_queue().submit(
+        session_key(), label, record, completion_job(backend, get_response_cache(), key, request), on_done
+    )
+    return record["job_id"]
+
+
+def job_active(record):
+    # True while a queued or running job is still writing to ``record``
+    job = get_job_queue().poll(record.get("job_id")) if record.get("job_id") else None
+    return job is not None and job.active
+
+
+def watch(record, key, placeholder):
+    # Have follow_jobs() keep ``placeholder`` up to date until the job ends
+    st.session_state.watched.append((record, key, placeholder))
+
+
+def has_knowledge():
+    return (bool(st.session_state.knowledge) or len(get_vector_index()) > 0
+            or len(get_library()) > 0)
+
+
+def search_knowledge(query, k=KNOWLEDGE_TOP_K):
+    # Hybrid retrieval merged by rank: BM25 over this session's knowledge,
+    # dense vectors over the documents learned in any session, and both
+    # over the ingested library. Other sessions' documents are searched in
+    # the shared mmap index rather than copied into this one
+    lexical = st.session_state.knowledge_index.search(query, k=k)
+    semantic = get_vector_index().search(query, k=k)
+    library = get_library()
+    library.refresh()
+    results = fuse_results([lexical, semantic, library.search(query, k=k), library.search_dense(query, k=k)], k=k)
+    # Recency for the memory governor's LRU
+    now = time.time()
+    for _, name, _ in results:
+        if name in st.session_state.knowledge:
+            st.session_state.knowledge[name]["last_used"] = now
+    return results
+
+
+def learn_document(name, chunks, source):
+    # Index a stream of chunks LEARN_BATCH at a time as they arrive, into
+    # this session's BM25 index and the vector index every session
+    # searches. Session state keeps only the document's size; the session
+    # store remembers that this session owns it
+    index, vector_index = st.session_state.knowledge_index, get_vector_index()
+    date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    index.remove_document(name)
+    vector_index.remove_document(name)
+    count = chars = pages = 0
+    chunks = iter(chunks)
+    while batch := list(islice(chunks, LEARN_BATCH)):
+        index.add_chunks(name, batch)
+        vector_index.add_chunks(name, batch, source=source, date=date)
+        count += len(batch)
+        chars += sum(len(c["text"]) for c in batch)
+        pages = batch[-1]["page"] or pages
+    entry = st.session_state.knowledge[name] = make_entry(count, chars, source, pages=pages or 1, date=date)
+    get_session_store().append(session_key(), "knowledge", {"name": name})
+    return entry
+
+
+def knowledge_context(query):
+    # Ranked knowledge lines for the prompt assembler
+    if not has_knowledge():
+        return []
+    with span("knowledge_context") as fields:
+        lines = [format_result(r) for r in search_knowledge(query)]
+        fields["results"] = len(lines)
+    return lines
+
+
+def analysis_request_params(chart, focus_areas, include_pdf_context, series=None, facts=None):
+    # Completion request for one chart; built on the script thread because
+    # knowledge retrieval reads session state. ``series`` is the digitized
+    # OHLC text, which stands in for the image itself; ``facts`` are the
+    # locally computed indicator values
+    knowledge = knowledge_context(" ".join(focus_areas)) if include_pdf_context else []
+    series_section = f"""
+    Approximate OHLC series digitized from the chart screenshot:
+    {series}
+    """ if series else ""
+    if facts:
+        series_section += f"""
+    Computed indicators (treat these numbers as ground truth):
+    {facts}
+    """
+
+    prompt = f"""
+    Analyze this trading chart: {chart}
+
+    Focus on: {', '.join(focus_areas)}
+    {series_section}
+    Provide detailed analysis including:
+    1. Key observations
+    2. Technical insights
+    3. Trading considerations
+    4. Risk management tips
+
+    Format as clear, actionable points.
+    Remember: Educational content only, not financial advice.
+    """
+
+    with span("prompt_assembly") as fields:
+        messages, report = PromptAssembler(PROMPT_TOKEN_BUDGET, LLM_MODEL).assemble(
+            "You are a professional trading analyst.", prompt,
+            knowledge=knowledge, knowledge_heading="Reference knowledge:"
+        )
+        fields.update(tokens=report["used"], tokens_estimated=report["estimated"])
+    return {
+        "model": LLM_MODEL,
+        "messages": messages,
+        "max_tokens": 600,
+        "temperature": 0
+    }
+
+
+def session_key():
+    # Carried in the URL (?sid=...) so a reload or restart finds the same records
+    if 'session_key' not in st.session_state:
+        sid = st.experimental_get_query_params().get("sid", [""])[0]
+        if not sid:
+            sid = uuid.uuid4().hex
+            st.experimental_set_query_params(sid=sid)
+        st.session_state.session_key = sid
+    return st.session_state.session_key
+
+
+def remember(name, record):
+    # Append to a persisted session list and write the record through;
+    # only the most recent window stays in session state
+    kind, window = SESSION_LISTS[name]
+    record.setdefault("created", time.time())
+    get_session_store().append(session_key(), kind, record)
+    records = st.session_state[name]
+    records.append(record)
+    if window and len(records) > window:
+        drop_oldest(name, len(records) - window)
+    return record
+
+
+def remember_analysis(record, file_info=None):
+    # Remember an analysis and index its chart's perceptual hash, so later
+    # uploads of a near-identical screenshot can find it. The hash is also
+    # stored as a small record of its own, so a new session rebuilds the
+    # index without reading every analysis body
+    if file_info is not None and file_info["name"].lower().endswith(IMAGE_EXTENSIONS):
+        record["chart_hash"] = chart_fingerprint(file_info["digest"])
+    remember("analyses", record)
+    if record.get("chart_hash"):
+        key = _chart_key(record)
+        get_session_store().append(session_key(), "chart_hash", {"hash": record["chart_hash"], "key": key})
+        st.session_state.chart_index.add(record["chart_hash"], key)
+    return record
+
+
+def _chart_key(record):
+    return record["record_id"], record["chart"], record["timestamp"]
+
+
+def similar_analyses(file_info, limit=5):
+    # ``(distance, (record_id, chart, timestamp))`` of this session's past
+    # analyses whose chart looks like ``file_info``, nearest first
+    if not file_info["name"].lower().endswith(IMAGE_EXTENSIONS):
+        return []
+    fingerprint = chart_fingerprint(file_info["digest"])
+    if fingerprint is None:
+        return []
+    with span("chart_similarity") as fields:
+        matches = st.session_state.chart_index.search(fingerprint)[:limit]
+        fields["matches"] = len(matches)
+    return matches
+
+
+def stored_record(record_id):
+    return get_session_store().get(session_key(), record_id)
+
+
+def drop_oldest(name, count):
+    # Remove the oldest in-memory records of a persisted list; they stay in
+    # the session store. Chat turns are folded into the rolling summary
+    records = st.session_state[name]
+    dropped = records[:count]
+    del records[:count]
+    if name == "chat_history" and dropped:
+        summary = st.session_state.chat_summary
+        summary["content"] = compact_history(summary["content"], dropped, CHAT_SUMMARY_TOKENS, LLM_MODEL)
+        if "record_id" in summary:
+            save(summary)
+        else:
+            get_session_store().append(session_key(), "summary", summary)
+
+
+def save(record):
+    # Rewrite a remembered record after it changed (e.g. a reply finished streaming)
+    get_session_store().update(record)
+
+
+def forget(name, record=None):
+    # Drop one remembered record, or the whole list
+    kind, _ = SESSION_LISTS[name]
+    if record is None:
+        get_session_store().delete(session_key(), kind)
+        st.session_state[name] = []
+        if name == "chat_history":
+            get_session_store().delete(session_key(), "summary")
+            st.session_state.chat_summary = {"content": ""}
+    else:
+        get_session_store().delete(session_key(), kind, record.get("record_id"))
+        st.session_state[name].remove(record)
+
+
+def older_records(name, limit):
+    # Up to ``limit`` records before the in-memory window, read from the
+    # store on each render rather than kept in session state
+    records = st.session_state[name]
+    if not records or limit <= 0:
+        return []
+    kind, _ = SESSION_LISTS[name]
+    return get_session_store().page(session_key(), kind, before_id=records[0].get("record_id"), limit=limit)
+
+
+def record_count(name):
+    kind, _ = SESSION_LISTS[name]
+    return get_session_store().count(session_key(), kind)
+
+
+def restore_session_lists():
+    # Reload the recent window of each persisted list this session does
+    # not hold yet; lists already in session state are left as they are
+    store, sid = get_session_store(), session_key()
+    missing = [name for name in SESSION_LISTS if name not in st.session_state]
+    for name in missing:
+        kind, window = SESSION_LISTS[name]
+        st.session_state[name] = store.latest(sid, kind, window)
+    if "uploaded_files" not in missing:
+        return
+    # Uploads hold a blob reference; drop entries whose blob was evicted.
+    # Spilled uploads hold none and are kept either way
+    blob_store = get_blob_store()
+    for file_info in list(st.session_state.uploaded_files):
+        if not file_info.get("spilled") and not blob_store.acquire(file_info["digest"]):
+            store.delete(sid, "upload", file_info["record_id"])
+            st.session_state.uploaded_files.remove(file_info)
+
+
+def spill_knowledge(name):
+    # Drop a document from this session's BM25 index. It stays in the
+    # on-disk vector library, which keeps serving it to dense retrieval
+    entry = st.session_state.knowledge[name]
+    st.session_state.knowledge_index.remove_document(name)
+    entry["spilled"] = True
+    entry["bytes"] = 0
+
+
+def spill_upload(file_info):
+    # Stop pinning an upload's blob. The record and its digest stay, so the
+    # upload is still listed and usable until the blob store needs the
+    # space; its renditions and any imported bars outlive the blob
+    get_blob_store().release(file_info["digest"])
+    file_info["spilled"] = True
+    save(file_info)
+
+
+def _entry_last_used(entry):
+    if "last_used" in entry:
+        return entry["last_used"]
+    try:
+        return datetime.strptime(entry["date"], "%Y-%m-%d %H:%M:%S").timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def govern_session_memory():
+    """Keep this session within its memory and upload budgets.
+
+    Chat turns, analyses and knowledge texts are sized and, past the
+    session's budget, the least recently used go first: chat turns are
+    compacted into the rolling summary, analyses are left to the session
+    store and knowledge texts to the vector library. Uploads are on disk
+    already and have a budget of their own; past it, the least recently
+    used stop pinning their blobs, which the blob store may then evict
+    when it needs the space. The outcome is kept in
+    ``st.session_state.memory_usage`` for display.
+    """
+    state = st.session_state
+    with span("memory_governor") as fields:
+        items, pinned = [], 0
+        for name, keep in PINNED_RECORDS.items():
+            records = state[name]
+            kind, _ = SESSION_LISTS[name]
+            for i, record in enumerate(records):
+                size = deep_sizeof(record)
+                if i >= len(records) - keep:
+                    pinned += size
+                else:
+                    items.append(Item(kind, i, size, record.get("created", 0.0)))
+        for name, entry in state.knowledge.items():
+            if not entry.get("spilled"):
+                # Sized by its text: the BM25 index holds its chunks and postings
+                entry.setdefault("bytes", entry["chars"])
+                items.append(Item("knowledge", name, entry["bytes"], _entry_last_used(entry)))
+        by_kind = {"chat": 0, "analysis": 0, "knowledge": 0}
+        for item in items:
+            by_kind[item.kind] += item.bytes
+
+        governor = get_memory_governor()
+        budget = governor.report(session_key(), pinned + sum(by_kind.values()))
+        evicted = plan_evictions(items, budget - pinned)
+        counts = {"chat": 0, "analysis": 0, "knowledge": 0}
+        for item in evicted:
+            counts[item.kind] += 1
+            by_kind[item.kind] -= item.bytes
+            if item.kind == "knowledge":
+                spill_knowledge(item.key)
+        # Eviction is oldest first within a list, so a count is enough
+        if counts["chat"]:
+            drop_oldest("chat_history", counts["chat"])
+        if counts["analysis"]:
+            drop_oldest("analyses", counts["analysis"])
+        used = pinned + sum(by_kind.values())
+        governor.report(session_key(), used)
+
+        # Uploads: pinned blob bytes on disk; the newest is always kept
+        blob_store = get_blob_store()
+        uploads = [Item("upload", i, blob_store.size(f["digest"]), f.get("last_used", f.get("created", 0.0)))
+                   for i, f in enumerate(state.uploaded_files) if not f.get("spilled")]
+        upload_bytes = sum(item.bytes for item in uploads)
+        evicted = plan_evictions(uploads[:-1], SESSION_UPLOAD_BUDGET_BYTES - sum(item.bytes for item in uploads[-1:]))
+        spilled = [state.uploaded_files[item.key] for item in evicted]
+        for file_info in spilled:
+            spill_upload(file_info)
+        upload_bytes -= sum(item.bytes for item in evicted)
+        counts["upload"] = len(spilled)
+
+        fields.update(bytes=used, budget=budget, evicted=sum(counts.values()))
+    state.memory_usage = {
+        "bytes": used, "budget": budget, "by_kind": by_kind,
+        "upload_bytes": upload_bytes, "upload_budget": SESSION_UPLOAD_BUDGET_BYTES,
+        "evicted": counts, "spilled_uploads": [f["name"] for f in spilled]
+    }
+    return state.memory_usage
+
+
+def init_session_state():
+    if 'knowledge' not in st.session_state:
+        # Open the ingested library once per process, then warm-start this
+        # session with only the documents it learned; everyone else's are
+        # searched where they are, in the vector index
+        get_library()
+        vector_index = get_vector_index()
+        st.session_state.knowledge = {}
+        st.session_state.knowledge_index = BM25Index()
+        for record in get_session_store().latest(session_key(), "knowledge"):
+            document = vector_index.document(record["name"])
+            if document is not None:
+                chunks, source, date = document
+                st.session_state.knowledge_index.add_document(record["name"], chunks)
+                st.session_state.knowledge[record["name"]] = make_entry(
+                    len(chunks), sum(len(c["text"]) for c in chunks), source or "library",
+                    pages=chunks[-1]["page"] or 1, date=date
+                )
+    if not all(name in st.session_state for name in SESSION_LISTS):
+        restore_session_lists()
+    if 'chart_index' not in st.session_state:
+        # Perceptual hashes of every chart this session has analysed
+        from trading_assistant.chart_hash import BKTree
+        st.session_state.chart_index = BKTree()
+        for record in get_session_store().latest(session_key(), "chart_hash"):
+            st.session_state.chart_index.add(record["hash"], tuple(record["key"]))
+    if 'chat_summary' not in st.session_state:
+        # Rolling summary of chat turns that have left memory
+        summaries = get_session_store().latest(session_key(), "summary", 1)
+        st.session_state.chat_summary = summaries[0] if summaries else {"content": ""}
+    if 'upload_digests' not in st.session_state:
+        st.session_state.upload_digests = {}
+    # Placeholders showing running jobs, registered afresh by every run
+    st.session_state.watched = []
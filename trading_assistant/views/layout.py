@@ -0,0 +1,213 @@
+"""Page furniture shared by every mode: footer, help, styles and the debug panel.
+
+The large markdown and CSS blocks live here as constants so they are
+compiled once per process instead of on every rerun of ``app.py``.
+"""
+
+import time
+
+import streamlit as st
+
+from trading_assistant.config import METRICS_SESSION_INTERVAL
+from trading_assistant.metrics import METRICS, deep_sizeof
+from trading_assistant.streaming import live_text
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    get_script_run_ctx = None
+
+FOOTER_HTML = """
+<div style="text-align: center; color: #666;">
+    <small>
+    ⚠️ <strong>Educational Tool Only • Not Financial Advice • Trading Involves Risk</strong>
+    <br>
+    <small>Upload charts and PDFs for AI-powered analysis</small>
+    </small>
+</div>
+"""
+
+HELP_MARKDOWN = """
+    ### **Complete Workflow:**
+
+    1. **Upload Files Mode:**
+       - Upload chart screenshots (PNG/JPG)
+       - Upload PDFs/text files
+       - All files stored for analysis
+
+    2. **Analyze Charts Mode:**
+       - Select uploaded charts
+       - Choose analysis focus
+       - Get AI-powered insights
+       - Download reports
+
+    3. **Learn from PDFs Mode:**
+       - Upload PDFs or paste text
+       - Build knowledge base
+       - AI learns from content
+
+    4. **Chat with AI Mode:**
+       - Ask trading questions
+       - Get personalized advice
+       - Reference uploaded materials
+
+    ### **For Full Features Locally:**
+    ```bash
+    pip install -r requirements.txt
+    streamlit run app.py
+
+    # Optional: run without network against the local stand-in API
+    python -m trading_assistant.stub_server --latency 0.3 --tokens-per-second 40
+    ```
+    """
+
+# Seconds between redraws while this session has jobs in flight
+JOB_POLL_INTERVAL = 0.25
+
+# Seconds a run keeps redrawing before it hands over to a fresh rerun, so
+# no script thread stays parked for the length of an LLM call
+JOB_FOLLOW_SECONDS = 3.0
+
+JOB_STATUS = {"queued": "🕒 Queued", "running": "⏳ Running", "cancelled": "⏹️ Cancelled", "failed": "⚠️ Failed"}
+
+STYLE_HTML = """
+<style>
+    .stButton button {
+        border-radius: 8px;
+        border: 1px solid #4CAF50;
+        transition: all 0.3s;
+    }
+    .stButton button:hover {
+        background-color: #4CAF50;
+        color: white;
+        transform: scale(1.02);
+    }
+    .css-1d391kg {
+        border-radius: 10px;
+        padding: 20px;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+    }
+    .stProgress > div > div {
+        background: linear-gradient(90deg, #4CAF50, #8BC34A);
+    }
+</style>
+"""
+
+
+def render_footer():
+    # Footer
+    st.markdown("---")
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+
+    # Help section
+    with st.expander("🆘 How to Use"):
+        st.markdown(HELP_MARKDOWN)
+
+    # Add styling
+    st.markdown(STYLE_HTML, unsafe_allow_html=True)
+
+
+def record_session_metrics(force=False):
+    """Snapshot this session's size into the metrics registry.
+
+    Walking session state is not free, so it is sampled at most every
+    ``METRICS_SESSION_INTERVAL`` seconds unless ``force`` is set.
+    """
+    now = time.time()
+    if not force and now - st.session_state.get("metrics_sampled_at", 0) < METRICS_SESSION_INTERVAL:
+        return
+    st.session_state.metrics_sampled_at = now
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+    st.session_state.metrics_session = {
+        "state_bytes": deep_sizeof({k: st.session_state[k] for k in st.session_state}),
+        "uploads": len(st.session_state.uploaded_files),
+        "history_length": len(st.session_state.chat_history),
+        "analyses": len(st.session_state.analyses),
+        "knowledge_entries": len(st.session_state.knowledge)
+    }
+    METRICS.record_session(ctx.session_id if ctx else "unknown", **st.session_state.metrics_session)
+
+
+def render_debug_panel(panel, run_spans):
+    # Timings of this run plus the latest session snapshot
+    with panel.container():
+        for name, seconds, fields in run_spans:
+            detail = ", ".join(f"{k}={v}" for k, v in fields.items())
+            st.caption(f"⏱️ {name}: {seconds * 1000:.1f} ms" + (f" ({detail})" if detail else ""))
+        session = st.session_state.metrics_session
+        st.caption(
+            f"🧮 Session: {session['state_bytes'] / 1024:.0f} KB in state, "
+            f"{session['uploads']} uploads, {session['history_length']} chat turns, "
+            f"{session['analyses']} analyses"
+        )
+        st.download_button("📥 Metrics (Prometheus)", METRICS.prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
+
+
+def _format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def render_memory_usage(panel, usage):
+    # Sidebar summary of what the memory governor measured and freed this run
+    by_kind = usage["by_kind"]
+    evicted = usage["evicted"]
+    with panel.container():
+        st.progress(min(usage["bytes"] / usage["budget"], 1.0) if usage["budget"] else 1.0,
+                    text=f"🧠 Memory: {_format_bytes(usage['bytes'])} of {_format_bytes(usage['budget'])}")
+        st.caption(
+            f"Chat {_format_bytes(by_kind['chat'])} • analyses {_format_bytes(by_kind['analysis'])} • "
+            f"knowledge {_format_bytes(by_kind['knowledge'])} • uploads {_format_bytes(usage['upload_bytes'])} "
+            f"of {_format_bytes(usage['upload_budget'])} on disk"
+        )
+        freed = [f"{count} {label}" for count, label in (
+            (evicted["chat"], "chat turns summarised"),
+            (evicted["analysis"], "analyses moved to history"),
+            (evicted["knowledge"], "documents kept on disk only"),
+            (evicted["upload"], "uploads unpinned on disk"),
+        ) if count]
+        if freed:
+            st.caption("♻️ Freed: " + ", ".join(freed))
+        if usage["spilled_uploads"]:
+            st.warning("Upload budget reached; these uploads stay listed but may need re-uploading "
+                       "once disk space runs short: " + ", ".join(usage["spilled_uploads"]))
+
+
+def follow_jobs(panel, queue, session, watched):
+    """List this session's jobs in ``panel`` and keep running replies live.
+
+    Streamlit 1.28 has no fragments, so the end of the run polls instead:
+    job statuses and the ``(record, key, placeholder)`` entries in
+    ``watched`` are redrawn for up to ``JOB_FOLLOW_SECONDS``, or until
+    every job has finished, then the script reruns, which renders the
+    final results or picks up following where this run left off. A widget
+    click interrupts the wait like any other run; the jobs carry on in
+    the pool.
+    """
+    jobs = [job for job in queue.session_jobs(session) if job.active]
+    if not jobs:
+        return
+    lines = {}
+    with panel.container():
+        st.markdown("**🧵 Background jobs**")
+        for job in jobs:
+            col_status, col_cancel = st.columns([4, 1])
+            lines[job.id] = col_status.empty()
+            if col_cancel.button("✖️", key=f"cancel_job_{job.id}", help="Cancel this job"):
+                queue.cancel(job.id)
+    deadline = time.monotonic() + JOB_FOLLOW_SECONDS
+    while True:
+        for job in jobs:
+            lines[job.id].caption(f"{JOB_STATUS.get(job.status, '✅ Done')} • {job.label}")
+        for record, key, placeholder in watched:
+            job = queue.poll(record.get("job_id"))
+            placeholder.markdown(live_text(record, key, job is not None and job.active))
+        if not any(job.active for job in jobs) or time.monotonic() >= deadline:
+            break
+        time.sleep(JOB_POLL_INTERVAL)
+    st.rerun()
@@ -0,0 +1,135 @@
+"""Learn mode: add PDFs, text files or pasted notes to the knowledge base."""
+
+from itertools import chain, islice
+
+import streamlit as st
+
+from trading_assistant.knowledge import chunk_pages, chunk_text
+from trading_assistant.pdf_ingest import PDF_AVAILABLE, iter_uploaded_pdf
+from trading_assistant.views.common import get_library, learn_document, remember
+
+
+def uploaded_chunks(uploaded_file):
+    # Chunks of an uploaded PDF or text file. PDF pages stream from the
+    # worker pool straight into chunks, with a progress bar
+    if not uploaded_file.name.endswith('.pdf'):
+        yield from chunk_text(uploaded_file.read().decode('utf-8', errors='ignore'))
+        return
+    if not PDF_AVAILABLE:
+        yield from chunk_text(f"[PDF File: {uploaded_file.name}]\n\nFor detailed PDF text extraction, install PyMuPDF.\n\nFile uploaded for reference.")
+        return
+    progress = st.progress(0.0, text="Extracting PDF text...")
+
+    def extracted_pages():
+        for page_no, text, total in iter_uploaded_pdf(uploaded_file):
+            progress.progress(page_no / total, text=f"Extracting page {page_no}/{total}")
+            yield page_no, text
+
+    try:
+        yield from chunk_pages(extracted_pages())
+    finally:
+        progress.empty()
+
+
+def render(backend):
+    st.header("📚 Learn from PDFs & Text")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.subheader("Add Learning Materials")
+
+        # Option 1: Upload PDF/text
+        uploaded_content = st.file_uploader(
+            "Upload PDF or text file:",
+            type=["pdf", "txt", "md"],
+            help="Upload trading books, articles, or notes"
+        )
+
+        # Option 2: Paste text
+        st.subheader("📝 Or Paste Content Directly")
+        pasted_content = st.text_area(
+            "Paste trading content:",
+            height=200,
+            placeholder="Paste content from trading books, courses, strategies..."
+        )
+
+        content_name = st.text_input("Title for this content:", "Trading_Material")
+
+        if st.button("🧠 Learn from Content", type="primary"):
+            source = uploaded_content.name if uploaded_content and not pasted_content else "pasted_text"
+            entry, preview = None, []
+
+            if pasted_content or uploaded_content:
+                try:
+                    chunks = iter(chunk_text(pasted_content) if pasted_content else uploaded_chunks(uploaded_content))
+                    # The rest of the document is indexed batch by batch as it is read
+                    preview = list(islice(chunks, 2))
+                    if preview:
+                        entry = learn_document(content_name, chain(preview, chunks), source)
+                except Exception:
+                    # Replaces whatever was learned before the file failed
+                    preview = chunk_text(f"File: {source}\n\nUploaded for reference.")
+                    entry = learn_document(content_name, preview, source)
+
+            if entry:
+                st.success(f"✅ '{content_name}' added to knowledge base! "
+                           f"({entry['chunk_count']} chunks, {entry['pages']} pages)")
+                st.balloons()
+
+                # Show preview
+                with st.expander("📋 Preview Content"):
+                    st.text_area("Content", " ".join(c["text"] for c in preview)[:1000], height=300)
+            else:
+                st.warning("Please upload a file or paste some content.")
+
+    with col2:
+        st.subheader("📚 Knowledge Base")
+        if st.session_state.knowledge:
+            for name, data in st.session_state.knowledge.items():
+                with st.expander(f"📖 {name[:25]}..." if len(name) > 25 else f"📖 {name}"):
+                    st.write(f"**Added:** {data['date']}")
+                    st.write(f"**Source:** {data.get('source', 'Unknown')}")
+                    st.write(f"**Size:** {data['chars']} chars in {data['chunk_count']} chunks"
+                             + (" (on disk only, to save memory)" if data.get("spilled") else ""))
+
+                    # Quick actions
+                    if st.button(f"Ask about {name[:15]}...", key=f"ask_knowledge_{name}"):
+                        remember("chat_history", {
+                            "role": "user",
+                            "content": f"Explain the key concepts from {name}"
+                        })
+                        st.rerun()
+
+                    if st.button(f"Use in analysis", key=f"use_knowledge_{name}"):
+                        st.info(f"✅ {name} will be referenced in future analyses")
+        else:
+            st.info("""
+            **No content added yet.**
+
+            **Add materials to:**
+            • Teach AI trading concepts
+            • Improve analysis quality
+            • Build reference library
+
+            **Suggested content:**
+            • Price action principles
+            • Risk management rules
+            • Trading psychology
+            • Strategy descriptions
+            """)
+
+        # Library built offline with the ingest CLI; read-only here
+        library = get_library()
+        library.refresh()
+        if library.documents():
+            st.subheader("🗄️ Library")
+            st.caption(f"{len(library.documents())} documents, {len(library):,} chunks, "
+                       f"built {library.generation.built}. Rebuild with "
+                       "`python -m trading_assistant.ingest <folder>`.")
+            with st.expander("Documents"):
+                st.dataframe(
+                    [{"Document": d["name"], "Pages": d["pages"], "Chunks": d["chunks"], "Chars": d["chars"]}
+                     for d in library.documents()],
+                    hide_index=True, use_container_width=True
+                )
@@ -0,0 +1,149 @@
+"""Scan mode: rank a watchlist of symbols by trading setups, then analyse the best."""
+
+import os
+from datetime import datetime
+
+import streamlit as st
+
+from trading_assistant.config import WATCHLIST_DIR
+from trading_assistant.ohlcv import OHLCV_EXTENSIONS
+from trading_assistant.scanner import RULES, watchlist
+from trading_assistant.views.common import (
+    analysis_request_params, get_bar_store, get_blob_store, has_knowledge, remember_analysis, save, scan_watchlist,
+    submit_completion
+)
+
+# Symbols offered for AI analysis at most
+MAX_ANALYZED = 20
+
+
+def scan_sources(directory, include_uploads, timeframe):
+    # (symbol, path, filename, mtime) for the watchlist folder, the bar
+    # store series of ``timeframe`` (if one is chosen) and, optionally, the
+    # price data uploaded in this session. Uploads are imported into the
+    # bar store when opened, so a symbol is only scanned the first time
+    # it is found
+    sources = []
+    for symbol, path, filename in watchlist(directory):
+        try:
+            sources.append((symbol, path, filename, os.path.getmtime(path)))
+        except OSError:
+            pass
+    if timeframe:
+        store = get_bar_store()
+        for symbol in store.symbols():
+            series = store.series(symbol, timeframe)
+            if series is not None and len(series):
+                # Appends only ever grow a series, so its length stands in for the mtime
+                sources.append((symbol, series.directory, timeframe, len(series)))
+    if include_uploads:
+        store = get_blob_store()
+        for file_info in st.session_state.uploaded_files:
+            name = file_info["name"]
+            if name.lower().endswith(OHLCV_EXTENSIONS):
+                # Blobs are content-addressed, so the digest stands in for the mtime
+                sources.append((os.path.splitext(name)[0], store.path(file_info["digest"]), name,
+                                file_info["digest"]))
+    seen = set()
+    return [source for source in sources if not (source[0] in seen or seen.add(source[0]))]
+
+
+def rule_settings(names):
+    # (name, ((param, value), ...)) for the selected rules, defaults editable
+    settings = []
+    with st.expander("⚙️ Rule parameters"):
+        for name in names:
+            defaults = RULES[name][1]
+            columns = st.columns(len(defaults))
+            params = tuple(
+                (param, column.number_input(f"{name}: {param}", value=value, key=f"scan_{name}_{param}"))
+                for column, (param, value) in zip(columns, defaults.items())
+            )
+            settings.append((name, params))
+    return tuple(settings)
+
+
+def render(backend):
+    llm_available = backend is not None
+
+    st.header("🔭 Scan Watchlist")
+    st.write("Rank every symbol in a folder of OHLCV files by simple setups, "
+             "then send only the strongest to the AI.")
+
+    directory = st.text_input("Watchlist folder:", WATCHLIST_DIR,
+                              help="One CSV or Parquet file per symbol, named after it")
+    include_uploads = st.checkbox("Include uploaded price data", value=True)
+    timeframes = get_bar_store().timeframes()
+    timeframe = st.selectbox("Bar store timeframe:", [None] + timeframes, index=1 if timeframes else 0,
+                             format_func=lambda tf: tf or "Don't scan the bar store",
+                             help="Also scan every symbol stored at this timeframe")
+    sources = scan_sources(directory, include_uploads, timeframe)
+    st.caption(f"{len(sources)} symbols")
+
+    names = st.multiselect("Setups:", list(RULES), default=list(RULES))
+    rules = rule_settings(names)
+
+    if st.button("🔭 Run Scan", type="primary", disabled=not sources or not names):
+        st.session_state.scan_request = (tuple(sources), rules)
+
+    request = st.session_state.get("scan_request")
+    if not request:
+        return
+    with st.spinner(f"Scanning {len(request[0])} symbols..."):
+        rows = scan_watchlist(*request)
+
+    hits = [row for row in rows if row["hits"]]
+    failed = [row for row in rows if row["error"]]
+    st.subheader("📋 Ranked Setups")
+    st.caption(f"{len(hits)} of {len(rows)} symbols matched"
+               + (f" • {len(failed)} could not be read" if failed else ""))
+    if hits:
+        st.dataframe(
+            [{"Symbol": row["symbol"], "Setups": row["hits"], "Score": round(row["score"], 2),
+              "Last": row["last"], "Change %": round(row["change_pct"], 2), "Signals": row["signals"]}
+             for row in hits],
+            use_container_width=True, hide_index=True
+        )
+    if failed:
+        with st.expander("⚠️ Unreadable files"):
+            for row in failed:
+                st.write(f"**{row['symbol']}:** {row['error']}")
+    if not hits:
+        return
+
+    st.subheader("🤖 AI Analysis of the Top Symbols")
+    top_n = st.number_input("Symbols to analyze:", 1, min(MAX_ANALYZED, len(hits)), min(5, len(hits)))
+    analysis_focus = st.multiselect(
+        "What to analyze:",
+        ["Support/Resistance", "Trend Direction", "Chart Patterns",
+         "Entry/Exit Points", "Risk Assessment", "Volume Analysis"],
+        default=["Support/Resistance", "Trend Direction"]
+    )
+    include_pdf_context = st.checkbox("Reference PDF knowledge", value=has_knowledge())
+
+    if st.button(f"🚀 Analyze top {top_n} with AI"):
+        if not llm_available:
+            st.warning("⚠️ OpenAI API key required for AI analysis.")
+            return
+        for row in hits[:top_n]:
+            analysis_request = remember_analysis({
+                "chart": row["symbol"],
+                "digest": None,
+                "focus_areas": analysis_focus,
+                "scan_signals": row["signals"],
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            })
+            try:
+                submit_completion(
+                    backend, analysis_request, "ai_analysis", f"Analysis: {row['symbol']}",
+                    error_prefix="⚠️ AI Analysis Error",
+                    **analysis_request_params(
+                        row["symbol"], analysis_focus, include_pdf_context,
+                        facts=f"Scanner setups: {row['signals']}\n{row['facts']}"
+                    )
+                )
+            except Exception as e:
+                analysis_request["ai_analysis"] = f"⚠️ AI Analysis Error: {str(e)}"
+                save(analysis_request)
+        st.success(f"✅ Queued {top_n} analyses; they appear under Previous Analyses "
+                   "in Analyze Charts as they finish")
@@ -0,0 +1,126 @@
+"""Upload mode: store chart screenshots, PDFs and notes for later use."""
+
+from datetime import datetime
+
+import streamlit as st
+
+from trading_assistant.ohlcv import OHLCV_EXTENSIONS
+from trading_assistant.views.common import (
+    IMAGE_EXTENSIONS, forget, get_blob_store, get_rendition_cache, load_dataset, remember, similar_analyses
+)
+
+
+def render(backend):
+    st.header("📤 Upload Trading Files")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.subheader("Upload Files")
+
+        # File uploader for multiple types
+        uploaded_files = st.file_uploader(
+            "Upload trading files:",
+            type=["png", "jpg", "jpeg", "pdf", "txt", "csv", "parquet"],
+            accept_multiple_files=True,
+            help="Upload charts (PNG/JPG), OHLCV price data (CSV/Parquet), PDFs, or text files"
+        )
+
+        if uploaded_files:
+            blob_store = get_blob_store()
+            for uploaded_file in uploaded_files:
+                # Hash and store each upload once, not on every rerun
+                if uploaded_file.file_id not in st.session_state.upload_digests:
+                    digest = blob_store.put(uploaded_file.getvalue())
+                    st.session_state.upload_digests[uploaded_file.file_id] = digest
+
+                    # Decode images once to build their preview renditions
+                    if uploaded_file.name.lower().endswith(IMAGE_EXTENSIONS):
+                        get_rendition_cache().build(digest, uploaded_file)
+
+                    # Check if already uploaded (same content under any name)
+                    if any(f["digest"] == digest for f in st.session_state.uploaded_files):
+                        blob_store.release(digest)
+                    else:
+                        remember("uploaded_files", {
+                            "name": uploaded_file.name,
+                            "type": uploaded_file.type,
+                            "size": f"{uploaded_file.size / 1024:.1f} KB",
+                            "digest": digest,
+                            "upload_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        })
+
+                # Show file info
+                file_ext = uploaded_file.name.split('.')[-1].upper()
+                if file_ext in ['PNG', 'JPG', 'JPEG']:
+                    st.success(f"📸 {uploaded_file.name} - Chart screenshot")
+                    # Display cached thumbnail preview
+                    thumbnail = get_rendition_cache().get(
+                        st.session_state.upload_digests[uploaded_file.file_id], "thumb"
+                    )
+                    if thumbnail:
+                        st.image(thumbnail, caption=f"Preview: {uploaded_file.name}", width=300)
+                    else:
+                        st.info("Image preview not available")
+                    # Near-identical charts analysed before can be reused from Analyze Charts
+                    matches = similar_analyses({"name": uploaded_file.name,
+                                                "digest": st.session_state.upload_digests[uploaded_file.file_id]})
+                    if matches:
+                        charts = ", ".join(f"{chart} ({timestamp})" for _, (_, chart, timestamp) in matches[:3])
+                        st.info(f"🔁 Looks like {len(matches)} chart(s) you analysed before: {charts}. "
+                                "Reuse or compare them in **Analyze Charts** instead of a fresh analysis.")
+                elif file_ext == 'PDF':
+                    st.info(f"📄 {uploaded_file.name} - PDF document")
+                elif file_ext == 'TXT':
+                    st.warning(f"📝 {uploaded_file.name} - Text file")
+                elif file_ext.lower() in OHLCV_EXTENSIONS:
+                    try:
+                        data = load_dataset(st.session_state.upload_digests[uploaded_file.file_id], uploaded_file.name)
+                        st.success(f"📊 {uploaded_file.name} - OHLCV data ({len(data['close']):,} bars)")
+                    except Exception as e:
+                        st.error(f"⚠️ {uploaded_file.name} - Could not read price data: {e}")
+
+        if st.button("🔄 Process Uploaded Files", type="primary") and st.session_state.uploaded_files:
+            with st.spinner("Processing files..."):
+                for file_info in st.session_state.uploaded_files:
+                    st.success(f"✅ {file_info['name']} ready for analysis")
+
+            st.balloons()
+
+    with col2:
+        st.subheader("📁 File Library")
+        if st.session_state.uploaded_files:
+            for i, file_info in enumerate(st.session_state.uploaded_files):
+                with st.expander(f"📄 {file_info['name']}"):
+                    st.write(f"**Type:** {file_info['type']}")
+                    st.write(f"**Size:** {file_info['size']}")
+                    st.write(f"**Uploaded:** {file_info['upload_time']}")
+
+                    # Quick actions
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        if file_info['name'].lower().endswith(IMAGE_EXTENSIONS + OHLCV_EXTENSIONS):
+                            if st.button("🔍 Analyze", key=f"analyze_{i}"):
+                                st.session_state.selected_chart = file_info['name']
+                                st.rerun()
+                    with col_b:
+                        if st.button("🗑️ Remove", key=f"remove_{i}"):
+                            forget("uploaded_files", file_info)
+                            if not file_info.get("spilled"):
+                                get_blob_store().release(file_info["digest"])
+                            st.rerun()
+        else:
+            st.info("""
+            **No files uploaded yet.**
+
+            **Supported files:**
+            • Chart screenshots (PNG/JPG)
+            • OHLCV price data (CSV/Parquet)
+            • PDF documents
+            • Text files
+
+            **Tips:**
+            • Clear, well-lit charts work best
+            • PDFs should have extractable text
+            • Text files for quick notes
+            """)